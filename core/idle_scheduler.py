@@ -0,0 +1,277 @@
+"""
+core/idle_scheduler.py
+
+Idle-time curiosity explorer for C.3.
+
+When nobody is talking to C.3, it should work through its curiosity
+frontier instead of sitting still. IdleScheduler does that:
+
+- A background thread waits until the core has been idle for
+  `idle_after` seconds, then pops the most uncertain question from the
+  frontier (CuriosityLayer or CuriosityStore) and runs it through the
+  core (core.runner.C3Core.run) at low OS priority.
+- User tasks go through `submit()` (or the `serving()` context manager).
+  They flip a preempt flag that the brains check after every decode
+  step, so the explorer yields within one token, and then wait for the
+  exploration to unwind before touching the core: its model, MRE,
+  spine and caches are not thread-safe. The interrupted question goes
+  back on the frontier.
+- Explorations run with carry_over=False, so their answers never enter
+  the MRE context of the next user prompt.
+- `cpu_share` caps the fraction of wall time spent exploring: after an
+  exploration that took d seconds, the explorer rests d × (1/share − 1).
+- When the frontier is empty, an optional `goal_fn` (e.g. a wrapper
+  around C3Core.pick_internal_goal) can seed a new question.
+
+Metrics (seconds spent idle / exploring / serving, plus counters) are
+available from `metrics()`.
+
+Usage:
+    core = C3Core()
+    sched = IdleScheduler(core, CuriosityLayer())
+    sched.start()
+    result = sched.submit("plan my day")   # preempts any exploration
+    sched.stop()
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from core.runner import TaskPreempted
+
+
+@dataclass
+class IdleSchedulerConfig:
+    """
+    Config for IdleScheduler.
+
+    - idle_after: seconds without a user task before exploring starts
+    - cpu_share: max fraction of wall time spent exploring (0–1]
+    - poll_interval: how often the worker re-checks idleness (seconds)
+    - niceness: OS niceness added to the worker thread (Linux; 0 = off)
+    - source: spine meta tag passed to core.run() for explorations
+    """
+
+    idle_after: float = 2.0
+    cpu_share: float = 0.25
+    poll_interval: float = 0.1
+    niceness: int = 10
+    source: str = "idle_scheduler"
+
+
+@dataclass
+class IdleMetrics:
+    idle_seconds: float = 0.0
+    exploring_seconds: float = 0.0
+    serving_seconds: float = 0.0
+    explored: int = 0
+    preempted: int = 0
+    failed: int = 0
+    served: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class IdleScheduler:
+    """
+    Runs curiosity exploration in the gaps between user tasks.
+
+    `core` must provide run(task, should_stop=..., source=..., carry_over=...).
+    `frontier` must provide add_item / pop_highest_uncertainty
+    (CuriosityLayer and CuriosityStore both do).
+    """
+
+    def __init__(
+        self,
+        core: Any,
+        frontier: Any,
+        config: Optional[IdleSchedulerConfig] = None,
+        goal_fn: Optional[Callable[[], Optional[str]]] = None,
+    ) -> None:
+        if config is None:
+            config = IdleSchedulerConfig()
+        if not 0.0 < config.cpu_share <= 1.0:
+            raise ValueError("cpu_share must be in (0, 1]")
+        self.config = config
+        self.core = core
+        self.frontier = frontier
+        self.goal_fn = goal_fn
+
+        self._lock = threading.Lock()          # guards frontier + metrics + state
+        self._explored = threading.Condition(self._lock)  # notified when _exploring clears
+        self._preempt = threading.Event()      # set while a user task is active
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self._serving = 0                      # number of in-flight user tasks
+        self._exploring = False
+        self._last_user_activity = time.monotonic()
+        self._state_since = time.monotonic()
+        self._metrics = IdleMetrics()
+
+    # --- public API -------------------------------------------------------
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._worker, name="c3-idle-scheduler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stop.set()
+        self._preempt.set()  # cut any running exploration short
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        with self._lock:
+            self._account()
+            if self._serving == 0:
+                self._preempt.clear()
+
+    def add_question(self, question: str, source: str = "system", uncertainty: float = 0.5):
+        """
+        Thread-safe wrapper around frontier.add_item().
+        """
+        with self._lock:
+            return self.frontier.add_item(question, source=source, uncertainty=uncertainty)
+
+    @contextmanager
+    def serving(self) -> Iterator[None]:
+        """
+        Mark a user task as in flight. Any running exploration is told to
+        stop at its next decode step, and no new exploration starts until
+        the last user task is done and `idle_after` has passed.
+
+        Blocks until a running exploration has left core.run(), so the
+        body has the core to itself.
+        """
+        with self._lock:
+            self._account()
+            self._serving += 1
+            self._preempt.set()
+            self._explored.wait_for(lambda: not self._exploring)
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._account()
+                self._serving -= 1
+                self._metrics.served += 1
+                self._last_user_activity = time.monotonic()
+                if self._serving == 0:
+                    self._preempt.clear()
+
+    def submit(self, task: str, **kwargs: Any) -> Any:
+        """
+        Run a user task through the core, preempting exploration.
+        """
+        with self.serving():
+            return self.core.run(task, **kwargs)
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            self._account()
+            return self._metrics.to_dict()
+
+    # --- internal helpers -------------------------------------------------
+
+    def _account(self) -> None:
+        """
+        Charge the time since the last state change to the current state.
+        Serving wins over exploring when both are true (the explorer is
+        only finishing its last decode step). Caller holds self._lock.
+        """
+        now = time.monotonic()
+        elapsed = now - self._state_since
+        self._state_since = now
+        if self._serving:
+            self._metrics.serving_seconds += elapsed
+        elif self._exploring:
+            self._metrics.exploring_seconds += elapsed
+        else:
+            self._metrics.idle_seconds += elapsed
+
+    def _lower_priority(self) -> None:
+        if self.config.niceness <= 0 or not hasattr(os, "setpriority"):
+            return
+        try:
+            tid = threading.get_native_id()
+            current = os.getpriority(os.PRIO_PROCESS, tid)
+            os.setpriority(os.PRIO_PROCESS, tid, min(19, current + self.config.niceness))
+        except (OSError, AttributeError):
+            pass
+
+    def _is_idle(self) -> bool:
+        return (
+            self._serving == 0
+            and time.monotonic() - self._last_user_activity >= self.config.idle_after
+        )
+
+    def _next_question(self):
+        item = self.frontier.pop_highest_uncertainty()
+        if item is None and self.goal_fn is not None:
+            question = self.goal_fn()
+            if question:
+                self.frontier.add_item(question, source="internal_goal")
+                item = self.frontier.pop_highest_uncertainty()
+        return item
+
+    def _worker(self) -> None:
+        self._lower_priority()
+
+        while not self._stop.is_set():
+            with self._lock:
+                item = self._next_question() if self._is_idle() else None
+                if item is not None:
+                    self._account()
+                    self._exploring = True
+
+            if item is None:
+                self._stop.wait(self.config.poll_interval)
+                continue
+
+            started = time.monotonic()
+            preempted = False
+            try:
+                self.core.run(
+                    item.question,
+                    should_stop=self._preempt.is_set,
+                    source=self.config.source,
+                    carry_over=False,
+                )
+            except TaskPreempted:
+                # Interrupted before an answer was stored.
+                preempted = True
+            except Exception:
+                with self._lock:
+                    self._metrics.failed += 1
+            duration = time.monotonic() - started
+
+            with self._lock:
+                self._account()
+                self._exploring = False
+                self._explored.notify_all()
+                if preempted:
+                    # Not answered: put it back so it is retried later.
+                    self.frontier.add_item(
+                        item.question, source=item.source, uncertainty=item.uncertainty
+                    )
+                    self._metrics.preempted += 1
+                else:
+                    self._metrics.explored += 1
+
+            # Respect the CPU budget: rest long enough that exploring
+            # stays at or below cpu_share of wall time.
+            share = self.config.cpu_share
+            if share < 1.0 and not preempted:
+                self._stop.wait(duration * (1.0 / share - 1.0))
@@ -0,0 +1,508 @@
+"""
+core/replay.py
+
+Deterministic replay of recorded Memory Spine sessions through C3Core.
+
+A session is one C3Core.run(): architect_output, optional
+oracle_output, final_choice. replay() rebuilds the sessions from an
+events.jsonl and re-drives the real pipeline (prompt building, MRE
+context, length policy, Oracle skip, reconcile, spine writes) with:
+
+- model="recorded": the brains get a ReplayModel that returns the
+  stored output text and Architect confidence instead of generating
+- model="stub": placeholder text after a fixed `stub_latency`, for
+  orchestration cost with a known model cost
+
+Emotions come from the recorded final_choice (falling back to the
+EmotionEngine default for old events) and only set the brains' sampling
+temperatures. C3Core routes on neutral emotions, so the replayed
+decision depends on the recorded Architect confidence alone. Recordings
+made while routing still used the engine state can differ; a diff that
+reconcile reproduces from the recorded emotions is tagged
+cause="emotion_routing", anything else cause="unexplained".
+
+- speed: 0 = as fast as possible; otherwise sessions are released at
+  their recorded spacing divided by `speed` (2.0 = twice real time)
+- concurrency: lanes replaying in parallel, each with its own C3Core
+  and scratch spine file (the production spine is never written)
+
+The report has per-stage timings (architect, oracle, reconcile, spine,
+mre, orchestration = the rest of run()), throughput, scheduling lag
+and the decision diffs.
+
+    python3 -m core.replay --spine memory/events.jsonl --concurrency 4 --repeat 100
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import queue
+import shutil
+import statistics
+import tempfile
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from core.runner import DEFAULT_CONFIDENCE, C3Core
+from memory.spine import DEFAULT_EVENTS_PATH, MemorySpine
+from models.local_text_model import GenerationResult
+from reasoning.architect import ArchitectBrain
+from reasoning.emotions import EmotionEngine
+from reasoning.mre import MREConfig
+from reasoning.oracle import OracleBrain
+from reasoning.reconcile import reconcile
+
+
+STAGES = ("architect", "oracle", "reconcile", "spine", "mre", "orchestration", "total")
+
+
+@dataclass
+class RecordedSession:
+    """
+    One recorded C3Core.run(), rebuilt from spine events.
+    """
+
+    index: int
+    task: str
+    ts: Optional[float]
+    source: str = ""
+    architect_text: Optional[str] = None
+    architect_confidence: Optional[float] = None
+    oracle_text: Optional[str] = None
+    choice: Optional[str] = None
+    emotions: Optional[Dict[str, float]] = None
+    oracle_skipped: Optional[bool] = None
+
+
+def _parse_ts(value: Any) -> Optional[float]:
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str) and value:
+        try:
+            return datetime.fromisoformat(value).timestamp()
+        except ValueError:
+            return None
+    return None
+
+
+def _iter_events(path: Path) -> Iterator[Dict[str, Any]]:
+    with path.open("r", encoding="utf-8") as f:
+        for raw in f:
+            raw = raw.strip()
+            if not raw:
+                continue
+            try:
+                yield json.loads(raw)
+            except json.JSONDecodeError:
+                continue
+
+
+def load_sessions(path: Optional[str] = None) -> List[RecordedSession]:
+    """
+    Group spine events into sessions, in final_choice order.
+
+    Events are matched on (task, source), so interleaved runs from
+    different sources stay apart. Runs without a final_choice
+    (preempted) are dropped.
+    """
+    spine_path = Path(path) if path else DEFAULT_EVENTS_PATH
+    open_runs: Dict[Any, RecordedSession] = {}
+    sessions: List[RecordedSession] = []
+
+    for evt in _iter_events(spine_path):
+        kind = evt.get("event_type")
+        payload = evt.get("payload") or {}
+        task = payload.get("task")
+        if kind not in ("architect_output", "oracle_output", "final_choice") or not isinstance(task, str):
+            continue
+        source = (evt.get("meta") or {}).get("source", "")
+        key = (task, source)
+        ts = _parse_ts(evt.get("ts"))
+
+        if kind == "architect_output":
+            open_runs[key] = RecordedSession(
+                index=-1,
+                task=task,
+                ts=ts,
+                source=source,
+                architect_text=payload.get("text"),
+                architect_confidence=payload.get("confidence"),
+            )
+            continue
+
+        session = open_runs.get(key)
+        if session is None:
+            session = open_runs[key] = RecordedSession(index=-1, task=task, ts=ts, source=source)
+        if kind == "oracle_output":
+            session.oracle_text = payload.get("text")
+            continue
+
+        # final_choice closes the run.
+        del open_runs[key]
+        session.index = len(sessions)
+        session.choice = payload.get("choice")
+        session.emotions = payload.get("emotions")
+        session.oracle_skipped = payload.get("oracle_skipped")
+        sessions.append(session)
+
+    return sessions
+
+
+class ReplayModel:
+    """
+    Stands in for LocalTextModel inside Architect/Oracle: returns the
+    output recorded for the session being replayed (`self.session`), or
+    placeholder text when stub=True.
+    """
+
+    def __init__(self, role: str, stub: bool = False, stub_latency: float = 0.0) -> None:
+        self.role = role
+        self.stub = stub
+        self.stub_latency = stub_latency
+        self.session: Optional[RecordedSession] = None
+
+    def _text(self) -> str:
+        session = self.session
+        if self.stub:
+            if self.stub_latency > 0:
+                time.sleep(self.stub_latency)
+            return f"[REPLAY-STUB] {self.role} output for: {session.task}"
+        text = session.architect_text if self.role == "architect" else session.oracle_text
+        # The Oracle may have been skipped in the recording but not now.
+        return text if text is not None else f"[REPLAY] no recorded {self.role} output"
+
+    def generate(self, prompt: Any = None, should_stop: Optional[Callable[[], bool]] = None, **_: object) -> str:
+        return self._text()
+
+    def generate_with_logprobs(
+        self,
+        prompt: Any = None,
+        should_stop: Optional[Callable[[], bool]] = None,
+        **_: object,
+    ) -> GenerationResult:
+        return GenerationResult(
+            text=self._text(),
+            confidence=self.session.architect_confidence,
+            stop_reason="eos",
+        )
+
+
+class ReplayEmotions(EmotionEngine):
+    """
+    EmotionEngine that reports the recorded emotions of the current
+    session (the engine default when none were logged).
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.session: Optional[RecordedSession] = None
+
+    def current_state(self) -> Dict[str, float]:
+        if self.session is not None and self.session.emotions:
+            return dict(self.session.emotions)
+        return super().current_state()
+
+
+@dataclass
+class ReplayConfig:
+    """
+    - model: "recorded" (stored outputs) or "stub" (placeholder text)
+    - stub_latency: seconds per stubbed model call
+    - speed: 0 = unpaced, else recorded spacing / speed
+    - concurrency: parallel lanes (one C3Core each)
+    - repeat: replay the session list this many times (load testing)
+    - oracle_skip_confidence: passed to C3Core
+    - spine_dir: where lane spines are written (None = temp dir, removed)
+    """
+
+    model: str = "recorded"
+    stub_latency: float = 0.0
+    speed: float = 0.0
+    concurrency: int = 1
+    repeat: int = 1
+    oracle_skip_confidence: Optional[float] = 0.85
+    spine_dir: Optional[str] = None
+
+
+@dataclass
+class ReplayReport:
+    sessions: int = 0
+    elapsed: float = 0.0
+    stages: Dict[str, List[float]] = field(default_factory=dict)
+    lag: List[float] = field(default_factory=list)
+    matched: int = 0
+    compared: int = 0
+    diffs: List[Dict[str, Any]] = field(default_factory=list)
+    errors: List[str] = field(default_factory=list)
+
+    @property
+    def runs_per_s(self) -> float:
+        return self.sessions / self.elapsed if self.elapsed > 0 else 0.0
+
+    def stage_summary(self) -> Dict[str, Dict[str, float]]:
+        """
+        Per-stage ms: mean, p50, p95, total, calls.
+        """
+        out: Dict[str, Dict[str, float]] = {}
+        for stage in STAGES:
+            values = sorted(self.stages.get(stage, []))
+            if not values:
+                continue
+            p95 = values[min(len(values) - 1, math.ceil(0.95 * len(values)) - 1)]
+            out[stage] = {
+                "calls": len(values),
+                "mean_ms": statistics.fmean(values) * 1000,
+                "p50_ms": statistics.median(values) * 1000,
+                "p95_ms": p95 * 1000,
+                "total_ms": sum(values) * 1000,
+            }
+        return out
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "sessions": self.sessions,
+            "elapsed": self.elapsed,
+            "runs_per_s": self.runs_per_s,
+            "stages": self.stage_summary(),
+            "mean_lag_ms": statistics.fmean(self.lag) * 1000 if self.lag else 0.0,
+            "compared": self.compared,
+            "matched": self.matched,
+            "diffs": self.diffs,
+            "errors": self.errors,
+        }
+
+
+# --- instrumentation ------------------------------------------------------------
+
+class _StageTimer:
+    def __init__(self) -> None:
+        self.times: Dict[str, List[float]] = {}
+        self.current: Dict[str, float] = {}
+
+    def add(self, stage: str, seconds: float) -> None:
+        self.times.setdefault(stage, []).append(seconds)
+        self.current[stage] = self.current.get(stage, 0.0) + seconds
+
+    def wrap(self, obj: Any, name: str, stage: str) -> None:
+        fn = getattr(obj, name)
+
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self.add(stage, time.perf_counter() - start)
+
+        setattr(obj, name, timed)
+
+
+# --- replay -----------------------------------------------------------------------
+
+class _Lane:
+    def __init__(self, index: int, config: ReplayConfig, spine_dir: Path) -> None:
+        stub = config.model == "stub"
+        self.architect_model = ReplayModel("architect", stub, config.stub_latency)
+        self.oracle_model = ReplayModel("oracle", stub, config.stub_latency)
+        self.emotions = ReplayEmotions()
+        self.core = C3Core(
+            oracle_skip_confidence=config.oracle_skip_confidence,
+            mre_config=MREConfig(state_path=None),
+            architect=ArchitectBrain(model=self.architect_model),
+            oracle=OracleBrain(model=self.oracle_model),
+            emotions=self.emotions,
+            memory=MemorySpine(str(spine_dir / f"lane-{index}.jsonl")),
+        )
+        self.timer = _StageTimer()
+        self.timer.wrap(self.core.architect, "think_with_confidence", "architect")
+        self.timer.wrap(self.core.oracle, "think", "oracle")
+        self.timer.wrap(self.core, "reconcile", "reconcile")
+        self.timer.wrap(self.core.memory, "store", "spine")
+        self.timer.wrap(self.core.mre, "build_context", "mre")
+        self.timer.wrap(self.core.mre, "update_summary", "mre")
+
+    def run(self, session: RecordedSession):
+        self.architect_model.session = session
+        self.oracle_model.session = session
+        self.emotions.session = session
+        self.timer.current = {}
+        start = time.perf_counter()
+        result = self.core.run(session.task, source="replay")
+        total = time.perf_counter() - start
+        self.timer.add("orchestration", max(0.0, total - sum(self.timer.current.values())))
+        self.timer.add("total", total)
+        return result
+
+
+def _diff_cause(session: RecordedSession) -> str:
+    """
+    Why a replayed decision differs: "emotion_routing" when reconcile on
+    the recorded emotions gives the recorded choice (the recording was
+    routed on them, C3Core now routes on neutral ones), else "unexplained".
+    """
+    if session.emotions:
+        confidence = session.architect_confidence
+        if confidence is None:
+            confidence = DEFAULT_CONFIDENCE
+        if reconcile(confidence, emotions=session.emotions).choice == session.choice:
+            return "emotion_routing"
+    return "unexplained"
+
+
+def replay(sessions: List[RecordedSession], config: Optional[ReplayConfig] = None) -> ReplayReport:
+    """
+    Re-drive `sessions` through C3Core and compare decisions.
+    """
+    if config is None:
+        config = ReplayConfig()
+    if config.model not in ("recorded", "stub"):
+        raise ValueError(f"model must be 'recorded' or 'stub', got {config.model!r}")
+
+    schedule = [s for _ in range(max(1, config.repeat)) for s in sessions]
+    report = ReplayReport()
+    if not schedule:
+        return report
+
+    # Release offsets from the recorded spacing (repeats run back to back).
+    offsets: List[float] = []
+    if config.speed > 0:
+        stamps = [s.ts for s in sessions if s.ts is not None]
+        t0 = min(stamps) if stamps else 0.0
+        span = (max(stamps) - t0) if stamps else 0.0
+        for rep in range(max(1, config.repeat)):
+            for s in sessions:
+                rel = (s.ts - t0) if s.ts is not None else 0.0
+                offsets.append((rep * span + rel) / config.speed)
+
+    tmp = None
+    if config.spine_dir is None:
+        tmp = tempfile.mkdtemp(prefix="c3-replay-")
+        spine_dir = Path(tmp)
+    else:
+        spine_dir = Path(config.spine_dir)
+        spine_dir.mkdir(parents=True, exist_ok=True)
+
+    work: "queue.Queue[Optional[int]]" = queue.Queue()
+    for i in range(len(schedule)):
+        work.put(i)
+    lock = threading.Lock()
+    lanes = [_Lane(i, config, spine_dir) for i in range(max(1, config.concurrency))]
+
+    def worker(lane: _Lane) -> None:
+        while True:
+            try:
+                i = work.get_nowait()
+            except queue.Empty:
+                return
+            session = schedule[i]
+            if offsets:
+                wait = started + offsets[i] - time.perf_counter()
+                if wait > 0:
+                    time.sleep(wait)
+                lag = max(0.0, time.perf_counter() - (started + offsets[i]))
+            else:
+                lag = 0.0
+            try:
+                result = lane.run(session)
+            except Exception as exc:  # keep the other lanes going
+                with lock:
+                    report.errors.append(f"session {session.index} ({session.task!r}): {exc!r}")
+                continue
+            skipped = "oracle_temperature" not in result.temperatures
+            with lock:
+                report.sessions += 1
+                report.lag.append(lag)
+                if session.choice is None:
+                    continue
+                report.compared += 1
+                if result.choice == session.choice:
+                    report.matched += 1
+                elif len(report.diffs) < 1000:
+                    report.diffs.append({
+                        "index": session.index,
+                        "task": session.task,
+                        "original": session.choice,
+                        "replayed": result.choice,
+                        "confidence": session.architect_confidence,
+                        "oracle_skipped": {"original": session.oracle_skipped, "replayed": skipped},
+                        "cause": _diff_cause(session),
+                    })
+
+    started = time.perf_counter()
+    try:
+        threads = [threading.Thread(target=worker, args=(lane,), daemon=True) for lane in lanes]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    finally:
+        report.elapsed = time.perf_counter() - started
+        if tmp is not None:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+    for lane in lanes:
+        for stage, values in lane.timer.times.items():
+            report.stages.setdefault(stage, []).extend(values)
+    return report
+
+
+def main() -> None:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Replay recorded spine sessions through C3Core")
+    parser.add_argument("--spine", type=str, default=None, help="events.jsonl to replay (default: memory/events.jsonl)")
+    parser.add_argument("--model", choices=("recorded", "stub"), default="recorded")
+    parser.add_argument("--stub-latency", type=float, default=0.0, help="Seconds per stubbed model call")
+    parser.add_argument("--speed", type=float, default=0.0, help="Speed multiplier over recorded spacing (0 = unpaced)")
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=1, help="Replay the sessions this many times")
+    parser.add_argument("--no-oracle-skip", action="store_true", help="Always run both brains")
+    parser.add_argument("--spine-dir", type=str, default=None, help="Keep lane spines here (default: temp, removed)")
+    parser.add_argument("--json", action="store_true", help="Print the full report as JSON")
+    args = parser.parse_args()
+
+    sessions = load_sessions(args.spine)
+    if not sessions:
+        print("No complete sessions in the spine.")
+        return
+
+    config = ReplayConfig(
+        model=args.model,
+        stub_latency=args.stub_latency,
+        speed=args.speed,
+        concurrency=args.concurrency,
+        repeat=args.repeat,
+        oracle_skip_confidence=None if args.no_oracle_skip else ReplayConfig.oracle_skip_confidence,
+        spine_dir=args.spine_dir,
+    )
+    report = replay(sessions, config)
+
+    if args.json:
+        print(json.dumps(report.as_dict(), indent=2, ensure_ascii=False))
+        return
+
+    print(
+        f"Replayed {report.sessions} runs ({len(sessions)} recorded) in {report.elapsed:.2f}s "
+        f"-> {report.runs_per_s:,.0f} runs/s, {config.concurrency} lane(s), model={config.model}"
+    )
+    print(f"{'stage':<14} {'calls':>7} {'mean ms':>9} {'p50 ms':>9} {'p95 ms':>9} {'total ms':>10}")
+    for stage, row in report.stage_summary().items():
+        print(
+            f"{stage:<14} {row['calls']:>7} {row['mean_ms']:>9.3f} {row['p50_ms']:>9.3f} "
+            f"{row['p95_ms']:>9.3f} {row['total_ms']:>10.1f}"
+        )
+    if report.lag:
+        print(f"Mean scheduling lag: {statistics.fmean(report.lag) * 1000:.2f} ms")
+    print(f"Decisions: {report.matched}/{report.compared} match the recording")
+    for diff in report.diffs[:20]:
+        print(f"  #{diff['index']} {diff['task'][:50]!r}: {diff['original']} -> {diff['replayed']} ({diff['cause']})")
+    for err in report.errors[:5]:
+        print(f"  error: {err}")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,53 +6,152 @@ This file:
 - Loads Architect + Oracle
 - Loads Emotion Engine
 - Runs reconcile()
+- Feeds the MRE's token-budgeted carry-over summaries to both brains
+- Gives both brains a max_tokens budget learned from past output lengths
+- Uses the Architect's token-level confidence to skip the Oracle when
+  it could not change the decision
 - Logs memory events automatically
 - Gives a final answer
 """
 
+from typing import Callable, Optional
+
 from reasoning.architect import ArchitectBrain
 from reasoning.oracle import OracleBrain
 from reasoning.reconcile import reconcile, ReconcileResult
 from reasoning.emotions import EmotionEngine
+from reasoning.length_policy import AdaptiveMaxTokens
+from reasoning.mre import DEFAULT_STATE_PATH, MarkovianReasoningEngine, MREConfig
 from memory.spine import MemorySpine
 
 
+class TaskPreempted(RuntimeError):
+    """
+    Raised by C3Core.run() when `should_stop` fires mid-task
+    (e.g. a background exploration yielding to a user request).
+    Nothing is written to the spine for a preempted brain step.
+    """
+
+
+# Used when the Architect backend cannot report log-probs.
+DEFAULT_CONFIDENCE = 0.60
+
+
 class C3Core:
-    def __init__(self):
-        self.architect = ArchitectBrain()
-        self.oracle = OracleBrain()
-        self.emotions = EmotionEngine()
-        self.memory = MemorySpine()   # auto-memory
+    def __init__(
+        self,
+        oracle_skip_confidence: Optional[float] = 0.85,
+        mre_config: Optional[MREConfig] = None,
+        architect: Optional[ArchitectBrain] = None,
+        oracle: Optional[OracleBrain] = None,
+        emotions: Optional[EmotionEngine] = None,
+        memory: Optional[MemorySpine] = None,
+    ):
+        """
+        oracle_skip_confidence:
+            When the Architect's confidence is at or above this and
+            reconcile would pick the Architect anyway, the Oracle call is
+            skipped (it could not change the final answer).
+            None = always run both brains.
+        mre_config:
+            Carry-over summary buffer + context budget. Defaults to a
+            persistent buffer at reasoning/mre_state.json, token-counted
+            with the Architect's tokenizer.
+        architect / oracle / emotions / memory:
+            Pre-built components (e.g. core.replay's recorded-output
+            brains and a scratch spine); None = the defaults.
+        """
+        self.oracle_skip_confidence = oracle_skip_confidence
+        self.architect = architect or ArchitectBrain()
+        self.oracle = oracle or OracleBrain()
+        self.emotions = emotions or EmotionEngine()
+        self.memory = memory or MemorySpine()   # auto-memory
+        tokenizer = getattr(self.architect.model, "tokenizer", None)
+        self.mre = MarkovianReasoningEngine(
+            mre_config or MREConfig(state_path=str(DEFAULT_STATE_PATH)),
+            tokenizer=tokenizer,
+        )
 
-    def run(self, task: str) -> ReconcileResult:
+        # Per-brain max_tokens learned from the spine; see length_report().
+        self.length_policy = AdaptiveMaxTokens.from_spine(self.memory, tokenizer=tokenizer)
+        self.architect.length_policy = self.length_policy
+        self.oracle.length_policy = self.length_policy
+
+    def run(
+        self,
+        task: str,
+        should_stop: Optional[Callable[[], bool]] = None,
+        source: str = "c3_core",
+        carry_over: bool = True,
+    ) -> ReconcileResult:
         """
         High-level brain loop.
+
+        - should_stop: optional preemption check, forwarded to both brains
+          (checked every decode step). If it fires, TaskPreempted is raised.
+        - source: tag written into the spine meta (e.g. "idle_scheduler").
+        - carry_over: add the answer to the MRE summaries that feed the
+          next task's context. Background work (idle exploration) passes
+          False so it does not leak into the user's next prompt.
         """
 
-        # Architect thinks logically
-        arch_out = self.architect.think(task)
+        def _check_preempted() -> None:
+            if should_stop is not None and should_stop():
+                raise TaskPreempted(task)
+
+        # One emotion snapshot drives both brains' sampling; each brain
+        # reports the temperature it actually generated with (shared
+        # TemperaturePolicy), and that is what we hand to reconcile and log.
+        # Routing is not emotion-driven yet: reconcile keeps its neutral
+        # default emotions, so the choice only depends on confidence.
+        emotions = self.emotions.current_state()
+
+        # Most useful recent summaries, packed into the MRE token budget.
+        context = self.mre.build_context()
+
+        # Architect thinks logically; its token log-probs give us a
+        # real confidence signal instead of a constant.
+        arch_out, arch_temp, arch_conf = self.architect.think_with_confidence(
+            task, context=context, emotions=emotions, should_stop=should_stop
+        )
+        _check_preempted()
+        confidence = DEFAULT_CONFIDENCE if arch_conf is None else arch_conf
         self.memory.store(
             "architect_output",
-            {"task": task, "text": arch_out},
-            {"source": "c3_core"}
+            {"task": task, "text": arch_out, "confidence": arch_conf},
+            {"source": source}
         )
-
-        # Oracle thinks creatively
-        oracle_out = self.oracle.think(task)
-        self.memory.store(
-            "oracle_output",
-            {"task": task, "text": oracle_out},
-            {"source": "c3_core"}
+        temperatures = {"architect_temperature": arch_temp}
+
+        # reconcile's choice depends only on confidence + emotions, so a
+        # confident Architect that would win anyway makes the Oracle call
+        # pure cost.
+        skip_oracle = (
+            self.oracle_skip_confidence is not None
+            and confidence >= self.oracle_skip_confidence
+            and self.reconcile(confidence).choice == "architect"
         )
 
-        # Confidence: simplest stub for now (will be upgraded later)
-        confidence = 0.60
+        oracle_out = None
+        if not skip_oracle:
+            # Oracle thinks creatively
+            oracle_out, oracle_temp = self.oracle.think(
+                task, context=context, emotions=emotions, should_stop=should_stop
+            )
+            _check_preempted()
+            self.memory.store(
+                "oracle_output",
+                {"task": task, "text": oracle_out},
+                {"source": source}
+            )
+            temperatures["oracle_temperature"] = oracle_temp
 
         # Reconcile picks which brain leads
-        result: ReconcileResult = reconcile(
+        result: ReconcileResult = self.reconcile(
             architect_output=arch_out,
             oracle_output=oracle_out,
-            confidence=confidence
+            confidence=confidence,
+            temperatures=temperatures,
         )
 
         # Store reconcile final
@@ -62,14 +161,36 @@ class C3Core:
                 "task": task,
                 "choice": result.choice,
                 "text": result.final_text,
-                "emotions": result.emotions,
+                # The snapshot the temperatures came from (replay feeds it
+                # back), not reconcile's neutral routing emotions.
+                "emotions": emotions,
                 "temperatures": result.temperatures,
+                "confidence": confidence,
+                "oracle_skipped": skip_oracle,
             },
-            {"source": "c3_core"}
+            {"source": source}
         )
 
+        # Carry this step forward; confident answers are kept longer.
+        if carry_over:
+            self.mre.update_summary(result.final_text, importance=confidence)
+
         return result
 
+    def reconcile(self, *args, **kwargs) -> ReconcileResult:
+        """
+        reasoning.reconcile.reconcile(), as a method so it can be wrapped
+        per instance (core.replay times it per lane).
+        """
+        return reconcile(*args, **kwargs)
+
+    def length_report(self):
+        """
+        Adaptive max_tokens counters per brain (budget saved vs. the
+        static max_tokens, tokens generated, budget hits).
+        """
+        return self.length_policy.report()
+
 
 def main():
     import argparse
@@ -86,7 +207,7 @@ def main():
     print("Choice:", result.choice)
     print("Reason:", result.rationale)
     print("Final Output:", result.final_text)
-    print("Emotions:", result.emotions)
+    print("Emotions:", core.emotions.current_state())
     print("Temperatures:", result.temperatures)
     print()
 
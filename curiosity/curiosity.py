@@ -1,21 +1,28 @@
 """
-C.3 Curiosity Layer (v1)
+C.3 Curiosity Layer (v2)
 -----------------------
 This module manages C.3’s curiosity queue.
 It tracks unanswered questions, uncertain inputs,
 and “frontier areas” where C.3 wants to explore more.
 
-This is a simple, safe starter version:
-- Adds items to curiosity queue
-- Lets you pop the highest-priority item
-- Generates a frontier report (“what C.3 is unsure about”)
+v2 keeps the same public API as v1 but stores the queue in an
+indexed max-heap (curiosity/frontier.py):
+- Adds items to curiosity queue (one item per question)
+- Lets you pop the highest-priority item in O(log n)
+- Update an item's uncertainty or remove it by id in O(log n)
+- Generates a frontier report (“what C.3 is unsure about”) in O(1)
+- Optionally collapses near-duplicate questions (curiosity/lsh.py)
 """
 
 from dataclasses import dataclass, field
-from typing import List, Optional
+from itertools import islice
+from typing import Dict, List, Optional
 import time
 import uuid
 
+from curiosity.frontier import IndexedMaxHeap
+from curiosity.lsh import MinHashLSH
+
 
 @dataclass
 class CuriosityItem:
@@ -27,49 +34,169 @@ class CuriosityItem:
     notes: Optional[str] = None
 
 
+def _clip01(x: float) -> float:
+    return max(0.0, min(1.0, float(x)))
+
+
+def normalize_question(question: str) -> str:
+    """
+    Key used to decide whether two questions are "the same question".
+    Case and whitespace differences are ignored.
+    """
+    return " ".join(question.lower().split())
+
+
 class CuriosityLayer:
-    def __init__(self):
-        self.queue: List[CuriosityItem] = []
+    def __init__(self, near_duplicate_threshold: Optional[float] = None):
+        """
+        near_duplicate_threshold:
+            None  → only exact (normalized) duplicates are merged.
+            0–1   → also merge paraphrases whose estimated Jaccard
+                    similarity is at least this value.
+        """
+        self._heap: IndexedMaxHeap[CuriosityItem] = IndexedMaxHeap()
+        # id -> item, kept in insertion order for frontier examples
+        self._items: Dict[str, CuriosityItem] = {}
+        # normalized question -> id, so each question appears only once
+        self._by_question: Dict[str, str] = {}
+        self._lsh: Optional[MinHashLSH] = None
+        if near_duplicate_threshold is not None:
+            self._lsh = MinHashLSH(threshold=near_duplicate_threshold)
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    @property
+    def queue(self) -> List[CuriosityItem]:
+        """
+        Open items in insertion order (read-only snapshot, kept for v1 callers).
+        """
+        return list(self._items.values())
 
     def add_item(self, question: str, source: str = "system", uncertainty: float = 0.5, notes: str = None):
         """
         Add a curiosity question / unknown / frontier signal.
+
+        If the same question (or, with near-duplicate collapsing on, a
+        close paraphrase) is already open, no new item is created:
+        the existing item keeps the higher of the two uncertainties
+        and is returned.
         """
+        uncertainty = _clip01(uncertainty)
+        item_id = str(uuid.uuid4())
+
+        existing_id = self._by_question.get(normalize_question(question))
+        if existing_id is None and self._lsh is not None:
+            match = self._lsh.query_and_add(item_id, question)
+            if match is not None:
+                existing_id = match[0]
+
+        if existing_id is not None:
+            item = self._items[existing_id]
+            if uncertainty > item.uncertainty:
+                self.update_uncertainty(item.id, uncertainty)
+            return item
+
         item = CuriosityItem(
-            id=str(uuid.uuid4()),
+            id=item_id,
             question=question,
             source=source,
             timestamp=time.time(),
-            uncertainty=max(0.0, min(1.0, uncertainty)),
+            uncertainty=uncertainty,
             notes=notes
         )
-        self.queue.append(item)
+        return self._insert(item)
+
+    def _insert(self, item: CuriosityItem) -> CuriosityItem:
+        """
+        Put an already-built item on the queue (used by add_item and by
+        stores that restore items from disk). The caller is responsible
+        for making sure the question is not already open.
+        """
+        self._heap.push(item.id, item.uncertainty, item)
+        self._items[item.id] = item
+        self._by_question[normalize_question(item.question)] = item.id
+        if self._lsh is not None:
+            self._lsh.add(item.id, item.question)
+        return item
+
+    def get(self, item_id: str) -> Optional[CuriosityItem]:
+        """
+        Look up an open item by id.
+        """
+        return self._items.get(item_id)
+
+    def update_uncertainty(self, item_id: str, uncertainty: float) -> Optional[CuriosityItem]:
+        """
+        Change an open item's uncertainty in place.
+        Returns the item, or None if the id is unknown.
+        """
+        item = self._items.get(item_id)
+        if item is None:
+            return None
+        item.uncertainty = _clip01(uncertainty)
+        self._heap.update(item_id, item.uncertainty)
         return item
 
+    def remove(self, item_id: str) -> Optional[CuriosityItem]:
+        """
+        Drop an open item by id (e.g. it was answered elsewhere).
+        """
+        if self._heap.remove(item_id) is None:
+            return None
+        return self._forget(item_id)
+
+    def _forget(self, item_id: str) -> CuriosityItem:
+        item = self._items.pop(item_id)
+        del self._by_question[normalize_question(item.question)]
+        if self._lsh is not None:
+            self._lsh.remove(item_id)
+        return item
+
+    def find(self, question: str) -> Optional[CuriosityItem]:
+        """
+        Return the open item for `question` (normalized, or a near-duplicate
+        when collapsing is on), if any.
+        """
+        item_id = self._by_question.get(normalize_question(question))
+        if item_id is None and self._lsh is not None:
+            match = self._lsh.query(question)
+            if match is not None:
+                item_id = match[0]
+        return None if item_id is None else self._items[item_id]
+
+    def peek_highest_uncertainty(self) -> Optional[CuriosityItem]:
+        """
+        Return the item with the highest uncertainty without removing it.
+        """
+        top = self._heap.peek()
+        return None if top is None else top[2]
+
     def pop_highest_uncertainty(self) -> Optional[CuriosityItem]:
         """
         Return the item with the highest uncertainty.
         """
-        if not self.queue:
+        top = self._heap.pop()
+        if top is None:
             return None
-        self.queue.sort(key=lambda x: x.uncertainty, reverse=True)
-        return self.queue.pop(0)
+        return self._forget(top[0])
 
     def frontier_report(self):
         """
         Return a summary of the current frontier.
         """
-        if not self.queue:
+        top = self._heap.peek()
+        if top is None:
             return {
                 "count": 0,
                 "message": "No open curiosity items."
             }
-        highest = max(self.queue, key=lambda x: x.uncertainty)
+        highest = top[2]
         return {
-            "count": len(self.queue),
+            "count": len(self._heap),
             "highest_uncertainty_question": highest.question,
             "highest_uncertainty_score": highest.uncertainty,
-            "examples": [item.question for item in self.queue[:5]],
+            "examples": [item.question for item in islice(self._items.values(), 5)],
         }
 
 
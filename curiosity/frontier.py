@@ -0,0 +1,169 @@
+"""
+curiosity/frontier.py
+
+Indexed priority queue for C.3's curiosity frontier.
+
+The CuriosityLayer used to keep a plain list and re-sort it on every pop.
+This module replaces that with a binary max-heap plus an id → heap-slot
+index, so we can:
+
+- push / pop the most uncertain item in O(log n)
+- change an item's uncertainty in place in O(log n)
+- remove an item by id in O(log n)
+- peek at the top item and read the count in O(1)
+
+Ordering:
+- higher uncertainty first
+- ties go to the item that was pushed first (same as the old stable sort)
+"""
+
+from __future__ import annotations
+
+from typing import Dict, Generic, Iterator, List, Optional, Tuple, TypeVar
+
+
+T = TypeVar("T")
+
+
+class IndexedMaxHeap(Generic[T]):
+    """
+    Max-heap keyed by a string id.
+
+    Each slot holds (priority, seq, id, value). `seq` is a monotonically
+    increasing insertion counter used only to break ties.
+    """
+
+    def __init__(self) -> None:
+        self._heap: List[Tuple[float, int, str, T]] = []
+        self._pos: Dict[str, int] = {}
+        self._seq = 0
+
+    # --- basic container protocol ----------------------------------------
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._pos
+
+    def __iter__(self) -> Iterator[T]:
+        """
+        Iterate values in heap (not priority) order.
+        """
+        return (slot[3] for slot in self._heap)
+
+    # --- internal helpers -------------------------------------------------
+
+    def _higher(self, i: int, j: int) -> bool:
+        a = self._heap[i]
+        b = self._heap[j]
+        if a[0] != b[0]:
+            return a[0] > b[0]
+        return a[1] < b[1]
+
+    def _swap(self, i: int, j: int) -> None:
+        heap = self._heap
+        heap[i], heap[j] = heap[j], heap[i]
+        self._pos[heap[i][2]] = i
+        self._pos[heap[j][2]] = j
+
+    def _sift_up(self, i: int) -> None:
+        while i > 0:
+            parent = (i - 1) >> 1
+            if not self._higher(i, parent):
+                break
+            self._swap(i, parent)
+            i = parent
+
+    def _sift_down(self, i: int) -> None:
+        n = len(self._heap)
+        while True:
+            left = 2 * i + 1
+            if left >= n:
+                break
+            best = left
+            right = left + 1
+            if right < n and self._higher(right, left):
+                best = right
+            if not self._higher(best, i):
+                break
+            self._swap(i, best)
+            i = best
+
+    def _remove_at(self, i: int) -> Tuple[float, int, str, T]:
+        last = len(self._heap) - 1
+        if i != last:
+            self._swap(i, last)
+        slot = self._heap.pop()
+        del self._pos[slot[2]]
+        if i < len(self._heap):
+            self._sift_down(i)
+            self._sift_up(i)
+        return slot
+
+    # --- public API -------------------------------------------------------
+
+    def push(self, key: str, priority: float, value: T) -> None:
+        """
+        Insert a new entry. Raises KeyError if `key` is already present
+        (use update() for that).
+        """
+        if key in self._pos:
+            raise KeyError(f"Key already in heap: {key}")
+        self._heap.append((float(priority), self._seq, key, value))
+        self._seq += 1
+        i = len(self._heap) - 1
+        self._pos[key] = i
+        self._sift_up(i)
+
+    def peek(self) -> Optional[Tuple[str, float, T]]:
+        """
+        Return (key, priority, value) for the top entry without removing it.
+        """
+        if not self._heap:
+            return None
+        priority, _, key, value = self._heap[0]
+        return key, priority, value
+
+    def pop(self) -> Optional[Tuple[str, float, T]]:
+        """
+        Remove and return (key, priority, value) for the top entry.
+        """
+        if not self._heap:
+            return None
+        priority, _, key, value = self._remove_at(0)
+        return key, priority, value
+
+    def get(self, key: str) -> Optional[Tuple[float, T]]:
+        """
+        Return (priority, value) for `key`, or None if missing.
+        """
+        i = self._pos.get(key)
+        if i is None:
+            return None
+        priority, _, _, value = self._heap[i]
+        return priority, value
+
+    def update(self, key: str, priority: float, value: Optional[T] = None) -> None:
+        """
+        Change the priority (and optionally the value) of an existing entry.
+        The original insertion order is kept for tie-breaking.
+        """
+        i = self._pos[key]
+        old_priority, seq, _, old_value = self._heap[i]
+        priority = float(priority)
+        self._heap[i] = (priority, seq, key, old_value if value is None else value)
+        if priority > old_priority:
+            self._sift_up(i)
+        elif priority < old_priority:
+            self._sift_down(i)
+
+    def remove(self, key: str) -> Optional[Tuple[float, T]]:
+        """
+        Remove an entry by key. Returns (priority, value) or None if missing.
+        """
+        i = self._pos.get(key)
+        if i is None:
+            return None
+        priority, _, _, value = self._remove_at(i)
+        return priority, value
@@ -0,0 +1,205 @@
+"""
+curiosity/lsh.py
+
+MinHash + LSH index for spotting near-duplicate curiosity questions.
+
+Automated sources tend to add the same question many times with small
+wording changes ("How do I speed up reconcile?" / "how can we speed up
+reconcile"). Exact-key dedupe misses those, so CuriosityLayer can use
+this index to collapse them on insert.
+
+How it works:
+- Normalize the question (lowercase, drop punctuation, squash spaces)
+  and cut it into overlapping character shingles.
+- Build a MinHash signature of `num_perm` values. We use one-permutation
+  hashing (hash each shingle once, bucket it into one of `num_perm` bins,
+  keep the bin minimum, fill empty bins from their right neighbour) so a
+  signature costs O(shingles + num_perm) instead of O(shingles × num_perm).
+- Split the signature into `bands` × `rows`; questions that share any
+  whole band land in the same bucket and become candidates.
+- Candidates are confirmed by their estimated Jaccard similarity
+  (fraction of equal signature slots) against `threshold`.
+
+Insert / query cost is O(num_perm + shingles + bucket hits), independent
+of how many questions are indexed.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import re
+from typing import Dict, List, Optional, Set, Tuple
+
+
+_NON_WORD = re.compile(r"[^a-z0-9 ]+")
+
+
+def _normalize(text: str) -> str:
+    return " ".join(_NON_WORD.sub(" ", text.lower()).split())
+
+
+def shingles(text: str, size: int = 4) -> Set[str]:
+    """
+    Overlapping character shingles of the normalized text.
+    """
+    norm = _normalize(text)
+    if len(norm) <= size:
+        return {norm}
+    return {norm[i:i + size] for i in range(len(norm) - size + 1)}
+
+
+def _pick_bands(threshold: float, num_perm: int) -> Tuple[int, int]:
+    """
+    Choose (bands, rows) so the LSH S-curve midpoint (1/b)^(1/r)
+    sits as close as possible to `threshold`.
+    """
+    best = (1, num_perm)
+    best_err = float("inf")
+    for rows in range(1, num_perm + 1):
+        bands = num_perm // rows
+        if bands < 1:
+            break
+        err = abs((1.0 / bands) ** (1.0 / rows) - threshold)
+        if err < best_err:
+            best = (bands, rows)
+            best_err = err
+    return best
+
+
+class MinHashLSH:
+    """
+    Near-duplicate index keyed by item id.
+
+    - threshold: estimated Jaccard similarity needed to call two
+      questions duplicates (0–1, higher = stricter)
+    - num_perm: signature length (more = more accurate, slower)
+    - shingle_size: characters per shingle
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.7,
+        num_perm: int = 64,
+        shingle_size: int = 4,
+        seed: int = 1,
+    ) -> None:
+        if not 0.0 < threshold <= 1.0:
+            raise ValueError("threshold must be in (0, 1]")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.bands, self.rows = _pick_bands(threshold, num_perm)
+
+        self._key = seed.to_bytes(8, "little")
+
+        self._signatures: Dict[str, Tuple[int, ...]] = {}
+        self._buckets: List[Dict[int, Set[str]]] = [dict() for _ in range(self.bands)]
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._signatures
+
+    # --- signatures -------------------------------------------------------
+
+    def signature(self, text: str) -> Tuple[int, ...]:
+        n = self.num_perm
+        empty = -1
+        bins = [empty] * n
+        key = self._key
+        for sh in shingles(text, self.shingle_size):
+            h = int.from_bytes(
+                hashlib.blake2b(sh.encode("utf-8"), digest_size=8, key=key).digest(),
+                "little",
+            )
+            slot, value = h % n, h // n
+            if bins[slot] == empty or value < bins[slot]:
+                bins[slot] = value
+
+        # Densify: an empty bin borrows the value of the next filled bin
+        # (circularly), tagged with the distance so borrowed values from
+        # different bins do not collide by accident.
+        filled = [i for i in range(n) if bins[i] != empty]
+        if len(filled) < n:
+            nxt = filled[0] + n
+            for i in range(n - 1, -1, -1):
+                if bins[i] != empty:
+                    nxt = i
+                else:
+                    src = nxt % n
+                    bins[i] = (bins[src] << 8) | ((nxt - i) & 0xFF)
+        return tuple(bins)
+
+    def _band_keys(self, sig: Tuple[int, ...]) -> List[int]:
+        r = self.rows
+        return [hash(sig[i * r:(i + 1) * r]) for i in range(self.bands)]
+
+    @staticmethod
+    def similarity(a: Tuple[int, ...], b: Tuple[int, ...]) -> float:
+        """
+        Estimated Jaccard similarity of two signatures.
+        """
+        same = sum(1 for x, y in zip(a, b) if x == y)
+        return same / len(a)
+
+    # --- public API -------------------------------------------------------
+
+    def query(self, text: str) -> Optional[Tuple[str, float]]:
+        """
+        Return (id, similarity) of the closest indexed near-duplicate of
+        `text` at or above threshold, or None.
+        """
+        return self._best_match(self.signature(text))
+
+    def add(self, key: str, text: str) -> None:
+        """
+        Index `text` under `key`. Re-adding an indexed key is a no-op.
+        """
+        if key in self._signatures:
+            return
+        sig = self.signature(text)
+        self._signatures[key] = sig
+        for band, bucket_key in enumerate(self._band_keys(sig)):
+            self._buckets[band].setdefault(bucket_key, set()).add(key)
+
+    def query_and_add(self, key: str, text: str) -> Optional[Tuple[str, float]]:
+        """
+        One-pass variant of query() + add(): if a near-duplicate exists,
+        return it and leave the index untouched; otherwise index `text`
+        under `key` and return None.
+        """
+        sig = self.signature(text)
+        match = self._best_match(sig)
+        if match is not None:
+            return match
+        self._signatures[key] = sig
+        for band, bucket_key in enumerate(self._band_keys(sig)):
+            self._buckets[band].setdefault(bucket_key, set()).add(key)
+        return None
+
+    def remove(self, key: str) -> None:
+        sig = self._signatures.pop(key, None)
+        if sig is None:
+            return
+        for band, bucket_key in enumerate(self._band_keys(sig)):
+            bucket = self._buckets[band].get(bucket_key)
+            if bucket is None:
+                continue
+            bucket.discard(key)
+            if not bucket:
+                del self._buckets[band][bucket_key]
+
+    def _best_match(self, sig: Tuple[int, ...]) -> Optional[Tuple[str, float]]:
+        candidates: Set[str] = set()
+        for band, bucket_key in enumerate(self._band_keys(sig)):
+            bucket = self._buckets[band].get(bucket_key)
+            if bucket:
+                candidates.update(bucket)
+
+        best: Optional[Tuple[str, float]] = None
+        for key in candidates:
+            sim = self.similarity(sig, self._signatures[key])
+            if sim >= self.threshold and (best is None or sim > best[1]):
+                best = (key, sim)
+        return best
@@ -19,6 +19,8 @@ from __future__ import annotations
 from dataclasses import dataclass
 from typing import Dict, Literal, Tuple
 
+from curiosity.task_classifier import default_classifier
+
 
 Chemicals = Dict[str, float]
 MotivationMode = Literal["explore", "exploit", "idle"]
@@ -140,33 +142,10 @@ def simple_context_from_task(task: str) -> Dict[str, float]:
     Tiny helper to infer a rough context from a plain-text task string.
     This will be replaced later by a smarter classifier.
 
-    Heuristics:
+    Heuristics (see curiosity/task_classifier.py for the full rule table;
+    keywords match whole words, so "know" no longer counts as "now"):
       - "debug", "error"  → high difficulty, high urgency
       - "learn", "explore" → high novelty
       - "friend", "relationship" → high social_relevance
     """
-    t = task.lower()
-
-    novelty = 0.0
-    difficulty = 0.2
-    user_urgency = 0.1
-    social_relevance = 0.0
-
-    if any(k in t for k in ["learn", "explore", "new", "unknown"]):
-        novelty = 0.8
-    if any(k in t for k in ["debug", "error", "bug", "fix"]):
-        difficulty = 0.8
-        user_urgency = 0.9
-    if any(k in t for k in ["urgent", "asap", "now", "deadline"]):
-        user_urgency = 0.9
-    if any(k in t for k in ["friend", "relationship", "social", "family"]):
-        social_relevance = 0.8
-
-    return {
-        "novelty": novelty,
-        "difficulty": difficulty,
-        "user_urgency": user_urgency,
-        "social_relevance": social_relevance,
-        "recent_success": 0.0,
-        "recent_failure": 0.0,
-    }
+    return default_classifier.classify(task)
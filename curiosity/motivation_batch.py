@@ -0,0 +1,305 @@
+"""
+curiosity/motivation_batch.py
+
+Vectorized (NumPy) version of the Intrinsic Motivation Engine v0.1.
+
+curiosity.motivation.update_chemicals() updates one chemical dict per
+call. That is fine for live use, but tuning its coefficients means
+simulating millions of context sequences. This module runs the exact
+same update rules over whole arrays:
+
+- update_chemicals_batch(contexts (N, 6), chemicals (N, 4))
+      -> BatchMotivationResult(chemicals (N, 4), scores (N,), modes (N,))
+- simulate_trajectories(contexts (T, N, 6), chemicals (N, 4))
+      -> runs T steps, carrying chemicals forward
+- check_against_scalar(...)
+      -> random inputs through both paths; results must match exactly
+
+Column order follows the dicts used by the scalar engine:
+    CONTEXT_KEYS  = novelty, difficulty, user_urgency,
+                    recent_success, recent_failure, social_relevance
+    CHEMICAL_KEYS = dopamine, serotonin, norepinephrine, oxytocin
+
+Modes come back as small ints; MODE_NAMES[code] gives the string.
+
+The arithmetic is written in the same order as the scalar version
+(float64 throughout), so results are bit-for-bit identical, not just
+close.
+
+Run the equivalence check + a quick throughput number:
+
+    python3 -m curiosity.motivation_batch --n 1000000
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from curiosity.motivation import (
+    Chemicals,
+    MotivationResult,
+    default_chemicals,
+    update_chemicals,
+)
+
+
+CONTEXT_KEYS: Tuple[str, ...] = (
+    "novelty",
+    "difficulty",
+    "user_urgency",
+    "recent_success",
+    "recent_failure",
+    "social_relevance",
+)
+CHEMICAL_KEYS: Tuple[str, ...] = (
+    "dopamine",
+    "serotonin",
+    "norepinephrine",
+    "oxytocin",
+)
+MODE_NAMES: Tuple[str, ...] = ("idle", "explore", "exploit")
+MODE_IDLE, MODE_EXPLORE, MODE_EXPLOIT = 0, 1, 2
+
+
+@dataclass
+class BatchMotivationResult:
+    chemicals: np.ndarray  # (N, 4) float64, CHEMICAL_KEYS order
+    scores: np.ndarray     # (N,) float64
+    modes: np.ndarray      # (N,) int8, index into MODE_NAMES
+
+    def mode_names(self) -> List[str]:
+        return [MODE_NAMES[m] for m in self.modes.tolist()]
+
+    def row(self, i: int) -> MotivationResult:
+        """
+        Row i as the scalar engine's MotivationResult.
+        """
+        return MotivationResult(
+            chemicals=dict(zip(CHEMICAL_KEYS, self.chemicals[i].tolist())),
+            score=float(self.scores[i]),
+            mode=MODE_NAMES[int(self.modes[i])],  # type: ignore[arg-type]
+        )
+
+
+@dataclass
+class TrajectoryResult:
+    final_chemicals: np.ndarray     # (N, 4)
+    chemicals: Optional[np.ndarray]  # (T, N, 4) when keep_history=True
+    scores: np.ndarray              # (T, N)
+    modes: np.ndarray               # (T, N) int8
+
+    def mode_counts(self) -> Dict[str, np.ndarray]:
+        """
+        Per step, how many trajectories were in each mode -> {name: (T,)}.
+        """
+        return {
+            name: (self.modes == code).sum(axis=1)
+            for code, name in enumerate(MODE_NAMES)
+        }
+
+
+# --- conversion helpers ----------------------------------------------------
+
+def contexts_to_array(contexts: Sequence[Dict[str, float]]) -> np.ndarray:
+    """
+    List of context dicts -> (N, 6) array (missing keys = 0.0, as in
+    the scalar engine).
+    """
+    return np.array(
+        [[float(c.get(k, 0.0)) for k in CONTEXT_KEYS] for c in contexts],
+        dtype=np.float64,
+    ).reshape(len(contexts), len(CONTEXT_KEYS))
+
+
+def chemicals_to_array(chemicals: Sequence[Optional[Chemicals]]) -> np.ndarray:
+    """
+    List of chemical dicts -> (N, 4) array (None = default_chemicals(),
+    missing keys = 0.5, as in the scalar engine).
+    """
+    rows = []
+    for c in chemicals:
+        if c is None:
+            c = default_chemicals()
+        rows.append([float(c.get(k, 0.5)) for k in CHEMICAL_KEYS])
+    return np.array(rows, dtype=np.float64).reshape(len(rows), len(CHEMICAL_KEYS))
+
+
+def default_chemicals_array(n: int) -> np.ndarray:
+    base = default_chemicals()
+    return np.tile(
+        np.array([base[k] for k in CHEMICAL_KEYS], dtype=np.float64), (n, 1)
+    )
+
+
+# --- core update ----------------------------------------------------------
+
+def _clip01(x: np.ndarray) -> np.ndarray:
+    # Same order as the scalar max(0.0, min(1.0, x)).
+    return np.maximum(0.0, np.minimum(1.0, x))
+
+
+def update_chemicals_batch(
+    contexts: np.ndarray,
+    chemicals: Optional[np.ndarray] = None,
+) -> BatchMotivationResult:
+    """
+    Vectorized update_chemicals() over N rows.
+
+    contexts:  (N, 6) in CONTEXT_KEYS order
+    chemicals: (N, 4) in CHEMICAL_KEYS order, or None for the neutral
+               baseline. The input array is never modified.
+    """
+    ctx = np.asarray(contexts, dtype=np.float64)
+    if ctx.ndim != 2 or ctx.shape[1] != len(CONTEXT_KEYS):
+        raise ValueError(f"contexts must have shape (N, {len(CONTEXT_KEYS)}), got {ctx.shape}")
+    n = ctx.shape[0]
+
+    if chemicals is None:
+        chem = default_chemicals_array(n)
+    else:
+        chem = np.asarray(chemicals, dtype=np.float64)
+        if chem.shape != (n, len(CHEMICAL_KEYS)):
+            raise ValueError(
+                f"chemicals must have shape ({n}, {len(CHEMICAL_KEYS)}), got {chem.shape}"
+            )
+
+    novelty = ctx[:, 0]
+    difficulty = ctx[:, 1]
+    user_urgency = ctx[:, 2]
+    recent_success = ctx[:, 3]
+    recent_failure = ctx[:, 4]
+    social_relevance = ctx[:, 5]
+
+    # Copies, so the caller's array is untouched.
+    dopa = chem[:, 0].copy()
+    sero = chem[:, 1].copy()
+    nore = chem[:, 2].copy()
+    oxty = chem[:, 3].copy()
+
+    # Keep the exact operation order of curiosity.motivation.update_chemicals.
+    dopa += 0.3 * novelty
+    dopa += 0.2 * recent_success
+    dopa -= 0.2 * recent_failure
+
+    sero += 0.1 * recent_success
+    sero -= 0.2 * recent_failure
+    sero -= 0.1 * np.maximum(0.0, difficulty - 0.7)
+
+    nore += 0.3 * user_urgency
+    nore += 0.2 * difficulty
+    nore -= 0.1 * sero  # unclipped serotonin, as in the scalar engine
+
+    oxty += 0.3 * social_relevance
+    oxty -= 0.1 * recent_failure
+
+    out = np.empty((n, len(CHEMICAL_KEYS)), dtype=np.float64)
+    out[:, 0] = _clip01(dopa)
+    out[:, 1] = _clip01(sero)
+    out[:, 2] = _clip01(nore)
+    out[:, 3] = _clip01(oxty)
+
+    scores = 0.6 * out[:, 0] + 0.4 * out[:, 2]
+
+    modes = np.where(out[:, 0] >= out[:, 2], MODE_EXPLORE, MODE_EXPLOIT).astype(np.int8)
+    modes[scores < 0.25] = MODE_IDLE
+
+    return BatchMotivationResult(chemicals=out, scores=scores, modes=modes)
+
+
+def simulate_trajectories(
+    contexts: np.ndarray,
+    chemicals: Optional[np.ndarray] = None,
+    keep_history: bool = True,
+) -> TrajectoryResult:
+    """
+    Run T update steps for N independent trajectories.
+
+    contexts:  (T, N, 6) — the context each trajectory sees at each step
+    chemicals: (N, 4) starting state (None = neutral baseline)
+    keep_history: also return every intermediate (T, N, 4) chemical
+                  state; turn off for very large sweeps to save memory.
+    """
+    ctx = np.asarray(contexts, dtype=np.float64)
+    if ctx.ndim != 3 or ctx.shape[2] != len(CONTEXT_KEYS):
+        raise ValueError(f"contexts must have shape (T, N, {len(CONTEXT_KEYS)}), got {ctx.shape}")
+    steps, n = ctx.shape[0], ctx.shape[1]
+
+    chem = default_chemicals_array(n) if chemicals is None else np.asarray(chemicals, dtype=np.float64)
+    history = np.empty((steps, n, len(CHEMICAL_KEYS))) if keep_history else None
+    scores = np.empty((steps, n))
+    modes = np.empty((steps, n), dtype=np.int8)
+
+    for t in range(steps):
+        res = update_chemicals_batch(ctx[t], chem)
+        chem = res.chemicals
+        if history is not None:
+            history[t] = chem
+        scores[t] = res.scores
+        modes[t] = res.modes
+
+    return TrajectoryResult(final_chemicals=chem, chemicals=history, scores=scores, modes=modes)
+
+
+# --- equivalence check ----------------------------------------------------
+
+def random_inputs(n: int, seed: int = 0) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Random (contexts, chemicals) pairs, including exact 0/1 edges and
+    out-of-range values so clipping and the idle cut-off get exercised.
+    """
+    rng = np.random.default_rng(seed)
+    contexts = rng.uniform(-0.2, 1.2, size=(n, len(CONTEXT_KEYS)))
+    chemicals = rng.uniform(0.0, 1.0, size=(n, len(CHEMICAL_KEYS)))
+    edges = rng.random(size=contexts.shape) < 0.1
+    contexts[edges] = rng.integers(0, 2, size=int(edges.sum()))
+    return contexts, chemicals
+
+
+def check_against_scalar(n: int = 10_000, seed: int = 0) -> int:
+    """
+    Push `n` random rows through both the scalar and the batch engine.
+    Returns the number of mismatching rows (0 means exact agreement).
+    """
+    contexts, chemicals = random_inputs(n, seed)
+    batch = update_chemicals_batch(contexts, chemicals)
+
+    mismatches = 0
+    for i in range(n):
+        ref = update_chemicals(
+            chemicals=dict(zip(CHEMICAL_KEYS, chemicals[i].tolist())),
+            context=dict(zip(CONTEXT_KEYS, contexts[i].tolist())),
+        )
+        got = batch.row(i)
+        if got.chemicals != ref.chemicals or got.score != ref.score or got.mode != ref.mode:
+            mismatches += 1
+    return mismatches
+
+
+def main() -> None:
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Batched motivation engine check + throughput")
+    parser.add_argument("--n", type=int, default=1_000_000, help="Rows for the throughput run")
+    parser.add_argument("--check", type=int, default=10_000, help="Rows for the scalar equivalence check")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    bad = check_against_scalar(args.check, args.seed)
+    print(f"Scalar equivalence: {args.check - bad}/{args.check} rows identical")
+
+    contexts, chemicals = random_inputs(args.n, args.seed + 1)
+    start = time.perf_counter()
+    update_chemicals_batch(contexts, chemicals)
+    elapsed = time.perf_counter() - start
+    print(f"Batch update: {args.n} rows in {elapsed:.3f}s ({args.n / elapsed:,.0f} rows/s)")
+
+    if bad:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,512 @@
+"""
+curiosity/store.py
+
+Durable curiosity frontier for C.3.
+
+CuriosityLayer only lives in memory, so every restart used to lose the
+frontier. CuriosityStore wraps a CuriosityLayer and makes it crash-safe:
+
+- Every mutation (add / update / remove / pop) is appended to an
+  operation log (ops.jsonl) before it is acknowledged.
+- Every `snapshot_every` operations the in-memory items are written to
+  snapshot.json (atomic tmp + rename) and the log is reset.
+- Loading = read the snapshot, then replay only the log tail whose
+  `seq` is newer than the snapshot.
+
+Bounded memory mode (max_in_memory=N):
+- When more than N items are resident, the lowest-uncertainty items are
+  paged out to "cold" segment files (seg-XXXXXXXX.jsonl), page_size at
+  a time.
+- Only ids, question keys and per-segment max uncertainty stay in RAM.
+- Whenever a cold segment holds something more uncertain than the hot
+  top, that segment is paged back in before popping / reporting.
+
+Near-duplicate collapsing (near_duplicate_threshold) uses one MinHashLSH
+index over hot and cold items, so paraphrases of a paged-out question
+are still merged.
+
+Log operations are absolute (set uncertainty to X, remove id Y), so
+replaying a tail that partly overlaps newer segment files is harmless.
+
+Layout on disk (default: curiosity/frontier_store/):
+    snapshot.json
+    ops.jsonl
+    seg-00000001.jsonl ...
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import time
+import uuid
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from curiosity.curiosity import CuriosityItem, CuriosityLayer, _clip01, normalize_question
+from curiosity.frontier import IndexedMaxHeap
+from curiosity.lsh import MinHashLSH
+
+
+DEFAULT_STORE_DIR = Path(__file__).with_name("frontier_store")
+
+SNAPSHOT_NAME = "snapshot.json"
+LOG_NAME = "ops.jsonl"
+SEGMENT_GLOB = "seg-*.jsonl"
+
+
+@dataclass
+class CuriosityStoreConfig:
+    """
+    Config for CuriosityStore.
+
+    - root: directory for snapshot / log / segments (None → DEFAULT_STORE_DIR)
+    - snapshot_every: ops between automatic snapshots (0 = only on demand)
+    - max_in_memory: resident item limit (None = keep everything in RAM)
+    - page_size: how many items move to / from disk at a time
+    - fsync: fsync the log after every op (slower, survives power loss)
+    - near_duplicate_threshold: merge paraphrases at this estimated
+      Jaccard similarity (None = exact duplicates only)
+    """
+
+    root: Optional[str] = None
+    snapshot_every: int = 1000
+    max_in_memory: Optional[int] = None
+    page_size: int = 1024
+    fsync: bool = False
+    near_duplicate_threshold: Optional[float] = None
+
+
+def _item_from_dict(data: Dict[str, Any]) -> CuriosityItem:
+    return CuriosityItem(
+        id=data["id"],
+        question=data["question"],
+        source=data.get("source", "system"),
+        timestamp=float(data.get("timestamp", 0.0)),
+        uncertainty=_clip01(data.get("uncertainty", 0.5)),
+        notes=data.get("notes"),
+    )
+
+
+def _read_jsonl(path: Path) -> List[Dict[str, Any]]:
+    """
+    Read a JSONL file, skipping blank or torn lines (e.g. a crash
+    mid-append leaves a partial last line).
+    """
+    if not path.exists():
+        return []
+    rows: List[Dict[str, Any]] = []
+    with path.open("r", encoding="utf-8") as f:
+        for raw in f:
+            raw = raw.strip()
+            if not raw:
+                continue
+            try:
+                rows.append(json.loads(raw))
+            except json.JSONDecodeError:
+                continue
+    return rows
+
+
+def _atomic_write(path: Path, text: str) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    with tmp.open("w", encoding="utf-8") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def _truncate_torn_tail(path: Path) -> None:
+    """
+    Cut a partial last line (crash mid-append) off a JSONL file, so the
+    next append starts on a fresh line instead of merging into it.
+    """
+    if not path.exists():
+        return
+    with path.open("r+b") as f:
+        size = f.seek(0, os.SEEK_END)
+        if size == 0:
+            return
+        f.seek(size - 1)
+        if f.read(1) == b"\n":
+            return
+        end = size
+        while end > 0:
+            start = max(0, end - 65536)
+            f.seek(start)
+            nl = f.read(end - start).rfind(b"\n")
+            if nl >= 0:
+                f.truncate(start + nl + 1)
+                return
+            end = start
+        f.truncate(0)
+
+
+class CuriosityStore:
+    """
+    Persistent curiosity frontier with the same API as CuriosityLayer:
+    add_item / get / update_uncertainty / remove /
+    pop_highest_uncertainty / frontier_report.
+    """
+
+    def __init__(self, config: Optional[CuriosityStoreConfig] = None) -> None:
+        if config is None:
+            config = CuriosityStoreConfig()
+        if config.max_in_memory is not None and config.page_size > config.max_in_memory:
+            raise ValueError("page_size must not exceed max_in_memory")
+        self.config = config
+
+        self.root = Path(config.root) if config.root else DEFAULT_STORE_DIR
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.snapshot_path = self.root / SNAPSHOT_NAME
+        self.log_path = self.root / LOG_NAME
+
+        # Hot (resident) items + a mirror heap keyed on -uncertainty so we
+        # can find the least uncertain items to page out in O(log n).
+        self.hot = CuriosityLayer()
+        self._low: IndexedMaxHeap[None] = IndexedMaxHeap()
+        self._lsh: Optional[MinHashLSH] = None
+        if config.near_duplicate_threshold is not None:
+            self._lsh = MinHashLSH(threshold=config.near_duplicate_threshold)
+
+        # Cold (paged-out) bookkeeping.
+        self._cold_seg: Dict[str, int] = {}          # item id -> segment number
+        self._cold_by_question: Dict[str, str] = {}  # question key -> item id
+        self._segments: Dict[int, Dict[str, float]] = {}  # seg -> {"max", "count"}
+        self._next_segment = 1
+
+        self._seq = 0
+        self._ops_since_snapshot = 0
+        self._replaying = False
+        self._log_file = None
+
+        self._load()
+
+    # --- public API -------------------------------------------------------
+
+    def __len__(self) -> int:
+        return len(self.hot) + len(self._cold_seg)
+
+    def add_item(self, question: str, source: str = "system", uncertainty: float = 0.5, notes: str = None):
+        """
+        Add a curiosity question. Same dedupe rule as CuriosityLayer:
+        an already-open question keeps the higher uncertainty.
+        """
+        uncertainty = _clip01(uncertainty)
+        existing = self._find(question)
+        if existing is not None:
+            if uncertainty > existing.uncertainty:
+                return self.update_uncertainty(existing.id, uncertainty)
+            return existing
+
+        item = CuriosityItem(
+            id=str(uuid.uuid4()),
+            question=question,
+            source=source,
+            timestamp=time.time(),
+            uncertainty=uncertainty,
+            notes=notes,
+        )
+        self._log({"op": "add", "item": asdict(item)})
+        self._insert_hot(item)
+        self._after_op()
+        return item
+
+    def get(self, item_id: str) -> Optional[CuriosityItem]:
+        item = self.hot.get(item_id)
+        if item is not None:
+            return item
+        seg = self._cold_seg.get(item_id)
+        if seg is None:
+            return None
+        for cold in self._read_segment(seg):
+            if cold.id == item_id:
+                return cold
+        return None
+
+    def update_uncertainty(self, item_id: str, uncertainty: float) -> Optional[CuriosityItem]:
+        uncertainty = _clip01(uncertainty)
+        if item_id not in self.hot._items and item_id not in self._cold_seg:
+            return None
+        self._log({"op": "update", "id": item_id, "uncertainty": uncertainty})
+        item = self._apply_update(item_id, uncertainty)
+        self._after_op()
+        return item
+
+    def remove(self, item_id: str) -> Optional[CuriosityItem]:
+        if item_id not in self.hot._items and item_id not in self._cold_seg:
+            return None
+        self._log({"op": "remove", "id": item_id})
+        item = self._apply_remove(item_id)
+        self._after_op()
+        return item
+
+    def pop_highest_uncertainty(self) -> Optional[CuriosityItem]:
+        self._ensure_top()
+        top = self.hot.peek_highest_uncertainty()
+        if top is None:
+            return None
+        self._log({"op": "pop", "id": top.id})
+        item = self._apply_remove(top.id)
+        self._after_op()
+        return item
+
+    def frontier_report(self) -> Dict[str, Any]:
+        self._ensure_top()
+        report = self.hot.frontier_report()
+        if self._cold_seg:
+            report["count"] = len(self)
+            report["paged_out"] = len(self._cold_seg)
+        return report
+
+    def snapshot(self) -> None:
+        """
+        Write all resident items to snapshot.json and reset the op log.
+        Cold segments are already durable, so they are not copied.
+        """
+        payload = {
+            "seq": self._seq,
+            "items": [asdict(item) for item in self.hot._items.values()],
+        }
+        _atomic_write(self.snapshot_path, json.dumps(payload, ensure_ascii=False))
+
+        # Ops up to self._seq are covered by the snapshot; start a new log.
+        self._close_log()
+        _atomic_write(self.log_path, "")
+        self._ops_since_snapshot = 0
+
+    def close(self) -> None:
+        self._close_log()
+
+    # --- loading ----------------------------------------------------------
+
+    def _load(self) -> None:
+        # 1) cold segments are authoritative for the ids they contain
+        for path in sorted(self.root.glob(SEGMENT_GLOB)):
+            try:
+                seg = int(path.stem.split("-", 1)[1])
+            except (IndexError, ValueError):
+                continue
+            items = self._read_segment(seg)
+            if not items:
+                path.unlink()
+                continue
+            self._register_segment(seg, items)
+            self._next_segment = max(self._next_segment, seg + 1)
+
+        # 2) snapshot of resident items
+        snap_seq = 0
+        if self.snapshot_path.exists():
+            try:
+                snap = json.loads(self.snapshot_path.read_text(encoding="utf-8"))
+            except json.JSONDecodeError:
+                snap = {}
+            snap_seq = int(snap.get("seq", 0))
+            for data in snap.get("items", []):
+                item = _item_from_dict(data)
+                if item.id in self._cold_seg or self._find(item.question) is not None:
+                    continue
+                self._insert_hot(item)
+        self._seq = snap_seq
+
+        # 3) replay the log tail (dropping a torn last op first: _log appends
+        #    to this file, and an op glued onto a partial line would be lost)
+        _truncate_torn_tail(self.log_path)
+        replayed = 0
+        self._replaying = True
+        try:
+            for op in _read_jsonl(self.log_path):
+                seq = int(op.get("seq", 0))
+                if seq <= snap_seq:
+                    continue
+                self._replay(op)
+                self._seq = max(self._seq, seq)
+                replayed += 1
+        finally:
+            self._replaying = False
+
+        # Fold the replayed tail into a fresh snapshot so the next load is fast.
+        if replayed:
+            self.snapshot()
+
+    def _replay(self, op: Dict[str, Any]) -> None:
+        kind = op.get("op")
+        if kind in ("add", "restore"):
+            rows = [op["item"]] if kind == "add" else op.get("items", [])
+            for data in rows:
+                item = _item_from_dict(data)
+                if item.id in self.hot._items or item.id in self._cold_seg:
+                    continue
+                self._insert_hot(item)
+        elif kind == "update":
+            if op["id"] in self.hot._items or op["id"] in self._cold_seg:
+                self._apply_update(op["id"], _clip01(op["uncertainty"]))
+        elif kind in ("remove", "pop"):
+            if op["id"] in self.hot._items or op["id"] in self._cold_seg:
+                self._apply_remove(op["id"])
+
+    # --- op log -----------------------------------------------------------
+
+    def _log(self, op: Dict[str, Any]) -> None:
+        if self._replaying:
+            return
+        self._seq += 1
+        op = {"seq": self._seq, **op}
+        if self._log_file is None:
+            self._log_file = self.log_path.open("a", encoding="utf-8")
+        self._log_file.write(json.dumps(op, ensure_ascii=False) + "\n")
+        self._log_file.flush()
+        if self.config.fsync:
+            os.fsync(self._log_file.fileno())
+
+    def _close_log(self) -> None:
+        if self._log_file is not None:
+            self._log_file.close()
+            self._log_file = None
+
+    def _after_op(self) -> None:
+        self._ops_since_snapshot += 1
+        every = self.config.snapshot_every
+        if every and self._ops_since_snapshot >= every:
+            self.snapshot()
+
+    # --- mutations (no logging) ------------------------------------------
+
+    def _find(self, question: str) -> Optional[CuriosityItem]:
+        item = self.hot.find(question)
+        if item is not None:
+            return item
+        item_id = self._cold_by_question.get(normalize_question(question))
+        if item_id is None and self._lsh is not None:
+            match = self._lsh.query(question)
+            if match is not None:
+                item_id = match[0]
+        return None if item_id is None else self.get(item_id)
+
+    def _insert_hot(self, item: CuriosityItem) -> None:
+        self.hot._insert(item)
+        if self._lsh is not None:
+            self._lsh.add(item.id, item.question)
+        self._low.push(item.id, -item.uncertainty, None)
+        self._maybe_page_out()
+
+    def _apply_update(self, item_id: str, uncertainty: float) -> Optional[CuriosityItem]:
+        if item_id in self.hot._items:
+            self._low.update(item_id, -uncertainty)
+            return self.hot.update_uncertainty(item_id, uncertainty)
+
+        seg = self._cold_seg[item_id]
+        items = self._read_segment(seg)
+        found = None
+        for item in items:
+            if item.id == item_id:
+                item.uncertainty = uncertainty
+                found = item
+        self._write_segment(seg, items)
+        return found
+
+    def _apply_remove(self, item_id: str) -> Optional[CuriosityItem]:
+        if self._lsh is not None:
+            self._lsh.remove(item_id)
+        if item_id in self.hot._items:
+            self._low.remove(item_id)
+            return self.hot.remove(item_id)
+
+        seg = self._cold_seg.pop(item_id)
+        items = self._read_segment(seg)
+        found = next((i for i in items if i.id == item_id), None)
+        if found is not None:
+            self._cold_by_question.pop(normalize_question(found.question), None)
+        self._write_segment(seg, [i for i in items if i.id != item_id])
+        return found
+
+    # --- paging -----------------------------------------------------------
+
+    def _segment_path(self, seg: int) -> Path:
+        return self.root / f"seg-{seg:08d}.jsonl"
+
+    def _read_segment(self, seg: int) -> List[CuriosityItem]:
+        return [_item_from_dict(row) for row in _read_jsonl(self._segment_path(seg))]
+
+    def _write_segment(self, seg: int, items: List[CuriosityItem]) -> None:
+        path = self._segment_path(seg)
+        if not items:
+            self._segments.pop(seg, None)
+            if path.exists():
+                path.unlink()
+            return
+        text = "".join(json.dumps(asdict(i), ensure_ascii=False) + "\n" for i in items)
+        _atomic_write(path, text)
+        self._segments[seg] = {
+            "max": max(i.uncertainty for i in items),
+            "count": len(items),
+        }
+
+    def _register_segment(self, seg: int, items: Iterable[CuriosityItem]) -> None:
+        top = 0.0
+        count = 0
+        for item in items:
+            self._cold_seg[item.id] = seg
+            self._cold_by_question[normalize_question(item.question)] = item.id
+            if self._lsh is not None:
+                self._lsh.add(item.id, item.question)
+            top = max(top, item.uncertainty)
+            count += 1
+        self._segments[seg] = {"max": top, "count": count}
+
+    def _maybe_page_out(self) -> None:
+        limit = self.config.max_in_memory
+        if limit is None or len(self.hot) <= limit:
+            return
+
+        batch: List[CuriosityItem] = []
+        while self._low and len(batch) < self.config.page_size:
+            item_id = self._low.pop()[0]
+            batch.append(self.hot.remove(item_id))
+
+        seg = self._next_segment
+        self._next_segment += 1
+        self._write_segment(seg, batch)
+        self._register_segment(seg, batch)
+
+    def _ensure_top(self) -> None:
+        """
+        Page cold segments back in while one of them beats the hot top.
+        """
+        while self._segments:
+            seg, meta = max(self._segments.items(), key=lambda kv: kv[1]["max"])
+            top = self.hot.peek_highest_uncertainty()
+            if top is not None and top.uncertainty >= meta["max"]:
+                return
+            self._page_in(seg)
+
+    def _page_in(self, seg: int) -> None:
+        items = self._read_segment(seg)
+        # Log the restore before deleting the segment, so a crash in between
+        # leaves the items recoverable from one place or the other.
+        self._log({"op": "restore", "items": [asdict(i) for i in items]})
+        for item in items:
+            self._cold_seg.pop(item.id, None)
+            self._cold_by_question.pop(normalize_question(item.question), None)
+        self._write_segment(seg, [])
+        # Insert without re-triggering page-out mid-restore; the items
+        # coming in are the most uncertain ones we know about.
+        for item in items:
+            self.hot._insert(item)
+            self._low.push(item.id, -item.uncertainty, None)
+        self._maybe_page_out()
+
+
+if __name__ == "__main__":
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = CuriosityStore(CuriosityStoreConfig(root=tmp))
+        store.add_item("What is the smallest MVP for C3?", "user", 0.9)
+        store.add_item("How to optimize reconciliation?", "system", 0.6)
+        store.close()
+
+        reopened = CuriosityStore(CuriosityStoreConfig(root=tmp))
+        print(reopened.frontier_report())
@@ -0,0 +1,262 @@
+"""
+curiosity/task_classifier.py
+
+Compiled keyword-rule classifier that turns a task string into the
+Motivation Engine's context vector.
+
+The old simple_context_from_task() ran one `any(k in t for k in [...])`
+scan per keyword group. That costs O(keywords × length), every new group
+adds another full pass, and plain substring tests give false hits
+("now" inside "know", "fix" inside "prefix").
+
+Here the whole rule table is compiled once into a word-level automaton:
+
+- the task is split into word tokens in one regex pass
+- each token is looked up in hash tables of exact keywords and stems
+  (a keyword ending in "*" is a stem: "learn*" matches "learning"),
+  and multi-word keywords continue from their first word
+- cost is O(tokens × distinct stem lengths), independent of how many
+  rules there are, and matches are always whole words
+
+Each field starts at its base value and ends at max(base, weights of
+every rule that fired), which reproduces the old behaviour for the
+default table.
+
+Throughput benchmark vs. the old substring scans:
+
+    python3 -m curiosity.task_classifier --n 200000
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Sequence, Tuple
+
+
+@dataclass
+class KeywordRule:
+    """
+    One weighted rule: if any keyword matches, raise each field in
+    `weights` to at least that value.
+    """
+
+    keywords: Sequence[str]
+    weights: Dict[str, float]
+
+
+# Base context before any rule fires.
+DEFAULT_BASE: Dict[str, float] = {
+    "novelty": 0.0,
+    "difficulty": 0.2,
+    "user_urgency": 0.1,
+    "social_relevance": 0.0,
+    "recent_success": 0.0,
+    "recent_failure": 0.0,
+}
+
+DEFAULT_RULES: List[KeywordRule] = [
+    KeywordRule(["learn*", "explor*", "new", "unknown"], {"novelty": 0.8}),
+    KeywordRule(
+        ["debug*", "error*", "bug", "bugs", "buggy", "fix", "fixes", "fixed", "fixing"],
+        {"difficulty": 0.8, "user_urgency": 0.9},
+    ),
+    KeywordRule(["urgent*", "asap", "now", "deadline*"], {"user_urgency": 0.9}),
+    KeywordRule(["friend*", "relationship*", "social*", "family", "families"], {"social_relevance": 0.8}),
+]
+
+
+_WORD = re.compile(r"\w+")
+
+Weights = Tuple[Tuple[str, float], ...]
+
+
+@dataclass
+class TaskClassifier:
+    """
+    Rule table compiled into keyword lookup tables. Build once, call
+    many times.
+    """
+
+    rules: Sequence[KeywordRule] = field(default_factory=lambda: list(DEFAULT_RULES))
+    base: Dict[str, float] = field(default_factory=lambda: dict(DEFAULT_BASE))
+
+    def __post_init__(self) -> None:
+        # Merge rules that share a keyword, so each keyword is looked up once.
+        merged: Dict[str, Dict[str, float]] = {}
+        for rule in self.rules:
+            for kw in rule.keywords:
+                kw = " ".join(kw.strip().lower().split())
+                weights = merged.setdefault(kw, {})
+                for name, value in rule.weights.items():
+                    weights[name] = max(value, weights.get(name, value))
+
+        self._exact: Dict[str, Weights] = {}
+        self._stems: Dict[str, Weights] = {}
+        # first word -> [(remaining words, last word is a stem, weights)]
+        self._phrases: Dict[str, List[Tuple[Tuple[str, ...], bool, Weights]]] = {}
+
+        for kw, weights in merged.items():
+            frozen = tuple(weights.items())
+            stem = kw.endswith("*")
+            words = kw.rstrip("*").split()
+            if not words:
+                continue
+            if len(words) > 1:
+                self._phrases.setdefault(words[0], []).append((tuple(words[1:]), stem, frozen))
+            elif stem:
+                self._stems[words[0]] = frozen
+            else:
+                self._exact[words[0]] = frozen
+
+        self._stem_lengths = sorted({len(s) for s in self._stems})
+
+    def _phrase_hits(self, tokens: List[str], i: int) -> List[Weights]:
+        hits = []
+        for rest, stem, weights in self._phrases[tokens[i]]:
+            tail = tokens[i + 1:i + 1 + len(rest)]
+            if len(tail) != len(rest):
+                continue
+            if stem:
+                if tuple(tail[:-1]) == rest[:-1] and tail[-1].startswith(rest[-1]):
+                    hits.append(weights)
+            elif tuple(tail) == rest:
+                hits.append(weights)
+        return hits
+
+    def classify(self, task: str) -> Dict[str, float]:
+        """
+        Task text -> context dict (one tokenizing pass + hash lookups).
+        """
+        exact = self._exact
+        stems = self._stems
+        stem_lengths = self._stem_lengths
+        phrases = self._phrases
+
+        fired: List[Weights] = []
+        tokens = _WORD.findall(task.lower())
+        for i, tok in enumerate(tokens):
+            hit = exact.get(tok)
+            if hit is not None:
+                fired.append(hit)
+            for n in stem_lengths:
+                if n > len(tok):
+                    break
+                hit = stems.get(tok[:n])
+                if hit is not None:
+                    fired.append(hit)
+            if tok in phrases:
+                fired.extend(self._phrase_hits(tokens, i))
+
+        ctx = dict(self.base)
+        for weights in fired:
+            for key, value in weights:
+                if value > ctx.get(key, 0.0):
+                    ctx[key] = value
+        return ctx
+
+
+default_classifier = TaskClassifier()
+
+
+# --- benchmark --------------------------------------------------------------
+
+def _substring_context_from_task(task: str) -> Dict[str, float]:
+    """
+    The pre-compiled substring implementation, kept only as the
+    benchmark baseline.
+    """
+    t = task.lower()
+
+    novelty = 0.0
+    difficulty = 0.2
+    user_urgency = 0.1
+    social_relevance = 0.0
+
+    if any(k in t for k in ["learn", "explore", "new", "unknown"]):
+        novelty = 0.8
+    if any(k in t for k in ["debug", "error", "bug", "fix"]):
+        difficulty = 0.8
+        user_urgency = 0.9
+    if any(k in t for k in ["urgent", "asap", "now", "deadline"]):
+        user_urgency = 0.9
+    if any(k in t for k in ["friend", "relationship", "social", "family"]):
+        social_relevance = 0.8
+
+    return {
+        "novelty": novelty,
+        "difficulty": difficulty,
+        "user_urgency": user_urgency,
+        "social_relevance": social_relevance,
+        "recent_success": 0.0,
+        "recent_failure": 0.0,
+    }
+
+
+def _synthetic_rules(count: int) -> List[KeywordRule]:
+    import random
+
+    rng = random.Random(0)
+    fields = ["novelty", "difficulty", "user_urgency", "social_relevance"]
+    rules = list(DEFAULT_RULES)
+    for i in range(count):
+        kw = "".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(rng.randint(4, 9)))
+        rules.append(KeywordRule([kw], {rng.choice(fields): round(rng.random(), 2)}))
+    return rules
+
+
+def _substring_scan(rules: Sequence[KeywordRule], base: Dict[str, float]):
+    """
+    Old-style baseline for an arbitrary rule table: one any(...) pass
+    per rule.
+    """
+    table = [([k.rstrip("*") for k in r.keywords], tuple(r.weights.items())) for r in rules]
+
+    def classify(task: str) -> Dict[str, float]:
+        t = task.lower()
+        ctx = dict(base)
+        for keywords, weights in table:
+            if any(k in t for k in keywords):
+                for key, value in weights:
+                    if value > ctx.get(key, 0.0):
+                        ctx[key] = value
+        return ctx
+
+    return classify
+
+
+def main() -> None:
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Task classifier throughput benchmark")
+    parser.add_argument("--n", type=int, default=200_000, help="Tasks to classify per run")
+    parser.add_argument("--extra-rules", type=int, default=500, help="Synthetic rules for the large-table run")
+    args = parser.parse_args()
+
+    samples = [
+        "debug the error in reconcile before the deadline",
+        "I want to learn something new about my family",
+        "plan my day",
+        "do you know how to explore the unknown frontier asap?",
+        "write a friendly note to a friend about our relationship",
+    ]
+    tasks = [samples[i % len(samples)] for i in range(args.n)]
+
+    def bench(label: str, fn) -> None:
+        start = time.perf_counter()
+        for t in tasks:
+            fn(t)
+        elapsed = time.perf_counter() - start
+        print(f"{label:<40} {args.n / elapsed:>12,.0f} tasks/s")
+
+    bench("substring scans (default rules)", _substring_context_from_task)
+    bench("compiled lookup (default rules)", default_classifier.classify)
+
+    big_rules = _synthetic_rules(args.extra_rules)
+    bench(f"substring scans (+{args.extra_rules} rules)", _substring_scan(big_rules, DEFAULT_BASE))
+    bench(f"compiled lookup (+{args.extra_rules} rules)", TaskClassifier(rules=big_rules).classify)
+
+
+if __name__ == "__main__":
+    main()
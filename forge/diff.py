@@ -0,0 +1,434 @@
+"""
+forge/diff.py — line-hash diff engine for Forge
+
+difflib.unified_diff runs SequenceMatcher over the raw line strings.
+On large or heavily rewritten files that is slow: every comparison
+hashes / compares whole strings, and its longest-match search goes
+quadratic when the files share little.
+
+This engine:
+
+1. interns every distinct line to a small integer, so all further work
+   compares ints,
+2. strips the common prefix / suffix,
+3. splits ranges of more than `exact_cells` (len(a) × len(b)) with a
+   patience diff: lines that occur exactly once in both sides are
+   matched in order (longest increasing subsequence) and used as
+   anchors; the gaps between anchors are diffed recursively,
+4. diffs the remaining ranges exactly: lines with no copy on the other
+   side are dropped (they can never match), then a bit-parallel LCS
+   finds a minimal edit script in len(a) × len(b) / 64 word operations
+   whatever the number of edits,
+5. formats the result exactly like difflib.unified_diff (same headers,
+   "@@ -a,b +c,d @@" ranges and context grouping).
+
+The format is difflib's; the hunks are not always. SequenceMatcher
+takes longest matching blocks first (and ignores popular lines in files
+over 200 lines), so its diffs are often not minimal. Ours are minimal
+up to `exact_cells` and otherwise minimal between patience anchors, so
+they come out the same size or smaller (guaranteed only below
+`exact_cells`): tools.bench_diff fails if forge.diff ever emits more
++/- lines than difflib on its inputs.
+
+Results are cached by (sha256 old, sha256 new, file names, context):
+Forge recomputes the same diff for unchanged files a lot.
+
+    from forge.diff import unified_diff
+    lines = unified_diff(old_text, new_text, fromfile="old", tofile="new")
+
+Benchmark against difflib: python3 -m tools.bench_diff
+"""
+
+from __future__ import annotations
+
+import bisect
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+
+# (i, j, size): a[i:i+size] == b[j:j+size]
+Block = Tuple[int, int, int]
+# (tag, i1, i2, j1, j2), same as SequenceMatcher.get_opcodes()
+Opcode = Tuple[str, int, int, int, int]
+
+# Ranges up to len(a) * len(b) cells get an exact diff without anchoring.
+DEFAULT_EXACT_CELLS = 1 << 24
+DEFAULT_CACHE_SIZE = 256
+# Hard cap for ranges without anchors (the table keeps one bit per cell).
+_MAX_EXACT_CELLS = 1 << 30
+
+_HUNK = re.compile(r"^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@")
+
+
+def intern_lines(a: Sequence[str], b: Sequence[str]) -> Tuple[List[int], List[int]]:
+    """
+    Map every distinct line to an int (shared table for both sides).
+    """
+    table: Dict[str, int] = {}
+    ids_a = [table.setdefault(line, len(table)) for line in a]
+    ids_b = [table.setdefault(line, len(table)) for line in b]
+    return ids_a, ids_b
+
+
+# --- matching ------------------------------------------------------------------------
+
+
+def _lcs(a: List[int], b: List[int]) -> List[Block]:
+    """
+    Longest common subsequence of a and b (so a minimal diff), as
+    matching blocks in order.
+
+    Bit-parallel (Allison–Dix / Hyyrö): row j of the LCS table is one
+    len(a)-bit int whose zero bits mark where the row steps up, so each
+    line of b costs a few big-int operations — len(a) * len(b) / 64 word
+    operations overall, however many edits there are. Rows are kept for
+    the traceback.
+    """
+    n = len(a)
+    masks: Dict[int, List[int]] = {}
+    for i, t in enumerate(a):
+        masks.setdefault(t, []).append(i)
+    bits: Dict[int, int] = {}
+    for t, pos in masks.items():
+        if len(pos) == 1:
+            bits[t] = 1 << pos[0]
+            continue
+        buf = bytearray((n >> 3) + 1)
+        for i in pos:
+            buf[i >> 3] |= 1 << (i & 7)
+        bits[t] = int.from_bytes(buf, "little")
+
+    full = (1 << n) - 1
+    v = full
+    rows = [v]
+    for t in b:
+        u = v & bits.get(t, 0)
+        v = ((v + u) | (v - u)) & full
+        rows.append(v)
+
+    # Bit i of rows[j] is 0 where LCS(a[:i+1], b[:j]) > LCS(a[:i], b[:j]).
+    blocks: List[Block] = []
+    i, j = n, len(b)
+    while i and j:
+        if a[i - 1] == b[j - 1]:
+            if blocks and blocks[-1][0] == i and blocks[-1][1] == j:
+                bi, bj, size = blocks[-1]
+                blocks[-1] = (bi - 1, bj - 1, size + 1)
+            else:
+                blocks.append((i - 1, j - 1, 1))
+            i -= 1
+            j -= 1
+        elif (rows[j] >> (i - 1)) & 1:
+            i -= 1  # dropping a[i-1] keeps the LCS
+        else:
+            j -= 1  # a[i-1] is needed, so b[j-1] is not
+    blocks.reverse()
+    return blocks
+
+
+def _exact(
+    a: List[int], alo: int, ahi: int,
+    b: List[int], blo: int, bhi: int,
+    out: List[Block],
+) -> None:
+    """
+    Minimal diff of a[alo:ahi] vs b[blo:bhi]. Lines missing from the
+    other side can never match, so they are dropped first (as GNU diff
+    does): same result, smaller table.
+    """
+    common = set(a[alo:ahi]).intersection(b[blo:bhi])
+    if not common:
+        return
+    xs = [i for i in range(alo, ahi) if a[i] in common]
+    ys = [j for j in range(blo, bhi) if b[j] in common]
+    for i, j, size in _lcs([a[i] for i in xs], [b[j] for j in ys]):
+        for t in range(size):
+            out.append((xs[i + t], ys[j + t], 1))
+
+
+def _anchors(
+    a: List[int], alo: int, ahi: int,
+    b: List[int], blo: int, bhi: int,
+) -> List[Tuple[int, int]]:
+    """
+    Anchor (i, j) pairs for a[alo:ahi] vs b[blo:bhi]: the lines unique on
+    both sides (patience diff), longest run in order.
+    """
+    pos_a: Dict[int, int] = {}
+    for i in range(alo, ahi):
+        t = a[i]
+        pos_a[t] = -1 if t in pos_a else i
+    pos_b: Dict[int, int] = {}
+    for j in range(blo, bhi):
+        t = b[j]
+        if pos_a.get(t, -1) >= 0:
+            pos_b[t] = -1 if t in pos_b else j
+    pairs = sorted((pos_a[t], j) for t, j in pos_b.items() if j >= 0)
+    if not pairs:
+        return []
+
+    # Longest increasing subsequence on j (patience sorting).
+    tails: List[int] = []          # smallest j ending a run of each length
+    tail_idx: List[int] = []
+    back: List[int] = [-1] * len(pairs)
+    for idx, (_, j) in enumerate(pairs):
+        pos = bisect.bisect_left(tails, j)
+        if pos == len(tails):
+            tails.append(j)
+            tail_idx.append(idx)
+        else:
+            tails[pos] = j
+            tail_idx[pos] = idx
+        back[idx] = tail_idx[pos - 1] if pos > 0 else -1
+    chain: List[Tuple[int, int]] = []
+    idx = tail_idx[-1]
+    while idx >= 0:
+        chain.append(pairs[idx])
+        idx = back[idx]
+    chain.reverse()
+    return chain
+
+
+def _patience(
+    a: List[int], alo: int, ahi: int,
+    b: List[int], blo: int, bhi: int,
+    exact_cells: int,
+    out: List[Block],
+) -> None:
+    # Common prefix / suffix.
+    start = 0
+    while alo + start < ahi and blo + start < bhi and a[alo + start] == b[blo + start]:
+        start += 1
+    if start:
+        out.append((alo, blo, start))
+        alo += start
+        blo += start
+    end = 0
+    while alo < ahi - end and blo < bhi - end and a[ahi - end - 1] == b[bhi - end - 1]:
+        end += 1
+    ahi -= end
+    bhi -= end
+
+    if alo < ahi and blo < bhi:
+        anchors: List[Tuple[int, int]] = []
+        if (ahi - alo) * (bhi - blo) > exact_cells:
+            anchors = _anchors(a, alo, ahi, b, blo, bhi)
+        if anchors:
+            i, j = alo, blo
+            for ai, bj in anchors:
+                _patience(a, i, ai, b, j, bj, exact_cells, out)
+                out.append((ai, bj, 1))
+                i, j = ai + 1, bj + 1
+            _patience(a, i, ahi, b, j, bhi, exact_cells, out)
+        elif (ahi - alo) * (bhi - blo) <= _MAX_EXACT_CELLS:
+            _exact(a, alo, ahi, b, blo, bhi, out)
+        # else: no unique line to split on and too big for the LCS
+        # table — reported as one replace.
+
+    if end:
+        out.append((ahi, bhi, end))
+
+
+def matching_blocks(a: List[int], b: List[int], exact_cells: int = DEFAULT_EXACT_CELLS) -> List[Block]:
+    """
+    Merged matching blocks of two int sequences, in order.
+    """
+    raw: List[Block] = []
+    _patience(a, 0, len(a), b, 0, len(b), exact_cells, raw)
+    merged: List[Block] = []
+    for i, j, size in raw:
+        if merged:
+            pi, pj, psize = merged[-1]
+            if pi + psize == i and pj + psize == j:
+                merged[-1] = (pi, pj, psize + size)
+                continue
+        merged.append((i, j, size))
+    return merged
+
+
+def opcodes(a: List[int], b: List[int], exact_cells: int = DEFAULT_EXACT_CELLS) -> List[Opcode]:
+    """
+    SequenceMatcher.get_opcodes()-style edit script.
+    """
+    out: List[Opcode] = []
+    i = j = 0
+    for ai, bj, size in matching_blocks(a, b, exact_cells) + [(len(a), len(b), 0)]:
+        if i < ai and j < bj:
+            out.append(("replace", i, ai, j, bj))
+        elif i < ai:
+            out.append(("delete", i, ai, j, bj))
+        elif j < bj:
+            out.append(("insert", i, ai, j, bj))
+        i, j = ai + size, bj + size
+        if size:
+            out.append(("equal", ai, i, bj, j))
+    return out
+
+
+def grouped_opcodes(codes: List[Opcode], n: int = 3) -> List[List[Opcode]]:
+    """
+    Hunks with up to `n` lines of context (as SequenceMatcher.get_grouped_opcodes).
+    """
+    if not codes:
+        codes = [("equal", 0, 1, 0, 1)]
+    codes = list(codes)
+    if codes[0][0] == "equal":
+        _, i1, i2, j1, j2 = codes[0]
+        codes[0] = ("equal", max(i1, i2 - n), i2, max(j1, j2 - n), j2)
+    if codes[-1][0] == "equal":
+        _, i1, i2, j1, j2 = codes[-1]
+        codes[-1] = ("equal", i1, min(i2, i1 + n), j1, min(j2, j1 + n))
+
+    groups: List[List[Opcode]] = []
+    group: List[Opcode] = []
+    for tag, i1, i2, j1, j2 in codes:
+        # A long equal run closes the current hunk and opens the next.
+        if tag == "equal" and i2 - i1 > 2 * n:
+            group.append((tag, i1, min(i2, i1 + n), j1, min(j2, j1 + n)))
+            groups.append(group)
+            group = []
+            i1, j1 = max(i1, i2 - n), max(j1, j2 - n)
+        group.append((tag, i1, i2, j1, j2))
+    if group and not (len(group) == 1 and group[0][0] == "equal"):
+        groups.append(group)
+    return groups
+
+
+def _format_range(start: int, stop: int) -> str:
+    length = stop - start
+    if length == 1:
+        return f"{start + 1}"
+    if not length:
+        return f"{start},0"
+    return f"{start + 1},{length}"
+
+
+def unified_diff_lines(
+    a: Sequence[str],
+    b: Sequence[str],
+    fromfile: str = "",
+    tofile: str = "",
+    n: int = 3,
+    lineterm: str = "\n",
+    exact_cells: int = DEFAULT_EXACT_CELLS,
+) -> List[str]:
+    """
+    difflib.unified_diff(a, b, fromfile, tofile, n=n, lineterm=lineterm), as a list.
+    """
+    ids_a, ids_b = intern_lines(a, b)
+    out: List[str] = []
+    for group in grouped_opcodes(opcodes(ids_a, ids_b, exact_cells), n):
+        if not out:
+            out.append(f"--- {fromfile}{lineterm}")
+            out.append(f"+++ {tofile}{lineterm}")
+        first, last = group[0], group[-1]
+        out.append(f"@@ -{_format_range(first[1], last[2])} +{_format_range(first[3], last[4])} @@{lineterm}")
+        for tag, i1, i2, j1, j2 in group:
+            if tag == "equal":
+                out.extend(" " + line for line in a[i1:i2])
+                continue
+            if tag in ("replace", "delete"):
+                out.extend("-" + line for line in a[i1:i2])
+            if tag in ("replace", "insert"):
+                out.extend("+" + line for line in b[j1:j2])
+    return out
+
+
+def apply_unified(old_text: str, diff: Sequence[str]) -> str:
+    """
+    Apply a unified diff to old_text. Raises ValueError if a context or
+    removed line does not match (the diff was made against other text).
+    """
+    a = old_text.splitlines(keepends=True)
+    out: List[str] = []
+    pos = 0
+    for n, line in enumerate(diff):
+        if line.startswith("--- ") or line.startswith("+++ "):
+            if n < 2:
+                continue
+        m = _HUNK.match(line)
+        if m:
+            start = int(m.group(1))
+            if m.group(2) != "0":
+                start -= 1
+            if start < pos or start > len(a):
+                raise ValueError(f"hunk {line.strip()!r} out of range")
+            out.extend(a[pos:start])
+            pos = start
+        elif line[:1] in (" ", "-"):
+            if pos >= len(a) or a[pos] != line[1:]:
+                raise ValueError(f"diff does not apply at old line {pos + 1}: {line[1:].rstrip()!r}")
+            if line[0] == " ":
+                out.append(a[pos])
+            pos += 1
+        elif line[:1] == "+":
+            out.append(line[1:])
+    out.extend(a[pos:])
+    return "".join(out)
+
+
+# --- cache ----------------------------------------------------------------------------
+
+
+class DiffCache:
+    """
+    LRU of unified diffs keyed by content hashes.
+    """
+
+    def __init__(self, size: int = DEFAULT_CACHE_SIZE) -> None:
+        self.size = size
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Tuple[str, str, str, str, int], Tuple[str, ...]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def diff(self, old_text: str, new_text: str, fromfile: str = "old", tofile: str = "new", n: int = 3) -> List[str]:
+        key = (
+            hashlib.sha256(old_text.encode("utf-8", "surrogatepass")).hexdigest(),
+            hashlib.sha256(new_text.encode("utf-8", "surrogatepass")).hexdigest(),
+            fromfile,
+            tofile,
+            n,
+        )
+        with self._lock:
+            hit = self._entries.get(key)
+            if hit is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return list(hit)
+            self.misses += 1
+
+        lines = unified_diff_lines(
+            old_text.splitlines(keepends=True),
+            new_text.splitlines(keepends=True),
+            fromfile=fromfile,
+            tofile=tofile,
+            n=n,
+        )
+        if self.size > 0:
+            with self._lock:
+                self._entries[key] = tuple(lines)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.size:
+                    self._entries.popitem(last=False)
+        return lines
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+_cache: Optional[DiffCache] = None
+
+
+def unified_diff(old_text: str, new_text: str, fromfile: str = "old", tofile: str = "new", n: int = 3) -> List[str]:
+    """
+    Unified diff of two texts through the shared cache.
+    """
+    global _cache
+    if _cache is None:
+        _cache = DiffCache()
+    return _cache.diff(old_text, new_text, fromfile=fromfile, tofile=tofile, n=n)
@@ -10,7 +10,7 @@ This version does THREE things:
 
 import json
 from datetime import datetime
-from meta.c3_sim import simulate_c3
+from meta.sim_cache import cached_simulate_c3
 
 
 def load_blueprint():
@@ -40,13 +40,15 @@ def propose_auto_pr(user_task: str = "Improve C3"):
     It DOES NOT MODIFY any real files.
     """
     blueprint = load_blueprint()
-    sim_result = simulate_c3(user_task)
+    # Cached per (task, code revision): re-running Forge on the same task
+    # does not re-simulate until reconcile / c3_sim change.
+    sim_result = cached_simulate_c3(user_task)
 
     pr = {
         "task": user_task,
         "timestamp": datetime.utcnow().isoformat(),
         "blueprint_snapshot": blueprint,
-        "simulation": sim_result,
+        "simulation": sim_result.to_dict(),
         "status": "suggestion_only",
         "notes": [
             "Forge v1 does not change code.",
@@ -0,0 +1,157 @@
+"""
+forge/perf_bench.py — benchmarks run by the Forge performance gate
+
+forge.perf_gate runs this file *inside* a git worktree (baseline or
+candidate) with the worktree as the import root, so the same benchmark
+definitions time each tree's own code:
+
+    python3 forge/perf_bench.py --repeats 5 --out times.json [--only reconcile,replay_stub]
+
+Every benchmark is a setup function returning the callable to time.
+One untimed warm-up call, then `repeats` timed calls. Output is JSON:
+
+    {"times": {name: [seconds, ...]}, "errors": {name: "Type: message"}}
+
+No model is loaded: the end-to-end benchmark replays the tree's
+recorded spine sessions through C3Core with the stub model.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import time
+import traceback
+from pathlib import Path
+from typing import Callable, Dict, List, NamedTuple
+
+
+class Benchmark(NamedTuple):
+    setup: Callable[[], Callable[[], object]]
+    hot: bool       # a regression here rejects the suggestion
+    kind: str       # "micro" or "e2e"
+
+
+def _reconcile() -> Callable[[], object]:
+    from reasoning.reconcile import reconcile
+
+    rng = random.Random(0)
+    inputs = [
+        (
+            rng.random(),
+            {k: rng.random() for k in ("dopamine", "serotonin", "norepinephrine", "oxytocin")},
+        )
+        for _ in range(2000)
+    ]
+
+    def run() -> None:
+        for confidence, emotions in inputs:
+            reconcile(confidence, task="bench", architect_output="a", oracle_output="o", emotions=emotions)
+
+    return run
+
+
+def _reconcile_batch() -> Callable[[], object]:
+    import numpy as np
+
+    from reasoning.reconcile_batch import EMOTION_KEYS, reconcile_batch
+
+    rng = np.random.default_rng(0)
+    confidence = rng.random(200_000)
+    emotions = rng.random((200_000, len(EMOTION_KEYS)))
+    return lambda: reconcile_batch(confidence, emotions)
+
+
+def _simulate_c3() -> Callable[[], object]:
+    from meta.c3_sim import simulate_c3
+
+    def run() -> None:
+        for i in range(2000):
+            simulate_c3(f"bench task {i}", mode="explore" if i % 2 else "default", confidence=(i % 10) / 10)
+
+    return run
+
+
+def _compute_diff() -> Callable[[], object]:
+    from forge.pr import compute_diff
+
+    rng = random.Random(0)
+    old = [f"value_{rng.randint(0, 400)} = compute({rng.randint(0, 99)})\n" for _ in range(3000)]
+    new = list(old)
+    for _ in range(150):
+        new[rng.randrange(len(new))] = f"changed_{rng.randint(0, 400)}()\n"
+    old_text, new_text = "".join(old), "".join(new)
+    calls = [0]
+
+    def run() -> None:
+        # A fresh trailing line per call, so a diff cache cannot answer it.
+        calls[0] += 1
+        tail = f"# run {calls[0]}\n"
+        compute_diff(old_text + tail, new_text + tail)
+
+    return run
+
+
+def _replay_stub() -> Callable[[], object]:
+    from core.replay import ReplayConfig, load_sessions, replay
+
+    sessions = load_sessions(str(Path("memory") / "events.jsonl"))
+    if not sessions:
+        raise RuntimeError("no recorded sessions in memory/events.jsonl")
+    config = ReplayConfig(model="stub", repeat=5)
+
+    def run() -> None:
+        report = replay(sessions, config)
+        if report.errors:
+            raise RuntimeError(report.errors[0])
+
+    return run
+
+
+BENCHMARKS: Dict[str, Benchmark] = {
+    "reconcile": Benchmark(_reconcile, hot=True, kind="micro"),
+    "reconcile_batch": Benchmark(_reconcile_batch, hot=True, kind="micro"),
+    "simulate_c3": Benchmark(_simulate_c3, hot=True, kind="micro"),
+    "compute_diff": Benchmark(_compute_diff, hot=False, kind="micro"),
+    "replay_stub": Benchmark(_replay_stub, hot=True, kind="e2e"),
+}
+
+
+def run_benchmarks(names: List[str], repeats: int) -> Dict[str, Dict[str, object]]:
+    times: Dict[str, List[float]] = {}
+    errors: Dict[str, str] = {}
+    for name in names:
+        try:
+            fn = BENCHMARKS[name].setup()
+            fn()  # warm-up: imports, caches, allocator
+            samples = []
+            for _ in range(repeats):
+                start = time.perf_counter()
+                fn()
+                samples.append(time.perf_counter() - start)
+            times[name] = samples
+        except Exception as e:
+            errors[name] = f"{type(e).__name__}: {e}"
+            traceback.print_exc()
+    return {"times": times, "errors": errors}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Forge gate benchmarks (run inside a worktree)")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--only", type=str, default="", help="Comma-separated benchmark names")
+    parser.add_argument("--out", type=str, required=True, help="Where to write the JSON result")
+    args = parser.parse_args()
+
+    names = [n.strip() for n in args.only.split(",") if n.strip()] or list(BENCHMARKS)
+    unknown = [n for n in names if n not in BENCHMARKS]
+    if unknown:
+        raise SystemExit(f"unknown benchmarks {unknown}; choose from {list(BENCHMARKS)}")
+
+    result = run_benchmarks(names, args.repeats)
+    Path(args.out).write_text(json.dumps(result), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,356 @@
+"""
+forge/perf_gate.py — performance regression gate for staged Forge suggestions
+
+Forge stores diffs (forge.pr.propose_change) without checking what they
+do to speed. The gate:
+
+1. checks out `rev` (default HEAD) twice as temporary git worktrees,
+   baseline and candidate, and applies the suggestion's diff to the
+   candidate (a diff that does not apply rejects the suggestion),
+2. runs forge/perf_bench.py (micro benchmarks + a stub-model replay
+   through C3Core) in both trees, alternating baseline / candidate for
+   `rounds` rounds of `repeats` timed calls each, so drift and noise
+   hit both sides alike,
+3. compares every benchmark: relative change of the mean time
+   (candidate / baseline − 1) with a bootstrap confidence interval
+   over the per-round means — timed calls inside one process share its
+   warm-up, memory layout and CPU placement, so the process, not the
+   call, is the independent sample,
+4. attaches the report to the suggestion (StagingStore annotation
+   "perf_gate") and marks the suggestion rejected when a hot benchmark
+   regresses — the lower bound of its interval is above `threshold` —
+   or a benchmark that works on baseline fails on the candidate.
+
+Requiring the whole interval above the threshold keeps noisy runs from
+rejecting good suggestions; raise `rounds` (not `repeats`) to tighten
+the intervals.
+
+    python3 -m forge.perf_gate <suggestion-id> [<id> ...]
+    python3 -m forge.perf_gate --pending --rounds 16 --threshold 0.03
+    python3 -m forge.perf_gate <id> --only reconcile,replay_stub --no-reject --json
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+import numpy as np
+
+from forge.diff import apply_unified
+from forge.perf_bench import BENCHMARKS
+from forge.staging import StagingStore
+
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+BENCH_SCRIPT = Path(__file__).with_name("perf_bench.py")
+
+# Run BENCH_SCRIPT with the worktree (cwd) as import root.
+_RUNNER = "import runpy, sys; sys.argv = sys.argv[1:]; runpy.run_path(sys.argv[0], run_name='__main__')"
+
+
+@dataclass
+class GateConfig:
+    """
+    - rounds: alternating baseline/candidate benchmark processes per tree
+      (the bootstrap's sample size; at least 2)
+    - repeats: timed calls per benchmark per process (averaged per round)
+    - threshold: relative slowdown (0.05 = 5%) a hot benchmark may show
+    - confidence: level of the bootstrap interval
+    - bootstrap: bootstrap resamples
+    - benchmarks: names from forge.perf_bench.BENCHMARKS (None = all)
+    - rev: git revision both worktrees start from
+    - reject: mark regressing suggestions rejected (else annotate only)
+    - timeout: seconds per benchmark process
+    """
+
+    rounds: int = 10
+    repeats: int = 5
+    threshold: float = 0.05
+    confidence: float = 0.95
+    bootstrap: int = 2000
+    seed: int = 0
+    benchmarks: Optional[List[str]] = None
+    rev: str = "HEAD"
+    reject: bool = True
+    timeout: float = 600.0
+
+    def __post_init__(self) -> None:
+        if self.rounds < 2:
+            raise ValueError(f"rounds must be >= 2 to bootstrap over rounds, got {self.rounds}")
+        if self.repeats < 1:
+            raise ValueError(f"repeats must be >= 1, got {self.repeats}")
+
+
+def _git(*args: str) -> str:
+    proc = subprocess.run(["git", *args], cwd=REPO_ROOT, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(f"git {' '.join(args)} failed: {proc.stderr.strip()}")
+    return proc.stdout.strip()
+
+
+@contextmanager
+def worktree(rev: str = "HEAD") -> Iterator[Path]:
+    """
+    Temporary detached worktree of `rev`, removed afterwards.
+    """
+    path = Path(tempfile.mkdtemp(prefix="forge-gate-"))
+    _git("worktree", "add", "--detach", str(path), rev)
+    try:
+        yield path
+    finally:
+        try:
+            _git("worktree", "remove", "--force", str(path))
+        except RuntimeError:
+            shutil.rmtree(path, ignore_errors=True)
+            _git("worktree", "prune")
+
+
+def apply_suggestion(tree: Path, suggestion: Dict[str, Any]) -> Path:
+    """
+    Apply a staged suggestion's diff to its file inside `tree`.
+    """
+    target = Path(suggestion["file"])
+    if target.is_absolute():
+        target = target.resolve().relative_to(REPO_ROOT)
+    path = tree / target
+    if not path.exists():
+        raise FileNotFoundError(f"{target} does not exist at the gated revision")
+    path.write_text(apply_unified(path.read_text(), suggestion.get("diff") or []))
+    return path
+
+
+def run_benchmarks(tree: Path, names: List[str], repeats: int, timeout: float) -> Dict[str, Any]:
+    """
+    One benchmark process inside `tree`: {"times": ..., "errors": ...}.
+    """
+    fd, out = tempfile.mkstemp(prefix="forge-bench-", suffix=".json")
+    os.close(fd)
+    env = dict(os.environ, PYTHONPATH=str(tree), PYTHONDONTWRITEBYTECODE="1")
+    cmd = [sys.executable, "-c", _RUNNER, str(BENCH_SCRIPT), "--repeats", str(repeats), "--only", ",".join(names), "--out", out]
+    try:
+        proc = subprocess.run(cmd, cwd=tree, env=env, capture_output=True, text=True, timeout=timeout)
+        if proc.returncode != 0:
+            tail = (proc.stderr.strip().splitlines() or ["no output"])[-1]
+            return {"times": {}, "errors": {name: f"benchmark process failed: {tail}" for name in names}}
+        return json.loads(Path(out).read_text(encoding="utf-8"))
+    except subprocess.TimeoutExpired:
+        return {"times": {}, "errors": {name: f"timed out after {timeout:.0f}s" for name in names}}
+    finally:
+        os.unlink(out)
+
+
+def compare(
+    baseline: List[List[float]],
+    candidate: List[List[float]],
+    confidence: float = 0.95,
+    resamples: int = 2000,
+    seed: int = 0,
+    threshold: float = 0.05,
+) -> Dict[str, Any]:
+    """
+    Relative change of mean time, candidate vs baseline, with a
+    percentile bootstrap interval and P(change > threshold).
+
+    `baseline` / `candidate` hold one list of timings per benchmark
+    process. Each process is reduced to its mean and the bootstrap
+    resamples those means: pooling the raw timings would treat
+    correlated calls as independent and make the interval too narrow.
+    """
+    base = np.asarray([np.mean(s) for s in baseline if s], dtype=np.float64)
+    cand = np.asarray([np.mean(s) for s in candidate if s], dtype=np.float64)
+    rng = np.random.default_rng(seed)
+    base_means = base[rng.integers(0, len(base), (resamples, len(base)))].mean(axis=1)
+    cand_means = cand[rng.integers(0, len(cand), (resamples, len(cand)))].mean(axis=1)
+    change = cand_means / base_means - 1.0
+    alpha = (1.0 - confidence) / 2
+    lo, hi = np.quantile(change, [alpha, 1.0 - alpha])
+    return {
+        "baseline": {
+            "rounds": len(base),
+            "samples": sum(len(s) for s in baseline),
+            "mean": float(base.mean()),
+            "std": float(base.std(ddof=1)) if len(base) > 1 else 0.0,
+        },
+        "candidate": {
+            "rounds": len(cand),
+            "samples": sum(len(s) for s in candidate),
+            "mean": float(cand.mean()),
+            "std": float(cand.std(ddof=1)) if len(cand) > 1 else 0.0,
+        },
+        "change": float(cand.mean() / base.mean() - 1.0),
+        "ci": [float(lo), float(hi)],
+        "p_regression": float(np.mean(change > threshold)),
+    }
+
+
+def gate(suggestion_id: str, config: Optional[GateConfig] = None, store: Optional[StagingStore] = None) -> Dict[str, Any]:
+    """
+    Benchmark one staged suggestion; annotate (and maybe reject) it.
+    """
+    if config is None:
+        config = GateConfig()
+    if store is None:
+        store = StagingStore()
+    record = store.get(suggestion_id)
+    if record is None:
+        raise KeyError(f"unknown suggestion id {suggestion_id!r}")
+
+    names = config.benchmarks or list(BENCHMARKS)
+    report: Dict[str, Any] = {
+        "rev": _git("rev-parse", config.rev),
+        "ts": time.time(),
+        "config": {
+            "rounds": config.rounds,
+            "repeats": config.repeats,
+            "threshold": config.threshold,
+            "confidence": config.confidence,
+        },
+        "benchmarks": {},
+        "regressions": [],
+        "broken": [],
+        "error": None,
+    }
+
+    start = time.perf_counter()
+    # side -> benchmark -> one list of timings per round (process).
+    times: Dict[str, Dict[str, List[List[float]]]] = {"baseline": {}, "candidate": {}}
+    errors: Dict[str, Dict[str, str]] = {"baseline": {}, "candidate": {}}
+    with worktree(config.rev) as base_tree, worktree(config.rev) as cand_tree:
+        try:
+            apply_suggestion(cand_tree, record["suggestion"])
+        except (OSError, ValueError) as e:
+            report["error"] = f"suggestion does not apply: {e}"
+        else:
+            trees = {"baseline": base_tree, "candidate": cand_tree}
+            for r in range(config.rounds):
+                # Alternate who goes first so warm caches / drift don't favour one side.
+                order = ("baseline", "candidate") if r % 2 == 0 else ("candidate", "baseline")
+                for side in order:
+                    result = run_benchmarks(trees[side], names, config.repeats, config.timeout)
+                    for name, samples in result.get("times", {}).items():
+                        times[side].setdefault(name, []).append(samples)
+                    errors[side].update(result.get("errors", {}))
+    report["elapsed"] = time.perf_counter() - start
+
+    for name in names:
+        row: Dict[str, Any] = {"hot": BENCHMARKS[name].hot, "kind": BENCHMARKS[name].kind}
+        base_err, cand_err = errors["baseline"].get(name), errors["candidate"].get(name)
+        if base_err or cand_err:
+            row["errors"] = {"baseline": base_err, "candidate": cand_err}
+            if cand_err and not base_err:
+                report["broken"].append(name)
+        elif times["baseline"].get(name) and times["candidate"].get(name):
+            row.update(compare(
+                times["baseline"][name],
+                times["candidate"][name],
+                confidence=config.confidence,
+                resamples=config.bootstrap,
+                seed=config.seed,
+                threshold=config.threshold,
+            ))
+            if row["hot"] and row["ci"][0] > config.threshold:
+                report["regressions"].append(name)
+        report["benchmarks"][name] = row
+
+    rejected = bool(report["error"] or report["regressions"] or report["broken"])
+    report["verdict"] = "rejected" if rejected else "passed"
+    store.annotate(suggestion_id, "perf_gate", report)
+
+    if rejected and config.reject and record["status"] == "pending":
+        if report["error"]:
+            note = report["error"]
+        else:
+            parts = [
+                f"{name} {report['benchmarks'][name]['change']:+.1%}"
+                for name in report["regressions"]
+            ] + [f"{name} fails" for name in report["broken"]]
+            note = "perf gate: " + ", ".join(parts)
+        store.mark(suggestion_id, "rejected", note=note)
+    return report
+
+
+def _print_report(suggestion_id: str, report: Dict[str, Any]) -> None:
+    print(f"\n[Forge] Perf gate {suggestion_id} @ {report['rev'][:10]}: {report['verdict'].upper()} ({report['elapsed']:.1f}s)")
+    if report["error"]:
+        print(f"[Forge]   {report['error']}")
+        return
+    level = int(report["config"]["confidence"] * 100)
+    print(f"  {'benchmark':<16} {'kind':<6} {'baseline':>10} {'candidate':>10} {'change':>8}  {level}% CI")
+    for name, row in report["benchmarks"].items():
+        if "errors" in row:
+            print(f"  {name:<16} {row['kind']:<6} error: {row['errors']['candidate'] or row['errors']['baseline']}")
+            continue
+        lo, hi = row["ci"]
+        flag = "  REGRESSION" if name in report["regressions"] else ("" if row["hot"] else "  (not hot)")
+        print(
+            f"  {name:<16} {row['kind']:<6} {row['baseline']['mean'] * 1e3:>8.2f}ms {row['candidate']['mean'] * 1e3:>8.2f}ms "
+            f"{row['change']:>+7.1%}  [{lo:+.1%}, {hi:+.1%}]{flag}"
+        )
+
+
+def main() -> None:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Performance regression gate for staged Forge suggestions")
+    parser.add_argument("ids", nargs="*", help="Suggestion ids (see python3 -m forge.staging list)")
+    parser.add_argument("--pending", action="store_true", help="Gate every pending suggestion without a gate report")
+    parser.add_argument("--staging", type=str, default=None, help="Staging log path")
+    parser.add_argument("--rounds", type=int, default=GateConfig.rounds, help="Benchmark processes per side (bootstrap sample size)")
+    parser.add_argument("--repeats", type=int, default=GateConfig.repeats, help="Timed calls per benchmark per process")
+    parser.add_argument("--threshold", type=float, default=GateConfig.threshold, help="Allowed slowdown, e.g. 0.05")
+    parser.add_argument("--confidence", type=float, default=GateConfig.confidence)
+    parser.add_argument("--only", type=str, default="", help=f"Benchmarks: {','.join(BENCHMARKS)}")
+    parser.add_argument("--rev", type=str, default=GateConfig.rev)
+    parser.add_argument("--no-reject", action="store_true", help="Annotate only, never change status")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    only = [n.strip() for n in args.only.split(",") if n.strip()] or None
+    unknown = [n for n in only or [] if n not in BENCHMARKS]
+    if unknown:
+        raise SystemExit(f"[Forge] Unknown benchmarks {unknown}; choose from {list(BENCHMARKS)}")
+
+    store = StagingStore(args.staging)
+    ids = list(args.ids)
+    if args.pending:
+        ids += [e.id for e in store.list("pending") if "perf_gate" not in e.annotations and e.id not in ids]
+    if not ids:
+        raise SystemExit("[Forge] Nothing to gate (pass suggestion ids or --pending)")
+
+    try:
+        config = GateConfig(
+            rounds=args.rounds,
+            repeats=args.repeats,
+            threshold=args.threshold,
+            confidence=args.confidence,
+            benchmarks=only,
+            rev=args.rev,
+            reject=not args.no_reject,
+        )
+    except ValueError as e:
+        parser.error(str(e))
+    reports = {}
+    for sid in ids:
+        try:
+            reports[sid] = gate(sid, config, store)
+        except KeyError as exc:
+            print(f"[Forge] {exc}")
+            continue
+        if not args.json:
+            _print_report(sid, reports[sid])
+    if args.json:
+        print(json.dumps(reports, indent=2))
+
+
+if __name__ == "__main__":
+    main()
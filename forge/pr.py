@@ -1,20 +1,31 @@
-import json
-import difflib
 from dataclasses import dataclass
 from typing import List, Optional
 
+from forge.diff import unified_diff
+from forge.staging import DEFAULT_STAGING_PATH, StagingStore
+
 # ------------------------------------------------------------
 # Forge v1 — C.3 Self-Improvement Simulator (MVP)
 # ------------------------------------------------------------
 # This version:
 #  - Reads two text blocks (old code, new code)
 #  - Computes a unified diff
-#  - Stores it in forge/staging.json
+#  - Appends it to the staging log (forge/staging.jsonl, see forge.staging)
 #  - Does NOT apply changes automatically (safety)
 #  - Full auto-apply comes in Forge v2
 # ------------------------------------------------------------
 
-STAGING_PATH = "forge/staging.json"
+STAGING_PATH = str(DEFAULT_STAGING_PATH)
+
+_store: Optional[StagingStore] = None
+
+
+def staging_store() -> StagingStore:
+    """Shared append-only staging store."""
+    global _store
+    if _store is None:
+        _store = StagingStore()
+    return _store
 
 
 @dataclass
@@ -32,30 +43,13 @@ class ForgeSuggestion:
 
 
 def compute_diff(old_text: str, new_text: str) -> List[str]:
-    """Compute a unified diff between two code versions."""
-    old_lines = old_text.splitlines(keepends=True)
-    new_lines = new_text.splitlines(keepends=True)
-
-    return list(difflib.unified_diff(
-        old_lines,
-        new_lines,
-        fromfile="old",
-        tofile="new"
-    ))
-
-
-def save_suggestion(suggestion: ForgeSuggestion):
-    """Save suggestion to staging.json (append mode)."""
-    try:
-        with open(STAGING_PATH, "r") as f:
-            data = json.load(f)
-    except FileNotFoundError:
-        data = []
+    """Compute a unified diff between two code versions (cached by content)."""
+    return unified_diff(old_text, new_text, fromfile="old", tofile="new")
 
-    data.append(suggestion.to_dict())
 
-    with open(STAGING_PATH, "w") as f:
-        json.dump(data, f, indent=2)
+def save_suggestion(suggestion: ForgeSuggestion) -> str:
+    """Append suggestion to the staging log; returns its id."""
+    return staging_store().add(suggestion.to_dict())
 
 
 def propose_change(
@@ -71,9 +65,10 @@ def propose_change(
         rationale=rationale,
         diff=diff
     )
-    save_suggestion(suggestion)
-    print(f"[Forge] Proposed change saved for {file_path}")
+    suggestion_id = save_suggestion(suggestion)
+    print(f"[Forge] Proposed change {suggestion_id} saved for {file_path}")
     print(f"[Forge] Diff lines: {len(diff)}")
+    return suggestion_id
 
 
 # ------------------------------------------------------------
@@ -81,6 +76,8 @@ def propose_change(
 # ------------------------------------------------------------
 # Usage:
 #   python3 -m forge.pr old.txt new.txt target_file.py
+#   python3 -m forge.staging list | show | apply | reject | compact
+#   python3 -m forge.perf_gate <suggestion-id>   (benchmark gate)
 # ------------------------------------------------------------
 
 if __name__ == "__main__":
@@ -0,0 +1,433 @@
+"""
+forge/staging.py — append-only staging area for Forge suggestions
+
+forge.pr used to keep every suggestion in one JSON array
+(forge/staging.json): each save read the whole file, appended one item
+and rewrote it, so saving got slower with every suggestion and two
+concurrent saves could lose one of them.
+
+StagingStore is an append-only JSONL log (forge/staging.jsonl):
+
+    {"op": "add",    "id": ..., "ts": ..., "suggestion": {...}}
+    {"op": "status", "id": ..., "ts": ..., "status": "applied", "note": ...}
+    {"op": "annotate", "id": ..., "ts": ..., "key": "perf_gate", "value": {...}}
+
+- Appends are one os.write() of a complete line on an O_APPEND file
+  descriptor, under an exclusive flock, so concurrent writers (threads
+  or processes) never interleave or lose records.
+- An in-memory id index maps each suggestion to the byte offset of its
+  "add" record plus its small metadata (file, rationale, status). Diff
+  bodies stay on disk; get() seeks straight to them.
+- The index is refreshed incrementally: only bytes appended since the
+  last read are parsed (by this or any other process).
+- Marking applied / rejected appends a status record, and tools attach
+  results (e.g. forge.perf_gate's benchmark report) as annotate
+  records; history is never rewritten.
+- compact() is the only rewrite: it drops resolved suggestions (optionally
+  moving them to an archive log) and atomically replaces the file. Other
+  readers notice the new inode and rebuild their index. Reads index and
+  seek through one descriptor, so offsets always belong to the file read.
+
+The old staging.json is imported once, by whichever process creates
+staging.jsonl (O_EXCL), so concurrent importers cannot duplicate it.
+
+    python3 -m forge.staging list --status pending
+    python3 -m forge.staging show <id>
+    python3 -m forge.staging apply <id> | reject <id> [--note ...]
+    python3 -m forge.staging compact [--archive forge/staging.archive.jsonl]
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # non-POSIX: O_APPEND single writes only
+    fcntl = None
+
+
+DEFAULT_STAGING_PATH = Path(__file__).with_name("staging.jsonl")
+LEGACY_STAGING_PATH = Path(__file__).with_name("staging.json")
+
+STATUSES = ("pending", "applied", "rejected")
+
+
+@dataclass
+class StagedSuggestion:
+    """
+    Index entry for one suggestion (no diff body).
+    """
+
+    id: str
+    ts: float
+    file: str
+    rationale: str
+    status: str = "pending"
+    status_ts: Optional[float] = None
+    note: Optional[str] = None
+    offset: int = 0
+    length: int = 0
+    annotations: Dict[str, Any] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "ts": self.ts,
+            "file": self.file,
+            "rationale": self.rationale,
+            "status": self.status,
+            "status_ts": self.status_ts,
+            "note": self.note,
+        }
+
+
+def new_id() -> str:
+    """
+    Time-ordered, collision-safe suggestion id.
+    """
+    return f"{int(time.time() * 1000):011x}-{uuid.uuid4().hex[:8]}"
+
+
+def _drop_torn_tail(fd: int) -> None:
+    """
+    Truncate a partial last line (a writer crashed mid-append) so the
+    next record starts on its own line instead of being glued onto it.
+    Call with the append lock held: a complete append never leaves one.
+    """
+    size = os.fstat(fd).st_size
+    if size == 0 or os.pread(fd, 1, size - 1) == b"\n":
+        return
+    end = size
+    while end > 0:
+        start = max(0, end - 65536)
+        chunk = os.pread(fd, end - start, start)
+        nl = chunk.rfind(b"\n")
+        if nl >= 0:
+            os.ftruncate(fd, start + nl + 1)
+            return
+        end = start
+    os.ftruncate(fd, 0)
+
+
+class StagingStore:
+    """
+    add(suggestion_dict)          -> id
+    get(id)                       -> full record (suggestion + status)
+    list(status=None)             -> [StagedSuggestion], oldest first
+    mark(id, "applied"/"rejected", note=None)
+    annotate(id, key, value)
+    compact(archive=None)         -> number of suggestions dropped
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        legacy_path: Optional[str] = None,
+        fsync: bool = False,
+    ) -> None:
+        self.path = Path(path) if path else DEFAULT_STAGING_PATH
+        self.fsync = fsync
+        self._index: Dict[str, StagedSuggestion] = {}
+        self._scanned = 0          # bytes of the log already indexed
+        self._inode: Optional[int] = None
+        self._lock = threading.Lock()
+
+        legacy = Path(legacy_path) if legacy_path else (LEGACY_STAGING_PATH if path is None else None)
+        # Cheap pre-check; _import_legacy() creates the log exclusively.
+        if legacy is not None and legacy.exists() and not self.path.exists():
+            self._import_legacy(legacy)
+
+    # --- low level ---------------------------------------------------------------
+
+    @contextmanager
+    def _locked(self, fd: int) -> Iterator[None]:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+
+    def _append(self, records: List[Dict[str, Any]], create: bool = False) -> bool:
+        """
+        Append `records` under the lock. With create=True only if this
+        call creates the log; returns False (nothing written) if it exists.
+        """
+        data = "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in records).encode("utf-8")
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        flags = os.O_RDWR | os.O_APPEND | os.O_CREAT | (os.O_EXCL if create else 0)
+        while True:
+            try:
+                fd = os.open(self.path, flags, 0o644)
+            except FileExistsError:
+                return False
+            # Ours from here on: after a compact() retry, append as usual.
+            flags &= ~os.O_EXCL
+            try:
+                with self._locked(fd):
+                    # compact() may have replaced the file while we waited for
+                    # the lock; writing to the old inode would lose the record.
+                    try:
+                        current = os.stat(self.path).st_ino
+                    except FileNotFoundError:
+                        current = None
+                    if current != os.fstat(fd).st_ino:
+                        continue
+                    _drop_torn_tail(fd)
+                    view = memoryview(data)
+                    while view:
+                        written = os.write(fd, view)
+                        view = view[written:]
+                    if self.fsync:
+                        os.fsync(fd)
+                    return True
+            finally:
+                os.close(fd)
+
+    def _open(self) -> Optional[int]:
+        """
+        Read-only descriptor on the current log, or None if there is none.
+        """
+        try:
+            return os.open(self.path, os.O_RDONLY)
+        except FileNotFoundError:
+            return None
+
+    @contextmanager
+    def _reading(self) -> Iterator[Optional[int]]:
+        """
+        Refresh the index from one descriptor and yield it, so _read_add()
+        seeks in the same file the offsets came from.
+        """
+        fd = self._open()
+        try:
+            if fd is None:
+                self._index.clear()
+                self._scanned = 0
+                self._inode = None
+            else:
+                self._refresh(fd)
+            yield fd
+        finally:
+            if fd is not None:
+                os.close(fd)
+
+    def _refresh(self, fd: int) -> None:
+        """
+        Index whatever was appended to fd's file since the last call
+        (from any process).
+        """
+        st = os.fstat(fd)
+        if st.st_ino != self._inode or st.st_size < self._scanned:
+            # Compacted (replaced) by someone: start over.
+            self._index.clear()
+            self._scanned = 0
+            self._inode = st.st_ino
+        if st.st_size == self._scanned:
+            return
+
+        with os.fdopen(os.dup(fd), "rb") as f:
+            f.seek(self._scanned)
+            offset = self._scanned
+            for raw in f:
+                if not raw.endswith(b"\n"):
+                    break  # a record still being written; pick it up next time
+                self._index_record(raw, offset)
+                offset += len(raw)
+            self._scanned = offset
+
+    def _index_record(self, raw: bytes, offset: int) -> None:
+        try:
+            rec = json.loads(raw)
+        except json.JSONDecodeError:
+            return
+        op = rec.get("op")
+        if op == "add":
+            s = rec.get("suggestion") or {}
+            self._index[rec["id"]] = StagedSuggestion(
+                id=rec["id"],
+                ts=rec.get("ts", 0.0),
+                file=s.get("file", ""),
+                rationale=s.get("rationale", ""),
+                offset=offset,
+                length=len(raw),
+                annotations=dict(rec.get("annotations") or {}),
+            )
+        elif op == "status":
+            entry = self._index.get(rec.get("id"))
+            if entry is not None:
+                entry.status = rec.get("status", entry.status)
+                entry.status_ts = rec.get("ts")
+                entry.note = rec.get("note")
+        elif op == "annotate":
+            entry = self._index.get(rec.get("id"))
+            if entry is not None and "key" in rec:
+                entry.annotations[rec["key"]] = rec.get("value")
+
+    def _read_add(self, fd: int, entry: StagedSuggestion) -> Dict[str, Any]:
+        return json.loads(os.pread(fd, entry.length, entry.offset))
+
+    def _import_legacy(self, legacy: Path) -> None:
+        try:
+            items = json.loads(legacy.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            return
+        if isinstance(items, list) and items:
+            now = time.time()
+            self._append([
+                {"op": "add", "id": new_id(), "ts": now, "suggestion": item}
+                for item in items
+                if isinstance(item, dict)
+            ], create=True)
+
+    # --- API ---------------------------------------------------------------------
+
+    def add(self, suggestion: Dict[str, Any]) -> str:
+        sid = new_id()
+        self._append([{"op": "add", "id": sid, "ts": time.time(), "suggestion": suggestion}])
+        return sid
+
+    def get(self, sid: str) -> Optional[Dict[str, Any]]:
+        """
+        The stored suggestion plus its current status, or None.
+        """
+        with self._lock, self._reading() as fd:
+            entry = self._index.get(sid)
+            if entry is None:
+                return None
+            rec = self._read_add(fd, entry)
+        out = entry.to_dict()
+        out["suggestion"] = rec.get("suggestion", {})
+        out["annotations"] = dict(entry.annotations)
+        return out
+
+    def list(self, status: Optional[str] = None) -> List[StagedSuggestion]:
+        with self._lock, self._reading():
+            entries = list(self._index.values())
+        if status is not None:
+            entries = [e for e in entries if e.status == status]
+        return entries
+
+    def mark(self, sid: str, status: str, note: Optional[str] = None) -> None:
+        if status not in STATUSES:
+            raise ValueError(f"status must be one of {STATUSES}, got {status!r}")
+        with self._lock, self._reading():
+            if sid not in self._index:
+                raise KeyError(f"unknown suggestion id {sid!r}")
+        self._append([{"op": "status", "id": sid, "ts": time.time(), "status": status, "note": note}])
+
+    def annotate(self, sid: str, key: str, value: Any) -> None:
+        """
+        Attach `value` to a suggestion under `key` (last write wins).
+        """
+        with self._lock, self._reading():
+            if sid not in self._index:
+                raise KeyError(f"unknown suggestion id {sid!r}")
+        self._append([{"op": "annotate", "id": sid, "ts": time.time(), "key": key, "value": value}])
+
+    def compact(self, archive: Optional[str] = None) -> int:
+        """
+        Rewrite the log with only pending suggestions (one add record
+        each, status history folded in). Resolved ones are dropped, or
+        appended to `archive` first. Returns how many were dropped.
+        """
+        while True:
+            fd = self._open()
+            if fd is None:
+                return 0
+            try:
+                # Hold the writers' lock so no append lands between read and replace.
+                with self._locked(fd), self._lock:
+                    # Another compact() may have replaced the file meanwhile.
+                    try:
+                        current = os.stat(self.path).st_ino
+                    except FileNotFoundError:
+                        current = None
+                    if current != os.fstat(fd).st_ino:
+                        continue
+                    return self._compact(fd, archive)
+            finally:
+                os.close(fd)
+
+    def _compact(self, fd: int, archive: Optional[str]) -> int:
+        self._refresh(fd)
+        keep: List[bytes] = []
+        resolved: List[Dict[str, Any]] = []
+        for entry in self._index.values():
+            rec = self._read_add(fd, entry)
+            if entry.annotations:
+                rec["annotations"] = entry.annotations
+            if entry.status == "pending":
+                keep.append(json.dumps(rec, ensure_ascii=False).encode("utf-8") + b"\n")
+            else:
+                rec["final_status"] = entry.to_dict()
+                resolved.append(rec)
+
+        if archive and resolved:
+            with open(archive, "a", encoding="utf-8") as f:
+                for rec in resolved:
+                    f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        with tmp.open("wb") as f:
+            f.write(b"".join(keep))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+        self._index.clear()
+        self._scanned = 0
+        self._inode = None
+        return len(resolved)
+
+
+def main() -> None:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Forge staging area")
+    parser.add_argument("--path", type=str, default=None, help=f"Staging log (default: {DEFAULT_STAGING_PATH})")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p_list = sub.add_parser("list")
+    p_list.add_argument("--status", choices=STATUSES, default=None)
+    p_show = sub.add_parser("show")
+    p_show.add_argument("id")
+    for name in ("apply", "reject"):
+        p = sub.add_parser(name)
+        p.add_argument("id")
+        p.add_argument("--note", type=str, default=None)
+    p_compact = sub.add_parser("compact")
+    p_compact.add_argument("--archive", type=str, default=None, help="Append resolved suggestions here first")
+    args = parser.parse_args()
+
+    store = StagingStore(args.path)
+    if args.cmd == "list":
+        for e in store.list(args.status):
+            print(f"{e.id}  {e.status:<8}  {e.file:<30}  {e.rationale}")
+    elif args.cmd == "show":
+        rec = store.get(args.id)
+        if rec is None:
+            raise SystemExit(f"[Forge] No suggestion {args.id}")
+        print(json.dumps(rec, indent=2, ensure_ascii=False))
+    elif args.cmd in ("apply", "reject"):
+        status = "applied" if args.cmd == "apply" else "rejected"
+        try:
+            store.mark(args.id, status, note=args.note)
+        except KeyError as exc:
+            raise SystemExit(f"[Forge] {exc}")
+        print(f"[Forge] {args.id} marked {status}")
+    else:
+        dropped = store.compact(args.archive)
+        print(f"[Forge] Compacted staging: dropped {dropped} resolved suggestion(s)")
+
+
+if __name__ == "__main__":
+    main()
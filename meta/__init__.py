@@ -2,5 +2,8 @@
 meta package — meta-level controllers for C.3
 
 Currently includes:
-- CoVe (Coordinator / Verification) stub
+- CoVe (Coordinator / Verification) with budgeted verification passes
+- Meta-C3 simulation (c3_sim), parallel parameter sweeps (c3_sweep) and
+  a Monte Carlo reconcile-outcome estimator (c3_montecarlo)
+- A content-addressed SimulationResult cache with revision diffs (sim_cache)
 """
@@ -0,0 +1,247 @@
+"""
+meta/c3_montecarlo.py — Meta-C3 Monte Carlo reconcile estimator
+
+How often does each brain win when the emotional state is noisy?
+Before Forge touches the reconcile coefficients it needs the answer as
+a distribution, not one simulate_c3() call. This module:
+
+- samples N (confidence, dopamine, serotonin, norepinephrine, oxytocin)
+  vectors from per-variable distributions
+- pushes them through reasoning.reconcile_batch (the vectorized
+  reconcile(), exact same rule)
+- reports
+  * choice probabilities with Wilson 95% confidence intervals
+  * the score margin (oracle_score − architect_score) distribution and
+    the share of decisions within ±epsilon of the boundary
+  * sensitivity: dP(oracle)/dx for every input, by central finite
+    differences on common random numbers (same samples, one column
+    shifted by ±h), with a standard error
+
+Distribution specs (values are clipped to [0, 1]):
+
+    uniform:lo:hi     normal:mean:std     beta:a:b     const:value
+
+    from meta.c3_montecarlo import MonteCarloConfig, estimate
+    report = estimate(MonteCarloConfig(n=1_000_000))
+
+CLI: python3 -m meta.c3_montecarlo_cli --n 1000000 --dopamine normal:0.7:0.15
+"""
+
+from __future__ import annotations
+
+import math
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Tuple
+
+import numpy as np
+
+from reasoning.reconcile_batch import CHOICE_ORACLE, EMOTION_KEYS, reconcile_batch
+
+
+# Sampled columns: confidence first, then the emotions in reconcile_batch order.
+VARIABLES: Tuple[str, ...] = ("confidence",) + EMOTION_KEYS
+
+# Noisy version of EmotionEngine's default state; confidence spans [0, 1].
+DEFAULT_DISTRIBUTIONS: Dict[str, str] = {
+    "confidence": "uniform:0:1",
+    "dopamine": "normal:0.5:0.1",
+    "serotonin": "normal:0.6:0.1",
+    "norepinephrine": "normal:0.3:0.1",
+    "oxytocin": "normal:0.6:0.1",
+}
+
+# z for a two-sided 95% interval.
+_Z95 = 1.959963984540054
+
+# Margin histogram for quantiles across batches.
+_MARGIN_RANGE = (-2.0, 2.0)
+_MARGIN_BINS = 4000
+
+
+@dataclass(frozen=True)
+class Distribution:
+    """
+    One variable's sampling distribution, parsed from "kind:p1:p2".
+    """
+
+    kind: str
+    params: Tuple[float, ...]
+
+    @classmethod
+    def parse(cls, spec: str) -> "Distribution":
+        kind, *raw = spec.strip().split(":")
+        params = tuple(float(p) for p in raw)
+        arity = {"uniform": 2, "normal": 2, "beta": 2, "const": 1}
+        if kind not in arity:
+            raise ValueError(f"unknown distribution {kind!r} in {spec!r}; use uniform/normal/beta/const")
+        if len(params) != arity[kind]:
+            raise ValueError(f"{kind} takes {arity[kind]} parameter(s), got {spec!r}")
+        return cls(kind, params)
+
+    def sample(self, rng: np.random.Generator, n: int) -> np.ndarray:
+        if self.kind == "uniform":
+            x = rng.uniform(self.params[0], self.params[1], size=n)
+        elif self.kind == "normal":
+            x = rng.normal(self.params[0], self.params[1], size=n)
+        elif self.kind == "beta":
+            x = rng.beta(self.params[0], self.params[1], size=n)
+        else:
+            return np.full(n, self.params[0], dtype=np.float64)
+        return np.clip(x, 0.0, 1.0, out=x)
+
+    def __str__(self) -> str:
+        return ":".join([self.kind] + [f"{p:g}" for p in self.params])
+
+
+@dataclass
+class MonteCarloConfig:
+    """
+    - n: samples
+    - seed: RNG seed (runs are reproducible)
+    - batch: samples per vectorized batch (bounds memory)
+    - distributions: variable -> spec, see DEFAULT_DISTRIBUTIONS
+    - epsilon: |margin| below this counts as "near the boundary"
+    - h: finite-difference step for sensitivities
+    - sensitivity_samples: samples used for sensitivities (0 = skip)
+    """
+
+    n: int = 1_000_000
+    seed: int = 0
+    batch: int = 1_000_000
+    distributions: Dict[str, str] = field(default_factory=lambda: dict(DEFAULT_DISTRIBUTIONS))
+    epsilon: float = 0.01
+    h: float = 0.01
+    sensitivity_samples: int = 200_000
+
+    def __post_init__(self) -> None:
+        if self.n < 1:
+            raise ValueError(f"n must be >= 1, got {self.n}")
+        if self.batch < 1:
+            raise ValueError(f"batch must be >= 1, got {self.batch}")
+        if self.sensitivity_samples < 0:
+            raise ValueError(f"sensitivity_samples must be >= 0, got {self.sensitivity_samples}")
+        if self.h <= 0:
+            raise ValueError(f"h must be > 0, got {self.h}")
+
+
+def wilson_interval(successes: int, n: int, z: float = _Z95) -> Tuple[float, float]:
+    """
+    Wilson score interval for a binomial proportion.
+    """
+    if n == 0:
+        return 0.0, 1.0
+    p = successes / n
+    denom = 1.0 + z * z / n
+    centre = (p + z * z / (2 * n)) / denom
+    half = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denom
+    return max(0.0, centre - half), min(1.0, centre + half)
+
+
+def _sample(dists: Dict[str, Distribution], rng: np.random.Generator, n: int) -> Tuple[np.ndarray, np.ndarray]:
+    confidence = dists["confidence"].sample(rng, n)
+    emotions = np.empty((n, len(EMOTION_KEYS)), dtype=np.float64)
+    for j, key in enumerate(EMOTION_KEYS):
+        emotions[:, j] = dists[key].sample(rng, n)
+    return confidence, emotions
+
+
+def _oracle_wins(confidence: np.ndarray, emotions: np.ndarray) -> np.ndarray:
+    return reconcile_batch(confidence, emotions, temperatures=False)["choice"] == CHOICE_ORACLE
+
+
+def _sensitivities(
+    dists: Dict[str, Distribution],
+    rng: np.random.Generator,
+    n: int,
+    h: float,
+) -> Dict[str, Dict[str, float]]:
+    """
+    dP(oracle)/dx per variable: mean of [win(x+h) − win(x−h)] / 2h over
+    the same samples, so only rows that actually flip contribute noise.
+    Shifts are not clipped: this is the local slope of the rule itself.
+    """
+    confidence, emotions = _sample(dists, rng, n)
+    out: Dict[str, Dict[str, float]] = {}
+    for j, var in enumerate(VARIABLES):
+        if j == 0:
+            up = _oracle_wins(confidence + h, emotions)
+            down = _oracle_wins(confidence - h, emotions)
+        else:
+            col = emotions[:, j - 1].copy()
+            emotions[:, j - 1] = col + h
+            up = _oracle_wins(confidence, emotions)
+            emotions[:, j - 1] = col - h
+            down = _oracle_wins(confidence, emotions)
+            emotions[:, j - 1] = col
+        diff = up.astype(np.int8) - down.astype(np.int8)
+        mean = float(diff.mean())
+        se = float(diff.std(ddof=1) / math.sqrt(n)) if n > 1 else 0.0
+        out[var] = {"dp_oracle": mean / (2 * h), "se": se / (2 * h)}
+    return out
+
+
+def estimate(config: MonteCarloConfig | None = None) -> Dict[str, Any]:
+    """
+    Run the Monte Carlo estimate; returns a JSON-serializable report.
+    """
+    if config is None:
+        config = MonteCarloConfig()
+    specs = dict(DEFAULT_DISTRIBUTIONS)
+    specs.update(config.distributions)
+    unknown = set(specs) - set(VARIABLES)
+    if unknown:
+        raise ValueError(f"unknown variables {sorted(unknown)}; expected {VARIABLES}")
+    dists = {var: Distribution.parse(spec) for var, spec in specs.items()}
+
+    rng = np.random.default_rng(config.seed)
+    start = time.perf_counter()
+
+    oracle = 0
+    near = 0
+    margin_sum = 0.0
+    hist = np.zeros(_MARGIN_BINS, dtype=np.int64)
+    done = 0
+    while done < config.n:
+        k = min(config.batch, config.n - done)
+        confidence, emotions = _sample(dists, rng, k)
+        out = reconcile_batch(confidence, emotions, temperatures=False)
+        margin = out["oracle_score"] - out["architect_score"]
+        oracle += int(np.count_nonzero(out["choice"] == CHOICE_ORACLE))
+        near += int(np.count_nonzero(np.abs(margin) < config.epsilon))
+        margin_sum += float(margin.sum())
+        hist += np.histogram(margin, bins=_MARGIN_BINS, range=_MARGIN_RANGE)[0]
+        done += k
+
+    n = config.n
+    cdf = np.cumsum(hist) / max(1, hist.sum())
+    edges = np.linspace(_MARGIN_RANGE[0], _MARGIN_RANGE[1], _MARGIN_BINS + 1)
+    quantiles = {
+        f"p{int(q * 100)}": float(edges[min(_MARGIN_BINS, int(np.searchsorted(cdf, q)) + 1)])
+        for q in (0.05, 0.25, 0.5, 0.75, 0.95)
+    }
+
+    sensitivity = {}
+    if config.sensitivity_samples > 0:
+        sensitivity = _sensitivities(dists, rng, min(config.sensitivity_samples, n), config.h)
+
+    elapsed = time.perf_counter() - start
+    p_oracle = oracle / n if n else 0.0
+    return {
+        "n": n,
+        "seed": config.seed,
+        "distributions": {var: str(d) for var, d in dists.items()},
+        "choice": {
+            "architect": {"p": 1.0 - p_oracle, "ci95": list(wilson_interval(n - oracle, n))},
+            "oracle": {"p": p_oracle, "ci95": list(wilson_interval(oracle, n))},
+        },
+        "margin": {
+            "mean": margin_sum / n if n else 0.0,
+            "quantiles": quantiles,
+            "epsilon": config.epsilon,
+            "near_boundary": near / n if n else 0.0,
+        },
+        "sensitivity": sensitivity,
+        "elapsed": elapsed,
+        "samples_per_s": n / elapsed if elapsed > 0 else 0.0,
+    }
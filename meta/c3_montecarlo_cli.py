@@ -0,0 +1,79 @@
+"""
+meta/c3_montecarlo_cli.py — Meta-C3 Monte Carlo Command-Line Runner
+
+Estimates how often each brain wins reconcile() under noisy emotions:
+
+    python3 -m meta.c3_montecarlo_cli
+    python3 -m meta.c3_montecarlo_cli --n 5000000 --dopamine normal:0.7:0.15 --confidence beta:5:2
+"""
+
+import argparse
+import json
+
+from .c3_montecarlo import DEFAULT_DISTRIBUTIONS, VARIABLES, MonteCarloConfig, estimate
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Monte Carlo estimate of reconcile outcomes")
+    parser.add_argument("--n", type=int, default=MonteCarloConfig.n, help="Samples")
+    parser.add_argument("--seed", type=int, default=MonteCarloConfig.seed)
+    parser.add_argument("--batch", type=int, default=MonteCarloConfig.batch, help="Samples per vectorized batch")
+    for var in VARIABLES:
+        parser.add_argument(
+            f"--{var}",
+            type=str,
+            default=DEFAULT_DISTRIBUTIONS[var],
+            help=f"uniform:lo:hi | normal:mean:std | beta:a:b | const:v (default: {DEFAULT_DISTRIBUTIONS[var]})",
+        )
+    parser.add_argument("--epsilon", type=float, default=MonteCarloConfig.epsilon, help="Near-boundary margin")
+    parser.add_argument("--h", type=float, default=MonteCarloConfig.h, help="Finite-difference step")
+    parser.add_argument(
+        "--sensitivity-samples",
+        type=int,
+        default=MonteCarloConfig.sensitivity_samples,
+        help="Samples for sensitivities (0 = skip)",
+    )
+    parser.add_argument("--json", action="store_true", help="Print the full report as JSON")
+    args = parser.parse_args()
+
+    try:
+        config = MonteCarloConfig(
+            n=args.n,
+            seed=args.seed,
+            batch=args.batch,
+            distributions={var: getattr(args, var) for var in VARIABLES},
+            epsilon=args.epsilon,
+            h=args.h,
+            sensitivity_samples=args.sensitivity_samples,
+        )
+        report = estimate(config)
+    except ValueError as e:
+        parser.error(str(e))
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print("\n=== Meta-C3 Monte Carlo Reconcile Estimate ===")
+    print(f"{report['n']:,} samples in {report['elapsed']:.3f}s ({report['samples_per_s']:,.0f}/s), seed {report['seed']}")
+    for var, spec in report["distributions"].items():
+        print(f"  {var:<15} {spec}")
+    print("Choice probabilities (95% CI):")
+    for brain, row in report["choice"].items():
+        lo, hi = row["ci95"]
+        print(f"  {brain:<10} {row['p']:.4%}  [{lo:.4%}, {hi:.4%}]")
+    margin = report["margin"]
+    q = margin["quantiles"]
+    print(
+        f"Margin (oracle − architect score): mean {margin['mean']:+.4f}, "
+        f"p5 {q['p5']:+.3f} p50 {q['p50']:+.3f} p95 {q['p95']:+.3f}"
+    )
+    print(f"Within ±{margin['epsilon']} of the boundary: {margin['near_boundary']:.2%}")
+    if report["sensitivity"]:
+        print("Sensitivity dP(oracle)/dx (± se):")
+        for var, row in report["sensitivity"].items():
+            print(f"  {var:<15} {row['dp_oracle']:+.4f} ± {row['se']:.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -19,7 +19,7 @@ Later:
 from __future__ import annotations
 
 from dataclasses import dataclass, asdict
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 import json
 
 from reasoning.reconcile import reconcile, ReconcileResult  # uses EmotionEngine internally
@@ -45,7 +45,16 @@ class SimulationResult:
         return json.dumps(asdict(self), ensure_ascii=False, indent=2)
 
 
-def simulate_c3(task: str, mode: str = "default") -> SimulationResult:
+# Used when the caller has no measured Architect confidence.
+DEFAULT_SIM_CONFIDENCE = 0.65
+
+
+def simulate_c3(
+    task: str,
+    mode: str = "default",
+    confidence: Optional[float] = None,
+    emotions: Optional[Dict[str, float]] = None,
+) -> SimulationResult:
     """
     Run a *simulated* C.3 reasoning pass.
 
@@ -53,19 +62,25 @@ def simulate_c3(task: str, mode: str = "default") -> SimulationResult:
     - We fake Architect + Oracle outputs based on the task.
     - We call reconcile() to decide which "brain" would win.
     - We mark the result as simulation=True.
+
+    `confidence` is the Architect confidence to simulate (e.g. one
+    measured from token log-probs by core.runner); None uses
+    DEFAULT_SIM_CONFIDENCE. `emotions` is the chemical state to
+    reconcile under; None uses reconcile's neutral baseline.
     """
 
     # Stubbed dual-brain outputs for now.
     architect_output = f"[SIM-ARCH] Logical plan for task: {task}"
     oracle_output = f"[SIM-ORACLE] Creative angle for task: {task}"
 
-    # Confidence stub — later this will come from ArchitectBrain.
-    confidence = 0.65
+    if confidence is None:
+        confidence = DEFAULT_SIM_CONFIDENCE
 
     rec: ReconcileResult = reconcile(
         architect_output=architect_output,
         oracle_output=oracle_output,
         confidence=confidence,
+        emotions=emotions,
     )
 
     # Try to convert ReconcileResult to a dict.
@@ -103,10 +118,16 @@ def main() -> None:
         default="default",
         help="Simulation mode tag (for future experimentation).",
     )
+    parser.add_argument(
+        "--confidence",
+        type=float,
+        default=None,
+        help=f"Architect confidence to simulate (default: {DEFAULT_SIM_CONFIDENCE}).",
+    )
 
     args = parser.parse_args()
 
-    sim_result = simulate_c3(task=args.task, mode=args.mode)
+    sim_result = simulate_c3(task=args.task, mode=args.mode, confidence=args.confidence)
     print(sim_result.to_json())
 
 
@@ -24,10 +24,16 @@ def main() -> None:
         default="default",
         help="Optional simulation mode tag.",
     )
+    parser.add_argument(
+        "--confidence",
+        type=float,
+        default=None,
+        help="Architect confidence to simulate (default: Meta-C3 stub value).",
+    )
 
     args = parser.parse_args()
 
-    sim_result = simulate_c3(task=args.task, mode=args.mode)
+    sim_result = simulate_c3(task=args.task, mode=args.mode, confidence=args.confidence)
 
     print("\n=== Meta-C3 Simulation Result ===")
     print(sim_result.to_json())
@@ -0,0 +1,314 @@
+"""
+meta/c3_sweep.py — Meta-C3 parameter sweeps
+
+simulate_c3() runs one (task, mode, confidence) simulation per call.
+Forge wants to compare many variants at once, so this runs the full
+grid
+
+    tasks × modes × confidences × emotion vectors
+
+over a process pool and streams every SimulationResult to JSONL as
+chunks finish, then prints aggregate stats.
+
+- Configurations are never materialised: each one is an index into the
+  grid, workers get the grid once (pool initializer) and are handed
+  (start, stop) index ranges, so dispatch cost is per chunk, not per row.
+- Workers serialize their rows to JSON themselves; the parent only
+  writes lines and merges per-chunk aggregates.
+- Rows arrive in completion order; each carries its grid `index`.
+
+    python3 -m meta.c3_sweep --task "plan my day" --task "fix the bug" \\
+        --modes default,explore --confidence 0:1:11 \\
+        --emotion dopamine=0.2,0.5,0.8 --emotion norepinephrine=0.2,0.8 \\
+        --out sweep.jsonl
+"""
+
+from __future__ import annotations
+
+import itertools
+import json
+import os
+import sys
+import time
+from dataclasses import dataclass, field
+from multiprocessing import Pool
+from typing import Any, Dict, Iterator, List, Optional, Sequence, TextIO, Tuple
+
+from meta.c3_sim import DEFAULT_SIM_CONFIDENCE, simulate_c3
+from reasoning.reconcile import _default_emotions
+
+
+EmotionVector = Dict[str, float]
+
+
+@dataclass
+class SweepGrid:
+    """
+    The sweep space. Every combination is one simulation; index i maps
+    to (task, mode, confidence, emotions) with emotions varying fastest.
+    """
+
+    tasks: List[str]
+    modes: List[str] = field(default_factory=lambda: ["default"])
+    confidences: List[float] = field(default_factory=lambda: [DEFAULT_SIM_CONFIDENCE])
+    emotions: List[EmotionVector] = field(default_factory=lambda: [_default_emotions()])
+
+    def __len__(self) -> int:
+        return len(self.tasks) * len(self.modes) * len(self.confidences) * len(self.emotions)
+
+    def config(self, index: int) -> Tuple[str, str, float, int]:
+        """
+        index -> (task, mode, confidence, emotion vector index).
+        """
+        index, e = divmod(index, len(self.emotions))
+        index, c = divmod(index, len(self.confidences))
+        t, m = divmod(index, len(self.modes))
+        return self.tasks[t], self.modes[m], self.confidences[c], e
+
+
+@dataclass
+class SweepConfig:
+    """
+    - workers: processes (1 = run in this process, no pool)
+    - chunk_size: configurations per dispatched chunk
+    """
+
+    workers: int = os.cpu_count() or 1
+    chunk_size: int = 2048
+
+
+def emotion_grid(axes: Dict[str, Sequence[float]]) -> List[EmotionVector]:
+    """
+    Cartesian product of per-chemical values; chemicals not in `axes`
+    stay at reconcile's neutral baseline.
+
+        emotion_grid({"dopamine": [0.2, 0.8]}) -> 2 vectors
+    """
+    base = _default_emotions()
+    keys = list(axes)
+    out = []
+    for values in itertools.product(*(axes[k] for k in keys)):
+        vec = dict(base)
+        vec.update(zip(keys, (float(v) for v in values)))
+        out.append(vec)
+    return out
+
+
+# --- worker side ---------------------------------------------------------------
+
+_grid: Optional[SweepGrid] = None
+
+
+def _init_worker(grid: SweepGrid) -> None:
+    global _grid
+    _grid = grid
+
+
+def _empty_stats() -> Dict[str, Any]:
+    return {"rows": 0, "choices": {}, "by_mode": {}, "by_confidence": {}, "by_emotions": {}}
+
+
+def _count(table: Dict[Any, Dict[str, int]], key: Any, choice: str) -> None:
+    row = table.setdefault(key, {})
+    row[choice] = row.get(choice, 0) + 1
+
+
+def _run_chunk(bounds: Tuple[int, int]) -> Tuple[int, List[str], Dict[str, Any]]:
+    """
+    Simulate grid[start:stop] -> (rows done, JSON lines, chunk stats).
+    """
+    grid = _grid
+    start, stop = bounds
+    dumps = json.JSONEncoder(ensure_ascii=False).encode
+    lines: List[str] = []
+    stats = _empty_stats()
+    for index in range(start, stop):
+        task, mode, confidence, e = grid.config(index)
+        sim = simulate_c3(task, mode=mode, confidence=confidence, emotions=grid.emotions[e])
+        # Same fields as sim.to_dict(), without asdict()'s deep copy
+        # (the row is serialized straight away).
+        row = {
+            "index": index,
+            "confidence": confidence,
+            "emotions_index": e,
+            "mode": sim.mode,
+            "task": sim.task,
+            "simulation": sim.simulation,
+            "reconcile_result": sim.reconcile_result,
+        }
+        lines.append(dumps(row))
+
+        choice = sim.reconcile_result["choice"]
+        _count(stats["choices"], "all", choice)
+        _count(stats["by_mode"], mode, choice)
+        _count(stats["by_confidence"], confidence, choice)
+        _count(stats["by_emotions"], e, choice)
+    stats["rows"] = stop - start
+    return stop - start, lines, stats
+
+
+def _merge(total: Dict[str, Any], part: Dict[str, Any]) -> None:
+    total["rows"] += part["rows"]
+    for name in ("choices", "by_mode", "by_confidence", "by_emotions"):
+        for key, counts in part[name].items():
+            row = total[name].setdefault(key, {})
+            for choice, n in counts.items():
+                row[choice] = row.get(choice, 0) + n
+
+
+# --- driver ----------------------------------------------------------------------
+
+
+def _chunks(n: int, size: int) -> Iterator[Tuple[int, int]]:
+    for start in range(0, n, size):
+        yield start, min(n, start + size)
+
+
+def run_sweep(
+    grid: SweepGrid,
+    out: Optional[TextIO] = None,
+    config: Optional[SweepConfig] = None,
+    progress: bool = False,
+) -> Dict[str, Any]:
+    """
+    Run every configuration in `grid`. Rows are written to `out` (one
+    JSON object per line) as their chunk finishes; returns aggregate
+    stats (choice counts overall and per mode / confidence / emotion
+    vector, elapsed seconds, rows per second).
+    """
+    if config is None:
+        config = SweepConfig()
+    n = len(grid)
+    chunks = _chunks(n, max(1, config.chunk_size))
+    total = _empty_stats()
+    start = time.perf_counter()
+
+    def consume(results) -> None:
+        for done, lines, stats in results:
+            if out is not None and lines:
+                out.write("\n".join(lines))
+                out.write("\n")
+            _merge(total, stats)
+            if progress:
+                print(f"\r[Sweep] {total['rows']}/{n}", end="", file=sys.stderr, flush=True)
+
+    workers = max(1, min(config.workers, -(-n // max(1, config.chunk_size))))
+    if workers == 1:
+        _init_worker(grid)
+        consume(_run_chunk(bounds) for bounds in chunks)
+    else:
+        with Pool(workers, initializer=_init_worker, initargs=(grid,)) as pool:
+            consume(pool.imap_unordered(_run_chunk, chunks))
+    if progress:
+        print(file=sys.stderr)
+
+    elapsed = time.perf_counter() - start
+    total["elapsed"] = elapsed
+    total["rows_per_s"] = n / elapsed if elapsed > 0 else 0.0
+    total["workers"] = workers
+    return total
+
+
+def summarize(stats: Dict[str, Any], grid: SweepGrid) -> str:
+    """
+    Human-readable oracle share per mode / confidence / emotion vector.
+    """
+
+    def share(counts: Dict[str, int]) -> str:
+        rows = sum(counts.values())
+        return f"oracle {counts.get('oracle', 0) / rows:6.1%} of {rows}" if rows else "-"
+
+    lines = [
+        f"Sweep: {stats['rows']} simulations in {stats['elapsed']:.2f}s "
+        f"({stats['rows_per_s']:,.0f}/s, {stats['workers']} workers)",
+        f"  all: {share(stats['choices'].get('all', {}))}",
+        "By mode:",
+    ]
+    for mode in grid.modes:
+        lines.append(f"  {mode:<16} {share(stats['by_mode'].get(mode, {}))}")
+    lines.append("By confidence:")
+    for conf in sorted(stats["by_confidence"]):
+        lines.append(f"  {conf:<16.3f} {share(stats['by_confidence'][conf])}")
+    lines.append("By emotions:")
+    for e in sorted(stats["by_emotions"]):
+        vec = " ".join(f"{k[:4]}={v:.2f}" for k, v in grid.emotions[e].items())
+        lines.append(f"  [{e}] {vec}  {share(stats['by_emotions'][e])}")
+    return "\n".join(lines)
+
+
+def _parse_floats(spec: str) -> List[float]:
+    """
+    "0.1,0.5,0.9" or "start:stop:count" (inclusive linspace).
+    """
+    if ":" in spec:
+        lo, hi, count = spec.split(":")
+        k = int(count)
+        if k == 1:
+            return [float(lo)]
+        step = (float(hi) - float(lo)) / (k - 1)
+        return [float(lo) + i * step for i in range(k)]
+    return [float(v) for v in spec.split(",") if v.strip()]
+
+
+def main() -> None:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Parallel Meta-C3 sweep over tasks × modes × confidence × emotions")
+    parser.add_argument("--task", action="append", default=[], help="Task to simulate (repeatable)")
+    parser.add_argument("--tasks-file", type=str, default=None, help="File with one task per line")
+    parser.add_argument("--modes", type=str, default="default", help="Comma-separated mode tags")
+    parser.add_argument(
+        "--confidence",
+        type=str,
+        default=str(DEFAULT_SIM_CONFIDENCE),
+        help="Comma list or start:stop:count (e.g. 0:1:11)",
+    )
+    parser.add_argument(
+        "--emotion",
+        action="append",
+        default=[],
+        help="chemical=values axis, values as for --confidence (repeatable)",
+    )
+    parser.add_argument("--emotions-file", type=str, default=None, help="JSONL of explicit emotion vectors")
+    parser.add_argument("--out", type=str, default=None, help="JSONL output (default: no rows written)")
+    parser.add_argument("--workers", type=int, default=SweepConfig.workers)
+    parser.add_argument("--chunk-size", type=int, default=SweepConfig.chunk_size)
+    parser.add_argument("--quiet", action="store_true", help="No progress line")
+    args = parser.parse_args()
+
+    tasks = list(args.task)
+    if args.tasks_file:
+        with open(args.tasks_file, "r", encoding="utf-8") as f:
+            tasks += [line.strip() for line in f if line.strip()]
+    if not tasks:
+        parser.error("give at least one --task or --tasks-file")
+
+    if args.emotions_file:
+        base = _default_emotions()
+        with open(args.emotions_file, "r", encoding="utf-8") as f:
+            emotions = [{**base, **json.loads(line)} for line in f if line.strip()]
+    else:
+        axes = {}
+        for spec in args.emotion:
+            key, _, values = spec.partition("=")
+            axes[key.strip()] = _parse_floats(values)
+        emotions = emotion_grid(axes)
+
+    grid = SweepGrid(
+        tasks=tasks,
+        modes=[m.strip() for m in args.modes.split(",") if m.strip()],
+        confidences=_parse_floats(args.confidence),
+        emotions=emotions,
+    )
+    config = SweepConfig(workers=args.workers, chunk_size=args.chunk_size)
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            stats = run_sweep(grid, f, config, progress=not args.quiet)
+    else:
+        stats = run_sweep(grid, None, config, progress=not args.quiet)
+    print(summarize(stats, grid))
+
+
+if __name__ == "__main__":
+    main()
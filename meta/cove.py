@@ -1,30 +1,75 @@
 """
-meta/cove.py — CoVe++ v1 (Coordinator / Verification Engine stub)
+meta/cove.py — CoVe++ v2 (Coordinator / Verification Engine)
 
 This sits *above* the dual-brain (Architect + Oracle) and does:
 
 - Accepts a user task
-- Enforces a simple "verification budget" (max work per turn)
-- Calls the Reconciler to get a merged decision
-- Wraps the result with meta info about:
-  - budget_used
-  - budget_limit
-  - notes
-
-Right now:
-- Fully deterministic
-- No heavy verification logic yet
-- Safe to call from CLI or future agent loop
+- Runs the dual-brain + reconcile() once to get a decision
+- Runs verification passes on the chosen answer while budget remains
+- Wraps the result with what the task actually cost:
+  - tokens generated, model calls, wall time (whole task and the
+    verification part)
+  - every pass: verdict, tokens, seconds, whether it was cut off
+  - why verification stopped
+
+Budget (CoVeConfig), per task:
+- verification_budget: tokens the verification passes may generate;
+  each pass's max_tokens is capped by what is left
+- time_budget: wall-clock seconds for the whole task; the deadline is
+  checked every decode step, so a pass past it is cut off mid-generation
+- max_model_calls: model calls for the whole task (primary + verification)
+- max_passes: upper bound on verification passes
+
+Passes run one after another (concurrency=1) or as up to `concurrency`
+independent passes at once on a thread pool, sharing the deadline and
+the token budget (split evenly). Either way, once `agree_needed` passes
+return the same verdict the rest are cancelled (a running pass stops at
+its next decode step). Each pass is recorded as done, cancelled or
+timed_out.
+
+Token counts are exact when the model backend reports them
+(generate_with_logprobs); otherwise the output is counted with the
+model's tokenizer, or estimated at 4 chars/token.
 """
 
 from __future__ import annotations
 
 import json
+import math
+import re
 import sys
-from dataclasses import dataclass, asdict
-from typing import Any, Dict, List
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, asdict, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
-from reasoning.reconcile import Reconciler, ReconciledDecision
+from models.prompt_template import PromptTemplate, Slot, token_cache
+from reasoning.architect import ArchitectBrain
+from reasoning.emotions import EmotionEngine
+from reasoning.oracle import OracleBrain
+from reasoning.reconcile import reconcile, ReconcileResult
+
+
+# Rough chars-per-token for when neither counts nor a tokenizer are available.
+_CHARS_PER_TOKEN = 4
+
+# Used when the Architect backend cannot report log-probs (as core.runner).
+DEFAULT_CONFIDENCE = 0.60
+
+
+VERIFY_TEMPLATE = PromptTemplate([
+    (
+        "You are the VERIFIER of C.3.\n"
+        "Check the answer below against the task: is it correct, complete and safe to act on?\n"
+        "Reply with 'VERDICT: PASS' or 'VERDICT: FAIL', then one line of reasons.\n\n"
+    ),
+    Slot("task", "Task: ", "\n"),
+    Slot("answer", "Answer:\n", "\n\n"),
+    "VERDICT:",
+])
+
+_VERDICT_RE = re.compile(r"\b(PASS|FAIL)\b", re.IGNORECASE)
 
 
 @dataclass
@@ -33,14 +78,50 @@ class CoVeConfig:
     Configuration for CoVe (Coordinator / Verification Engine).
 
     verification_budget:
-        Conceptual limit for how much "extra" checking we do per turn.
-        For now, we only track and report it. Later, this will gate:
-        - extra self-check passes
-        - additional simulations
-        - deeper tool verification
+        Tokens the verification passes may generate per task.
+    time_budget:
+        Wall-clock seconds per task (None = no deadline).
+    max_model_calls:
+        Model calls per task, primary answer included (None = no cap).
+    max_passes:
+        Verification passes per task at most.
+    concurrency:
+        Passes running at once (1 = sequential).
+    agree_needed:
+        Stop once this many passes agree on a verdict (None = run all).
+    pass_max_tokens:
+        max_tokens of one verification pass (before the budget cap).
+    verify_temperature:
+        Sampling temperature of the verifier.
+    """
+
+    verification_budget: int = 200  # tokens for verification passes
+    time_budget: Optional[float] = None
+    max_model_calls: Optional[int] = None
+    max_passes: int = 3
+    concurrency: int = 1
+    agree_needed: Optional[int] = 2
+    pass_max_tokens: int = 64
+    verify_temperature: float = 0.3
+
+
+@dataclass
+class VerificationPass:
+    """
+    One verification pass.
+
+    - verdict: "pass" | "fail" | "unclear" (only counted when done)
+    - status: "done" | "cancelled" (agreement reached first) |
+      "timed_out" (deadline hit); cancelled / timed-out passes may have
+      run partially (tokens > 0) or not at all
     """
 
-    verification_budget: int = 200  # conceptual "token budget" for meta-work
+    index: int
+    verdict: str = "unclear"
+    tokens: int = 0
+    seconds: float = 0.0
+    status: str = "done"
+    text: str = ""
 
 
 @dataclass
@@ -49,10 +130,17 @@ class CoVeResult:
     The result returned by CoVe.
 
     - task: original user task
-    - decision: ReconciledDecision.to_dict()
-    - budget_used: how much budget we conceptually consumed
-    - budget_limit: from config
+    - decision: the reconcile result as a dict (+ confidence; emotions is
+      the snapshot that drove sampling)
+    - budget_used: tokens spent on verification passes
+    - budget_limit: verification_budget from config
     - notes: list of strings describing what we did
+    - tokens_used / model_calls / wall_time: whole task
+    - verification_calls / verification_time: the verification part
+    - passes: every verification pass launched, with its status
+    - stop_reason: why verification ended ("agreement", "max_passes",
+      "token_budget", "deadline", "max_model_calls")
+    - verified: True/False by majority verdict, None if no pass decided
     """
 
     task: str
@@ -60,6 +148,14 @@ class CoVeResult:
     budget_used: int
     budget_limit: int
     notes: List[str]
+    tokens_used: int = 0
+    model_calls: int = 0
+    wall_time: float = 0.0
+    verification_calls: int = 0
+    verification_time: float = 0.0
+    passes: List[VerificationPass] = field(default_factory=list)
+    stop_reason: str = ""
+    verified: Optional[bool] = None
 
     def to_dict(self) -> Dict[str, Any]:
         return asdict(self)
@@ -68,50 +164,351 @@ class CoVeResult:
         return json.dumps(self.to_dict(), indent=indent)
 
 
+class _Meter:
+    """
+    Counts model calls and generated tokens across threads.
+    """
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.tokens = 0
+        self._lock = threading.Lock()
+
+    def add(self, tokens: int, calls: int = 1) -> None:
+        with self._lock:
+            self.calls += calls
+            self.tokens += tokens
+
+
+class MeteredModel:
+    """
+    Wraps a model backend so every call is counted against a _Meter.
+
+    generate() goes through the backend's generate_with_logprobs when it
+    has one, to get the exact number of tokens decoded.
+    """
+
+    def __init__(self, model: Any, meter: _Meter) -> None:
+        self.model = model
+        self.meter = meter
+        self.tokenizer = getattr(model, "tokenizer", None)
+        if not hasattr(model, "generate_with_logprobs"):
+            # Brains probe for this method; don't advertise one we can't serve.
+            self.generate_with_logprobs = None
+
+    def _count(self, text: str) -> int:
+        if not text:
+            return 0
+        if self.tokenizer is not None:
+            return token_cache(self.tokenizer).count(text)
+        return math.ceil(len(text) / _CHARS_PER_TOKEN)
+
+    def generate_with_logprobs(self, *args: Any, **kwargs: Any):
+        result = self.model.generate_with_logprobs(*args, **kwargs)
+        self.meter.add(result.num_tokens or self._count(result.text))
+        return result
+
+    def generate(self, *args: Any, **kwargs: Any) -> str:
+        if self.generate_with_logprobs is not None:
+            return self.generate_with_logprobs(*args, **kwargs).text
+        text = self.model.generate(*args, **kwargs)
+        self.meter.add(self._count(text))
+        return text
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.model, name)
+
+
 class CoVe:
     """
-    CoVe++ v1 — very simple meta-coordinator.
+    CoVe++ v2 — meta-coordinator with real budget accounting.
 
-    For now:
-    - Calls Reconciler once
-    - Pretends we used a fixed amount of budget
-    - Returns structured result
+    - Architect + Oracle + reconcile() produce the decision (the Oracle
+      is skipped when it could not change it, as in core.runner)
+    - the Architect's model then verifies the chosen answer while
+      tokens / time / calls remain, sequentially or concurrently, until
+      enough passes agree
     """
 
-    def __init__(self, config: CoVeConfig | None = None) -> None:
+    def __init__(
+        self,
+        config: CoVeConfig | None = None,
+        architect: Optional[ArchitectBrain] = None,
+        oracle: Optional[OracleBrain] = None,
+        emotions: Optional[EmotionEngine] = None,
+        oracle_skip_confidence: Optional[float] = 0.85,
+    ) -> None:
         self.config = config or CoVeConfig()
-        self.reconciler = Reconciler()
+        self.architect = architect or ArchitectBrain()
+        self.oracle = oracle or OracleBrain()
+        self.emotions = emotions or EmotionEngine()
+        self.oracle_skip_confidence = oracle_skip_confidence
+
+    # --- helpers ------------------------------------------------------------
+
+    def _decide(
+        self, task: str, meter: _Meter, should_stop: Callable[[], bool]
+    ) -> Tuple[ReconcileResult, float, Dict[str, float], List[str]]:
+        """
+        One dual-brain pass -> (ReconcileResult, confidence, emotions, notes).
+
+        As in core.runner, the emotion snapshot only drives the brains'
+        sampling; reconcile routes on its neutral default emotions.
+        """
+        architect_model, oracle_model = self.architect.model, self.oracle.model
+        self.architect.model = MeteredModel(architect_model, meter)
+        self.oracle.model = MeteredModel(oracle_model, meter)
+        notes: List[str] = []
+        try:
+            emotions = self.emotions.current_state()
+            arch_out, arch_temp, arch_conf = self.architect.think_with_confidence(
+                task, emotions=emotions, should_stop=should_stop
+            )
+            confidence = DEFAULT_CONFIDENCE if arch_conf is None else arch_conf
+            temperatures = {"architect_temperature": arch_temp}
+
+            oracle_out = None
+            skip_oracle = (
+                self.oracle_skip_confidence is not None
+                and confidence >= self.oracle_skip_confidence
+                and reconcile(confidence).choice == "architect"
+            )
+            if skip_oracle:
+                notes.append(f"Skipped Oracle (Architect confidence {confidence:.2f}).")
+            else:
+                oracle_out, oracle_temp = self.oracle.think(task, emotions=emotions, should_stop=should_stop)
+                temperatures["oracle_temperature"] = oracle_temp
+        finally:
+            self.architect.model, self.oracle.model = architect_model, oracle_model
+
+        result = reconcile(
+            architect_output=arch_out,
+            oracle_output=oracle_out,
+            confidence=confidence,
+            temperatures=temperatures,
+        )
+        notes.insert(0, f"Reconciled Architect + Oracle -> {result.choice}.")
+        return result, confidence, emotions, notes
+
+    def _verify(
+        self,
+        index: int,
+        task: str,
+        answer: str,
+        max_tokens: int,
+        meter: _Meter,
+        should_stop: Callable[[], bool],
+    ) -> VerificationPass:
+        # Own meter, so the pass's tokens are right with passes in flight.
+        own = _Meter()
+        model = MeteredModel(self.architect.model, own)
+        tokenizer = model.tokenizer
+        if tokenizer is not None:
+            prompt = VERIFY_TEMPLATE.render(tokenizer, task=task, answer=answer)
+        else:
+            prompt = VERIFY_TEMPLATE.render_text(task=task, answer=answer)
+
+        start = time.perf_counter()
+        try:
+            text = model.generate(
+                prompt=prompt,
+                temperature=self.config.verify_temperature,
+                max_tokens=max_tokens,
+                should_stop=should_stop,
+            )
+        finally:
+            meter.add(own.tokens, own.calls)
+        seconds = time.perf_counter() - start
+
+        match = _VERDICT_RE.search(text or "")
+        verdict = match.group(1).lower() if match else "unclear"
+        return VerificationPass(
+            index=index,
+            verdict=verdict,
+            tokens=own.tokens,
+            seconds=seconds,
+            text=(text or "").strip(),
+        )
+
+    def _agreed(self, passes: List[VerificationPass]) -> bool:
+        need = self.config.agree_needed
+        if need is None:
+            return False
+        done = [p.verdict for p in passes if p.status == "done" and p.verdict != "unclear"]
+        return any(done.count(v) >= need for v in ("pass", "fail"))
+
+    def _run_sequential(
+        self,
+        task: str,
+        answer: str,
+        meter: _Meter,
+        past_deadline: Callable[[], bool],
+    ) -> Tuple[List[VerificationPass], str]:
+        cfg = self.config
+        spent_before = meter.tokens
+        passes: List[VerificationPass] = []
+        while len(passes) < cfg.max_passes:
+            remaining = cfg.verification_budget - (meter.tokens - spent_before)
+            if remaining <= 0:
+                return passes, "token_budget"
+            if past_deadline():
+                return passes, "deadline"
+            if cfg.max_model_calls is not None and meter.calls >= cfg.max_model_calls:
+                return passes, "max_model_calls"
+            p = self._verify(
+                len(passes), task, answer, min(cfg.pass_max_tokens, remaining), meter, past_deadline
+            )
+            passes.append(p)
+            if past_deadline():
+                p.status = "timed_out"
+                return passes, "deadline"
+            if self._agreed(passes):
+                return passes, "agreement"
+        return passes, "max_passes"
+
+    def _run_concurrent(
+        self,
+        task: str,
+        answer: str,
+        meter: _Meter,
+        past_deadline: Callable[[], bool],
+        deadline: Optional[float],
+    ) -> Tuple[List[VerificationPass], str]:
+        """
+        Launch the passes on a thread pool. They share the deadline and
+        a cancel flag (set once enough agree); both are checked by the
+        model every decode step and before a queued pass starts.
+        """
+        cfg = self.config
+        n = cfg.max_passes
+        stop_reason = "max_passes"
+        if cfg.max_model_calls is not None:
+            n = min(n, cfg.max_model_calls - meter.calls)
+            if n < cfg.max_passes:
+                stop_reason = "max_model_calls"
+        per_pass = min(cfg.pass_max_tokens, cfg.verification_budget // max(1, n))
+        if n <= 0 or per_pass <= 0:
+            return [], "max_model_calls" if n <= 0 else "token_budget"
+
+        cancel = threading.Event()
+
+        def should_stop() -> bool:
+            return cancel.is_set() or past_deadline()
+
+        def run(index: int) -> VerificationPass:
+            if should_stop():
+                return VerificationPass(index=index)  # status fixed below
+            return self._verify(index, task, answer, per_pass, meter, should_stop)
+
+        passes: List[Optional[VerificationPass]] = [None] * n
+        with ThreadPoolExecutor(max_workers=cfg.concurrency, thread_name_prefix="cove-pass") as pool:
+            pending = {pool.submit(run, i): i for i in range(n)}
+            while pending:
+                # Once the deadline has passed (or passes were cancelled) just
+                # block until the in-flight passes notice the flag; a zero
+                # timeout here would busy-spin against the decoding threads.
+                if deadline is None or cancel.is_set():
+                    timeout = None
+                else:
+                    timeout = max(0.0, deadline - time.perf_counter())
+                finished, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+                if not finished:  # deadline
+                    cancel.set()
+                    stop_reason = "deadline"
+                    for fut in pending:
+                        fut.cancel()  # queued passes never start
+                    continue
+                for fut in finished:
+                    i = pending.pop(fut)
+                    if fut.cancelled():
+                        continue
+                    p = fut.result()
+                    # A pass that saw the stop flag did not finish normally.
+                    if cancel.is_set() and stop_reason == "agreement":
+                        p.status = "cancelled"
+                    elif past_deadline():
+                        p.status = "timed_out"
+                        stop_reason = "deadline"
+                    passes[i] = p
+                if not cancel.is_set() and self._agreed([p for p in passes if p is not None]):
+                    cancel.set()
+                    stop_reason = "agreement"
+                    for fut in pending:
+                        fut.cancel()
+
+        # Queued passes cancelled before they started.
+        for i, p in enumerate(passes):
+            if p is None:
+                passes[i] = VerificationPass(
+                    index=i, status="timed_out" if stop_reason == "deadline" else "cancelled"
+                )
+        return passes, stop_reason
+
+    # --- main API -------------------------------------------------------------
 
     def process_task(self, task: str) -> CoVeResult:
         """
         Main entrypoint:
 
         - Trim the task
-        - Run through Reconciler
-        - Compute a simple "budget_used" value
-        - Attach notes about what we did
+        - Decide with Architect + Oracle + reconcile()
+        - Verify the chosen answer while the budget allows
+        - Report what was actually spent
         """
-
+        cfg = self.config
         task = task.strip() or "(empty task)"
+        start = time.perf_counter()
+        deadline = None if cfg.time_budget is None else start + cfg.time_budget
+
+        def past_deadline() -> bool:
+            return deadline is not None and time.perf_counter() >= deadline
+
+        meter = _Meter()
+        decision, confidence, emotions, notes = self._decide(task, meter, past_deadline)
+        primary_tokens, primary_calls = meter.tokens, meter.calls
+
+        # Verify only the answer text, not reconcile's "[ARCHITECT] " tag.
+        answer = decision.final_text.split("] ", 1)[-1]
+        verify_start = time.perf_counter()
+        if cfg.concurrency > 1:
+            passes, stop_reason = self._run_concurrent(task, answer, meter, past_deadline, deadline)
+        else:
+            passes, stop_reason = self._run_sequential(task, answer, meter, past_deadline)
+        verification_time = time.perf_counter() - verify_start
+
+        decided = [p.verdict for p in passes if p.status == "done" and p.verdict != "unclear"]
+        verified = None
+        if decided:
+            verified = decided.count("pass") > len(decided) / 2
+
+        budget_used = meter.tokens - primary_tokens
+        statuses = {s: sum(p.status == s for p in passes) for s in ("done", "cancelled", "timed_out")}
+        notes.append(
+            f"Verification passes: {statuses['done']} done, {statuses['cancelled']} cancelled, "
+            f"{statuses['timed_out']} timed out; {budget_used}/{cfg.verification_budget} tokens, "
+            f"stopped on {stop_reason}."
+        )
+        if verified is False:
+            notes.append("Verifier majority says FAIL; treat the decision with care.")
 
-        decision: ReconciledDecision = self.reconciler.reconcile(task)
-
-        # For v1, we just say we used a fixed amount of budget.
-        # Later this will be tied to actual meta-operations.
-        budget_used = 50  # arbitrary small fixed cost for now
-
-        notes = [
-            "Called Reconciler (Architect + Oracle).",
-            "No extra self-check passes yet (v1 stub).",
-            "verification_budget will control deeper checks in future versions.",
-        ]
-
+        decision_dict = asdict(decision)
+        decision_dict["confidence"] = confidence
+        # The emotions the temperatures came from, not reconcile's neutral ones.
+        decision_dict["emotions"] = emotions
         return CoVeResult(
             task=task,
-            decision=decision.to_dict(),
+            decision=decision_dict,
             budget_used=budget_used,
-            budget_limit=self.config.verification_budget,
+            budget_limit=cfg.verification_budget,
             notes=notes,
+            tokens_used=meter.tokens,
+            model_calls=meter.calls,
+            wall_time=time.perf_counter() - start,
+            verification_calls=meter.calls - primary_calls,
+            verification_time=verification_time,
+            passes=passes,
+            stop_reason=stop_reason,
+            verified=verified,
         )
 
 
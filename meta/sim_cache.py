@@ -0,0 +1,333 @@
+"""
+meta/sim_cache.py — content-addressed cache + structural diff for Meta-C3
+
+simulate_c3() is deterministic in (task, mode, confidence, emotions)
+and the code of the modules it runs. Forge calls it again and again for
+the same inputs, so results are cached under
+
+    key  = sha256(task, mode, params)          (within a code revision)
+    code = sha256(source of SOURCE_MODULES)    (the code revision, as loaded)
+
+Each code revision is one "simulation set": an append-only JSONL file
+<cache dir>/<code>.jsonl. Editing any source module changes `code` for
+the next process that loads it, so lookups go to a new, empty set —
+invalidation is automatic — while the old set stays on disk for diffs.
+A running process keeps the revision it imported, since that is the
+code it still executes.
+
+Every row stores a digest of its result, so diff_sets() between two
+revisions skips identical rows with one string compare and only walks
+the rows that changed, reporting JSON paths:
+
+    python3 -m meta.sim_cache revisions
+    python3 -m meta.sim_cache diff <code-a> <code-b>
+"""
+
+from __future__ import annotations
+
+import copy
+import hashlib
+import importlib
+import json
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from meta.c3_sim import DEFAULT_SIM_CONFIDENCE, SimulationResult, simulate_c3
+
+
+DEFAULT_CACHE_DIR = Path(__file__).with_name("sim_cache")
+
+# Everything simulate_c3() executes; a change to any of these is a new revision.
+SOURCE_MODULES: Tuple[str, ...] = (
+    "meta.c3_sim",
+    "reasoning.reconcile",
+    "reasoning.temperature_policy",
+)
+
+
+# modules -> fingerprint, fixed the first time it is asked for.
+_fingerprints: Dict[Tuple[str, ...], str] = {}
+
+
+def source_fingerprint(modules: Tuple[str, ...] = SOURCE_MODULES) -> str:
+    """
+    sha256 over the names and sources of `modules` (first 16 hex chars).
+
+    Taken once per process, when the modules are loaded (the default set
+    at import of this module), and never re-read: a long-running process
+    keeps executing the code it imported, so editing a file on disk must
+    not move its results to the new revision.
+    """
+    fingerprint = _fingerprints.get(modules)
+    if fingerprint is None:
+        h = hashlib.sha256()
+        for name in modules:
+            module = importlib.import_module(name)
+            path = getattr(module, "__file__", None)
+            source = Path(path).read_bytes() if path else b"\0builtin\0"
+            h.update(f"{name}\0{hashlib.sha256(source).hexdigest()}\0".encode())
+        fingerprint = _fingerprints[modules] = h.hexdigest()[:16]
+    return fingerprint
+
+
+# The revision of the code this process runs.
+LOADED_REVISION = source_fingerprint()
+
+
+def _canonical(obj: Any) -> str:
+    return json.dumps(obj, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+
+
+def _digest(obj: Any) -> str:
+    return hashlib.sha256(_canonical(obj).encode("utf-8")).hexdigest()[:16]
+
+
+def params_key(task: str, mode: str, params: Dict[str, Any]) -> str:
+    return _digest({"task": task, "mode": mode, "params": params})
+
+
+@dataclass
+class SimulationSet:
+    """
+    All cached rows of one code revision: key -> row.
+    """
+
+    code: str
+    rows: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+
+class SimCache:
+    """
+    Cache of SimulationResults, one JSONL file per code revision.
+
+        cache = SimCache()
+        result = cache.simulate("plan my day", mode="explore", confidence=0.4)
+        cache.stats()   # hits / misses / current revision
+    """
+
+    def __init__(self, root: Optional[str] = None, modules: Tuple[str, ...] = SOURCE_MODULES) -> None:
+        self.root = Path(root) if root else DEFAULT_CACHE_DIR
+        self.modules = modules
+        self.hits = 0
+        self.misses = 0
+        self._sets: Dict[str, SimulationSet] = {}
+        self._lock = threading.Lock()
+
+    # --- storage ----------------------------------------------------------------
+
+    def _path(self, code: str) -> Path:
+        return self.root / f"{code}.jsonl"
+
+    def load(self, code: str) -> SimulationSet:
+        """
+        The simulation set of revision `code` (read once, then kept in memory).
+        """
+        sim_set = self._sets.get(code)
+        if sim_set is not None:
+            return sim_set
+        sim_set = SimulationSet(code)
+        path = self._path(code)
+        if path.exists():
+            with path.open("r", encoding="utf-8") as f:
+                for raw in f:
+                    try:
+                        row = json.loads(raw)
+                    except json.JSONDecodeError:
+                        continue  # torn last line after a crash
+                    sim_set.rows[row["key"]] = row
+        self._sets[code] = sim_set
+        return sim_set
+
+    def _append(self, code: str, row: Dict[str, Any]) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        with self._path(code).open("a", encoding="utf-8") as f:
+            f.write(json.dumps(row, ensure_ascii=False) + "\n")
+
+    def revisions(self) -> List[Tuple[str, int, float]]:
+        """
+        (code, rows, mtime) for every cached revision, newest first.
+        """
+        out = []
+        if self.root.exists():
+            for path in self.root.glob("*.jsonl"):
+                with path.open("rb") as f:
+                    rows = sum(1 for _ in f)
+                out.append((path.stem, rows, path.stat().st_mtime))
+        return sorted(out, key=lambda r: r[2], reverse=True)
+
+    # --- lookups ------------------------------------------------------------------
+
+    def simulate(
+        self,
+        task: str,
+        mode: str = "default",
+        confidence: Optional[float] = None,
+        emotions: Optional[Dict[str, float]] = None,
+    ) -> SimulationResult:
+        """
+        simulate_c3() with caching under the current code revision.
+        """
+        if confidence is None:
+            confidence = DEFAULT_SIM_CONFIDENCE
+        params = {"confidence": confidence, "emotions": emotions}
+        key = params_key(task, mode, params)
+        code = source_fingerprint(self.modules)
+
+        with self._lock:
+            row = self.load(code).rows.get(key)
+            if row is not None:
+                self.hits += 1
+                r = row["result"]
+                return SimulationResult(
+                    mode=r["mode"],
+                    task=r["task"],
+                    simulation=r["simulation"],
+                    # Callers may mutate the result; keep the cached row intact.
+                    reconcile_result=copy.deepcopy(r["reconcile_result"]),
+                )
+            self.misses += 1
+
+        result = simulate_c3(task, mode=mode, confidence=confidence, emotions=emotions)
+        data = result.to_dict()
+        row = {"key": key, "task": task, "mode": mode, "params": params, "digest": _digest(data), "result": data}
+        with self._lock:
+            self.load(code).rows[key] = row
+            self._append(code, row)
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        return {"revision": source_fingerprint(self.modules), "hits": self.hits, "misses": self.misses}
+
+
+_default_cache: Optional[SimCache] = None
+
+
+def cached_simulate_c3(
+    task: str,
+    mode: str = "default",
+    confidence: Optional[float] = None,
+    emotions: Optional[Dict[str, float]] = None,
+) -> SimulationResult:
+    """
+    simulate_c3() through the shared on-disk cache.
+    """
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = SimCache()
+    return _default_cache.simulate(task, mode=mode, confidence=confidence, emotions=emotions)
+
+
+# --- structural diff -----------------------------------------------------------------
+
+
+def diff_values(a: Any, b: Any, path: str = "") -> Iterator[Tuple[str, Any, Any]]:
+    """
+    (json path, a, b) for every leaf that differs between two JSON values.
+    """
+    if isinstance(a, dict) and isinstance(b, dict):
+        for k in sorted(set(a) | set(b), key=str):
+            sub = f"{path}.{k}" if path else str(k)
+            if k not in a:
+                yield sub, None, b[k]
+            elif k not in b:
+                yield sub, a[k], None
+            elif a[k] != b[k]:
+                yield from diff_values(a[k], b[k], sub)
+    elif isinstance(a, list) and isinstance(b, list) and len(a) == len(b):
+        for i, (x, y) in enumerate(zip(a, b)):
+            if x != y:
+                yield from diff_values(x, y, f"{path}[{i}]")
+    elif a != b:
+        yield path, a, b
+
+
+def diff_sets(a: SimulationSet, b: SimulationSet, limit: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Compare two simulation sets on their common inputs.
+
+    - only_a / only_b: inputs cached in one revision only
+    - changed: rows whose result differs, with the differing JSON paths
+    - path_counts: how many changed rows touch each path (the summary
+      Forge usually wants: "reconcile_result.choice changed in 312 rows")
+    """
+    only_a = sum(1 for k in a.rows if k not in b.rows)
+    only_b = sum(1 for k in b.rows if k not in a.rows)
+    changed: List[Dict[str, Any]] = []
+    path_counts: Dict[str, int] = {}
+    common = unchanged = 0
+    for key, row_a in a.rows.items():
+        row_b = b.rows.get(key)
+        if row_b is None:
+            continue
+        common += 1
+        if row_a["digest"] == row_b["digest"]:
+            unchanged += 1
+            continue
+        changes = list(diff_values(row_a["result"], row_b["result"]))
+        for path, _, _ in changes:
+            path_counts[path] = path_counts.get(path, 0) + 1
+        if limit is None or len(changed) < limit:
+            changed.append({
+                "key": key,
+                "task": row_a["task"],
+                "mode": row_a["mode"],
+                "params": row_a["params"],
+                "changes": [{"path": p, "a": x, "b": y} for p, x, y in changes],
+            })
+    return {
+        "a": a.code,
+        "b": b.code,
+        "common": common,
+        "unchanged": unchanged,
+        "changed_count": common - unchanged,
+        "changed": changed,
+        "path_counts": dict(sorted(path_counts.items(), key=lambda kv: -kv[1])),
+        "only_a": only_a,
+        "only_b": only_b,
+    }
+
+
+def main() -> None:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Meta-C3 simulation cache")
+    parser.add_argument("--dir", type=str, default=None, help=f"Cache directory (default: {DEFAULT_CACHE_DIR})")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("revisions", help="List cached code revisions")
+    p_diff = sub.add_parser("diff", help="Structural diff of two revisions")
+    p_diff.add_argument("a", type=str)
+    p_diff.add_argument("b", type=str)
+    p_diff.add_argument("--limit", type=int, default=20, help="Changed rows to print")
+    p_diff.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    cache = SimCache(args.dir)
+    if args.cmd == "revisions":
+        current = source_fingerprint()
+        for code, rows, mtime in cache.revisions():
+            mark = "*" if code == current else " "
+            print(f"{mark} {code}  {rows:>8} rows")
+        return
+
+    report = diff_sets(cache.load(args.a), cache.load(args.b), limit=args.limit)
+    if args.json:
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+        return
+    print(
+        f"{report['a']} -> {report['b']}: {report['common']} common inputs, "
+        f"{report['changed_count']} changed, {report['only_a']} only in a, {report['only_b']} only in b"
+    )
+    for path, n in report["path_counts"].items():
+        print(f"  {path:<40} {n:>8}")
+    for row in report["changed"]:
+        first = row["changes"][0] if row["changes"] else {}
+        print(f"  - {row['task'][:40]!r} [{row['mode']}] {first.get('path')}: {first.get('a')!r} -> {first.get('b')!r}")
+
+
+if __name__ == "__main__":
+    main()
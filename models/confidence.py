@@ -0,0 +1,40 @@
+"""
+models/confidence.py
+
+Cheap confidence estimates from per-token log-probabilities.
+
+LocalTextModel records the log-probability of every token it samples.
+These helpers turn that list into a single 0–1 number:
+
+- confidence_from_logprobs(): geometric-mean token probability,
+  i.e. exp(mean log p). 1.0 = the model was sure of every token.
+- windowed_confidence(): the same over the last `window` tokens, used
+  during decoding to stop early once the model starts to flounder.
+
+Pure Python on purpose, so callers without torch (Meta-C3, replay
+tools) can use it on logged log-probs.
+"""
+
+from __future__ import annotations
+
+import math
+from typing import Optional, Sequence
+
+
+def confidence_from_logprobs(logprobs: Sequence[float]) -> Optional[float]:
+    """
+    exp(mean log-probability) over all tokens, or None if there are none.
+    """
+    if not logprobs:
+        return None
+    mean = sum(logprobs) / len(logprobs)
+    return max(0.0, min(1.0, math.exp(mean)))
+
+
+def windowed_confidence(logprobs: Sequence[float], window: int = 16) -> Optional[float]:
+    """
+    confidence_from_logprobs() over the last `window` tokens only.
+    """
+    if window <= 0:
+        return confidence_from_logprobs(logprobs)
+    return confidence_from_logprobs(logprobs[-window:])
@@ -9,21 +9,63 @@ run on a single GPU. Later we can upgrade the model name in one place.
 Important:
 - Architect / Oracle call this with max_tokens=...
 - We accept max_tokens and map it to HF's max_new_tokens.
+- generate() returns plain text; generate_with_logprobs() also returns
+  the log-probability of every sampled token (recorded during decoding,
+  no extra forward pass) plus a confidence estimate, and can stop early
+  when confidence drops below a floor.
+- Both accept `stop` (strings) and `stop_token_ids`; decoding halts as
+  soon as one appears and the text is cut before the stop string.
+- Speculative decoding: pass `draft_model=` (or set config.draft_model)
+  to a small model sharing our tokenizer. It proposes num_draft_tokens
+  per step; we verify them in one forward pass with speculative sampling
+  (HF assisted generation), so outputs keep the target's distribution.
+  Acceptance rate, tokens per target pass and an estimated speedup are
+  returned in GenerationResult.speculative, logged per call, and summed
+  in speculative_report().
+- `prompt` may also be a PromptIds (models/prompt_template.py): the ids
+  are used as-is, and the first prefix_len of them (the template's
+  static header) have their KV cache kept in a small LRU, so the header
+  is run through the model once and every later call only prefills the
+  task/context part. prefix_cache_size=0 turns this off.
+
+CPU fast path (LocalTextModelConfig):
+- precision="int8": dynamic int8 quantization of every nn.Linear
+  (weights int8, activations quantized on the fly). CPU only.
+- precision="bf16": bfloat16 weights, used only when the CPU has native
+  bf16 (AVX512_BF16 / AMX); otherwise we stay in fp32, because emulated
+  bf16 is slower than fp32.
+- num_threads / num_interop_threads: explicit torch thread pools.
+- inference_mode: decode under torch.inference_mode() (no autograd
+  version counters) instead of torch.no_grad().
+
+Benchmark every mode on a tiny locally built model:
+
+    python3 -m tools.bench_local_model
 """
 
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Optional
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
 
+import copy
 import os
+import threading
 import torch
 
 from transformers import (
     AutoTokenizer,
     AutoModelForCausalLM,
+    LogitsProcessor,
+    LogitsProcessorList,
+    StoppingCriteria,
+    StoppingCriteriaList,
 )
 
+from models.confidence import confidence_from_logprobs, windowed_confidence
+from models.prompt_template import PromptIds
+
 
 @dataclass
 class LocalTextModelConfig:
@@ -31,6 +73,359 @@ class LocalTextModelConfig:
     max_tokens: int = 256          # architect/oracle use this name
     temperature: float = 0.7
     device: Optional[str] = None   # "cuda", "cpu", or None for auto
+    precision: str = "fp32"        # "fp32" | "bf16" | "int8"
+    num_threads: Optional[int] = None          # torch.set_num_threads
+    num_interop_threads: Optional[int] = None  # torch.set_num_interop_threads
+    inference_mode: bool = True
+    draft_model: Optional[str] = None   # default draft for speculative decoding
+    num_draft_tokens: int = 5           # tokens proposed per verification pass
+    log_speculative: bool = False       # print per-call acceptance / speedup
+    prefix_cache_size: int = 4          # template-prefix KV caches kept (0 = off)
+
+
+PRECISIONS = ("fp32", "bf16", "int8")
+
+
+def cpu_supports_bf16() -> bool:
+    """
+    True if this CPU has native bf16 matmul (AVX512_BF16 or AMX).
+    """
+    try:
+        with open("/proc/cpuinfo", encoding="utf-8") as f:
+            flags = f.read()
+    except OSError:
+        return False
+    return "avx512_bf16" in flags or "amx_bf16" in flags
+
+
+def configure_threads(num_threads: Optional[int], num_interop_threads: Optional[int]) -> None:
+    """
+    Set torch's intra-op / inter-op thread pools. Both are process-wide;
+    the inter-op pool can only be sized before it is first used, so a
+    late call is ignored with a note instead of raising.
+    """
+    if num_threads is not None:
+        torch.set_num_threads(num_threads)
+    if num_interop_threads is not None and torch.get_num_interop_threads() != num_interop_threads:
+        try:
+            torch.set_num_interop_threads(num_interop_threads)
+        except RuntimeError:
+            print(
+                "[LocalTextModel] inter-op threads already started; "
+                f"keeping {torch.get_num_interop_threads()}",
+                flush=True,
+            )
+
+
+class CallbackStoppingCriteria(StoppingCriteria):
+    """
+    Stops HF generation as soon as `should_stop()` returns True.
+    HF checks stopping criteria after every decode step, so this is how
+    a background caller gets preempted mid-generation.
+    """
+
+    def __init__(self, should_stop: Callable[[], bool]) -> None:
+        self.should_stop = should_stop
+
+    def __call__(self, input_ids, scores, **kwargs) -> bool:
+        return bool(self.should_stop())
+
+
+@dataclass
+class SpeculativeStats:
+    """
+    Speculative-decoding counters for one call (or summed over many).
+
+    - drafted: tokens the draft proposed
+    - accepted: proposals the target kept
+    - target_forwards: target forward passes (one per verification step)
+    - draft_forwards: draft forward passes
+    - generated: tokens produced
+    - target_time / draft_time: seconds spent in each model's forward
+
+    est_speedup compares against plain decoding, which would have needed
+    one target forward per generated token. It uses the measured mean
+    verify-pass time as the single-token cost, so treat it as an
+    estimate; tools/bench_local_model.py measures the real wall-clock ratio.
+    """
+
+    drafted: int = 0
+    accepted: int = 0
+    target_forwards: int = 0
+    draft_forwards: int = 0
+    generated: int = 0
+    target_time: float = 0.0
+    draft_time: float = 0.0
+
+    @property
+    def acceptance_rate(self) -> float:
+        return self.accepted / self.drafted if self.drafted else 0.0
+
+    @property
+    def tokens_per_forward(self) -> float:
+        return self.generated / self.target_forwards if self.target_forwards else 0.0
+
+    @property
+    def est_speedup(self) -> float:
+        if not self.target_forwards:
+            return 0.0
+        per_forward = self.target_time / self.target_forwards
+        spent = self.target_time + self.draft_time
+        return self.generated * per_forward / spent if spent else 0.0
+
+    def add(self, other: "SpeculativeStats") -> None:
+        self.drafted += other.drafted
+        self.accepted += other.accepted
+        self.target_forwards += other.target_forwards
+        self.draft_forwards += other.draft_forwards
+        self.generated += other.generated
+        self.target_time += other.target_time
+        self.draft_time += other.draft_time
+
+    def as_dict(self) -> Dict[str, float]:
+        return {
+            "drafted": self.drafted,
+            "accepted": self.accepted,
+            "target_forwards": self.target_forwards,
+            "generated": self.generated,
+            "acceptance_rate": self.acceptance_rate,
+            "tokens_per_forward": self.tokens_per_forward,
+            "est_speedup": self.est_speedup,
+        }
+
+
+class _SpeculativeMonitor:
+    """
+    Forward hooks on the target and draft models for one assisted
+    generate() call. The models are shared, so the hooks only count
+    forwards on the thread that created the monitor (HF generate runs
+    its forwards on the calling thread); concurrent calls each get their
+    own stats.
+
+    HF's assisted decoding runs one target forward per step over
+    [last token + candidates] (the first step also covers the prompt),
+    and each step yields accepted + 1 tokens. So from the target's input
+    lengths alone: drafted = Σ candidates, accepted = generated − steps.
+    """
+
+    def __init__(self, target, draft, prompt_len: int) -> None:
+        self.prompt_len = prompt_len
+        self.target_lengths: List[int] = []
+        self.target_time = 0.0
+        self.draft_forwards = 0
+        self.draft_time = 0.0
+        self._handles: list = []
+        self._started = 0.0
+        self._thread = threading.get_ident()
+        self._hook(target, is_target=True)
+        self._hook(draft, is_target=False)
+
+    def _hook(self, module, is_target: bool) -> None:
+        import time
+
+        def pre(mod, args, kwargs):
+            if threading.get_ident() != self._thread:
+                return
+            if is_target:
+                ids = kwargs.get("input_ids", args[0] if args else None)
+                self.target_lengths.append(0 if ids is None else int(ids.shape[1]))
+            self._started = time.perf_counter()
+
+        def post(mod, args, kwargs, output):
+            if threading.get_ident() != self._thread:
+                return
+            elapsed = time.perf_counter() - self._started
+            if is_target:
+                self.target_time += elapsed
+            else:
+                self.draft_forwards += 1
+                self.draft_time += elapsed
+
+        self._handles.append(module.register_forward_pre_hook(pre, with_kwargs=True))
+        self._handles.append(module.register_forward_hook(post, with_kwargs=True))
+
+    def close(self) -> None:
+        for h in self._handles:
+            h.remove()
+        self._handles = []
+
+    def stats(self, generated: int) -> SpeculativeStats:
+        steps = len(self.target_lengths)
+        drafted = 0
+        for i, n in enumerate(self.target_lengths):
+            drafted += max(0, n - (self.prompt_len if i == 0 else 1))
+        return SpeculativeStats(
+            drafted=drafted,
+            accepted=max(0, generated - steps),
+            target_forwards=steps,
+            draft_forwards=self.draft_forwards,
+            generated=generated,
+            target_time=self.target_time,
+            draft_time=self.draft_time,
+        )
+
+
+@dataclass
+class GenerationResult:
+    """
+    Output of LocalTextModel.generate_with_logprobs().
+
+    - text: decoded completion (stripped)
+    - token_logprobs: log p of each sampled token, in order
+    - confidence: exp(mean token_logprobs), None if nothing was generated
+    - stop_reason: "length" | "eos" | "stop" | "preempted" | "low_confidence"
+    - generated_tokens: tokens decoded (including any cut stop string)
+    - speculative: draft/verify metrics when a draft model was used
+    """
+
+    text: str
+    token_logprobs: List[float] = field(default_factory=list)
+    confidence: Optional[float] = None
+    stop_reason: str = "length"
+    generated_tokens: int = 0
+    speculative: Optional[SpeculativeStats] = None
+
+    @property
+    def num_tokens(self) -> int:
+        return self.generated_tokens or len(self.token_logprobs)
+
+
+class StopStringCriteria(StoppingCriteria):
+    """
+    Stops HF generation once any of `stop_strings` appears in the
+    generated text.
+
+    Only the last few generated tokens are decoded on each step (enough
+    to cover the longest stop string), so the check stays O(1) per token
+    instead of re-decoding the whole completion.
+    """
+
+    def __init__(self, tokenizer, stop_strings: Sequence[str], prompt_len: int) -> None:
+        self.tokenizer = tokenizer
+        self.stop_strings = [s for s in stop_strings if s]
+        self.prompt_len = prompt_len
+        # A token decodes to at least one character, so this many tokens
+        # always covers a stop string that straddles token boundaries.
+        self.tail_tokens = max((len(s) for s in self.stop_strings), default=0) + 1
+        self.triggered = False
+
+    def __call__(self, input_ids, scores, **kwargs) -> bool:
+        start = max(self.prompt_len, input_ids.shape[1] - self.tail_tokens)
+        tail = self.tokenizer.decode(input_ids[0, start:], skip_special_tokens=True)
+        if any(s in tail for s in self.stop_strings):
+            self.triggered = True
+        return self.triggered
+
+
+def cut_at_stop(text: str, stop_strings: Sequence[str]) -> str:
+    """
+    Cut `text` before the earliest occurrence of any stop string.
+    """
+    cut = len(text)
+    for s in stop_strings:
+        if not s:
+            continue
+        i = text.find(s)
+        if i != -1 and i < cut:
+            cut = i
+    return text[:cut]
+
+
+class TokenLogprobTracker(LogitsProcessor):
+    """
+    Records the log-probability of each sampled token while HF decodes.
+    HF runs caller-supplied processors before its temperature / top-p
+    warpers, so these are the model's own (unwarped) log-probs.
+
+    HF calls logits processors with the distribution for the token at
+    position input_ids.shape[1], before sampling. We keep that
+    log-softmax vector keyed by position and, once a stopping check (or
+    the final sequence) shows which token really landed there, gather
+    its log-prob.
+
+    Keying by position keeps this correct under speculative decoding,
+    where the draft and then the target score several future positions
+    per step and rejected candidates must not be counted: the target's
+    verification pass is always the last writer for a position, and only
+    positions that made it into input_ids are resolved. Memory is one
+    vocab-sized vector per in-flight position.
+    """
+
+    def __init__(self, prompt_len: int) -> None:
+        self.prompt_len = prompt_len
+        self._pending: dict = {}
+        self._logprobs: list = []
+
+    def __call__(self, input_ids, scores):
+        self._pending[input_ids.shape[1]] = torch.log_softmax(scores[0].float(), dim=-1)
+        return scores
+
+    def collect(self, input_ids) -> None:
+        """
+        Resolve every pending position that is now part of input_ids.
+        """
+        pos = self.prompt_len + len(self._logprobs)
+        while pos < input_ids.shape[1]:
+            dist = self._pending.pop(pos, None)
+            if dist is None:
+                break
+            self._logprobs.append(dist[input_ids[0, pos]])
+            pos += 1
+
+    def __len__(self) -> int:
+        return len(self._logprobs)
+
+    def logprobs(self, last: Optional[int] = None) -> List[float]:
+        """
+        Recorded log-probs as floats (optionally only the `last` N).
+        """
+        values = self._logprobs if last is None else self._logprobs[-last:]
+        if not values:
+            return []
+        return torch.stack(values).tolist()
+
+
+class LogprobCollector(StoppingCriteria):
+    """
+    Never stops; just lets the tracker resolve positions after each
+    decode step so pending distributions don't pile up.
+    """
+
+    def __init__(self, tracker: TokenLogprobTracker) -> None:
+        self.tracker = tracker
+
+    def __call__(self, input_ids, scores, **kwargs) -> bool:
+        self.tracker.collect(input_ids)
+        return False
+
+
+class LowConfidenceStoppingCriteria(StoppingCriteria):
+    """
+    Stops decoding once the windowed confidence of the last `window`
+    tokens falls below `floor` (after at least `min_tokens`).
+    """
+
+    def __init__(
+        self,
+        tracker: TokenLogprobTracker,
+        floor: float,
+        window: int = 16,
+        min_tokens: int = 8,
+    ) -> None:
+        self.tracker = tracker
+        self.floor = floor
+        self.window = window
+        self.min_tokens = min_tokens
+        self.triggered = False
+
+    def __call__(self, input_ids, scores, **kwargs) -> bool:
+        self.tracker.collect(input_ids)
+        if len(self.tracker) < self.min_tokens:
+            return False
+        conf = windowed_confidence(self.tracker.logprobs(last=self.window), self.window)
+        if conf is not None and conf < self.floor:
+            self.triggered = True
+        return self.triggered
 
 
 class LocalTextModel:
@@ -49,6 +444,10 @@ class LocalTextModel:
         self.config = config
 
         model_name = config.model_name
+        if config.precision not in PRECISIONS:
+            raise ValueError(f"precision must be one of {PRECISIONS}, got {config.precision!r}")
+
+        configure_threads(config.num_threads, config.num_interop_threads)
 
         print(f"[LocalTextModel] Loading model: {model_name}", flush=True)
         self.tokenizer = AutoTokenizer.from_pretrained(model_name)
@@ -62,55 +461,342 @@ class LocalTextModel:
             self.device = "cuda" if torch.cuda.is_available() else "cpu"
 
         self.model.to(self.device)
+        self.model.eval()
+        self.precision = self._apply_precision(config.precision)
+
+        # Speculative decoding: draft models by name, loaded on first use.
+        self._drafts: Dict[str, object] = {}
+        self.speculative_totals: Dict[str, SpeculativeStats] = {}
+        self._speculative_lock = threading.Lock()
+
+        # PromptIds prefix ids -> KV cache of that prefix (LRU).
+        self._prefix_kv: "OrderedDict[Tuple[int, ...], object]" = OrderedDict()
+        self._prefix_lock = threading.Lock()  # callers may generate from several threads
+        self.prefix_hits = 0
+        self.prefix_misses = 0
 
         # Some tiny models don't have a pad token; fall back to eos
         if self.tokenizer.pad_token_id is None:
             self.tokenizer.pad_token = self.tokenizer.eos_token
 
+    def _apply_precision(self, precision: str) -> str:
+        """
+        Convert the loaded model to the requested precision and return
+        the precision actually in use.
+        """
+        self.model, used = self._convert(self.model, precision)
+        return used
+
+    def _convert(self, model, precision: str):
+        """
+        (model, requested precision) -> (converted model, precision used).
+        """
+        if precision == "fp32":
+            return model, "fp32"
+
+        if self.device != "cpu":
+            if precision == "bf16":
+                return model.to(torch.bfloat16), "bf16"
+            print(f"[LocalTextModel] int8 dynamic quantization is CPU-only; using fp32 on {self.device}", flush=True)
+            return model, "fp32"
+
+        if precision == "bf16":
+            if not cpu_supports_bf16():
+                print("[LocalTextModel] CPU has no native bf16; using fp32", flush=True)
+                return model, "fp32"
+            return model.to(torch.bfloat16), "bf16"
+
+        # int8: swap every nn.Linear for a dynamically quantized one.
+        from torch.ao.quantization import quantize_dynamic
+
+        return quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8), "int8"
+
+    def _draft(self, name: str):
+        """
+        Load (once) and return the draft model `name`. It must share the
+        target's tokenizer/vocabulary; it gets the same device and precision.
+        """
+        draft = self._drafts.get(name)
+        if draft is not None:
+            return draft
+
+        print(f"[LocalTextModel] Loading draft model: {name}", flush=True)
+        draft = AutoModelForCausalLM.from_pretrained(name)
+        if draft.config.vocab_size != self.model.config.vocab_size:
+            raise ValueError(
+                f"draft model {name!r} has vocab size {draft.config.vocab_size}, "
+                f"target has {self.model.config.vocab_size}; they must share a tokenizer"
+            )
+        draft.to(self.device)
+        draft.eval()
+        draft, _ = self._convert(draft, self.precision)
+        self._drafts[name] = draft
+        return draft
+
+    def _prefix_cache(self, prompt: PromptIds):
+        """
+        A private copy of the KV cache for prompt.ids[:prefix_len], or
+        None when there is nothing to reuse. Generation extends the
+        cache in place, so the stored one is never handed out.
+        """
+        size = self.config.prefix_cache_size
+        n = prompt.prefix_len
+        if size <= 0 or n <= 0 or n >= len(prompt.ids):
+            return None
+
+        key = tuple(prompt.ids[:n])
+        with self._prefix_lock:
+            cache = self._prefix_kv.get(key)
+            if cache is None:
+                self.prefix_misses += 1
+                ids = torch.tensor([list(key)], dtype=torch.long, device=self.device)
+                cache = self.model(input_ids=ids, use_cache=True).past_key_values
+                self._prefix_kv[key] = cache
+                while len(self._prefix_kv) > size:
+                    self._prefix_kv.popitem(last=False)
+            else:
+                self.prefix_hits += 1
+                self._prefix_kv.move_to_end(key)
+            return copy.deepcopy(cache)
+
+    def speculative_report(self) -> Dict[str, Dict[str, float]]:
+        """
+        Cumulative speculative-decoding metrics per draft model.
+        """
+        with self._speculative_lock:
+            return {name: stats.as_dict() for name, stats in self.speculative_totals.items()}
+
     def generate(
         self,
-        prompt: str,
+        prompt: Union[str, PromptIds],
         max_tokens: Optional[int] = None,
         temperature: Optional[float] = None,
+        should_stop: Optional[Callable[[], bool]] = None,
+        stop: Optional[Sequence[str]] = None,
+        stop_token_ids: Optional[Sequence[int]] = None,
+        draft_model: Optional[str] = None,
+        num_draft_tokens: Optional[int] = None,
         **_: object,
     ) -> str:
         """
-        Generate a response for the given prompt.
+        Generate a response for the given prompt (text, or PromptIds
+        from a PromptTemplate to skip tokenization and reuse the
+        template prefix's KV cache).
 
         - Architect / Oracle pass max_tokens=...
         - We map to HF max_new_tokens.
+        - should_stop: optional callable checked after every decode step;
+          when it returns True we stop and return what we have so far.
+        - stop: strings that end the completion (not included in the
+          returned text); stop_token_ids: extra token ids treated like EOS.
+        - draft_model: name/path of a small model sharing our tokenizer;
+          it proposes `num_draft_tokens` tokens per step and we verify them
+          in one forward pass (speculative sampling, so the output
+          distribution is unchanged). None = config.draft_model.
         - We ignore any extra kwargs (**_) for now.
         """
+        return self._generate(
+            prompt,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            should_stop=should_stop,
+            stop=stop,
+            stop_token_ids=stop_token_ids,
+            track_logprobs=False,
+            draft_model=draft_model,
+            num_draft_tokens=num_draft_tokens,
+        ).text
+
+    def generate_with_logprobs(
+        self,
+        prompt: Union[str, PromptIds],
+        max_tokens: Optional[int] = None,
+        temperature: Optional[float] = None,
+        should_stop: Optional[Callable[[], bool]] = None,
+        confidence_floor: Optional[float] = None,
+        confidence_window: int = 16,
+        min_tokens: int = 8,
+        stop: Optional[Sequence[str]] = None,
+        stop_token_ids: Optional[Sequence[int]] = None,
+        draft_model: Optional[str] = None,
+        num_draft_tokens: Optional[int] = None,
+        **_: object,
+    ) -> GenerationResult:
+        """
+        Like generate(), but also returns per-token log-probabilities and
+        a confidence estimate.
+
+        - confidence_floor: if set, stop decoding once the confidence of
+          the last `confidence_window` tokens drops below it (checked
+          after `min_tokens` tokens). stop_reason is then "low_confidence".
+        """
+        return self._generate(
+            prompt,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            should_stop=should_stop,
+            stop=stop,
+            stop_token_ids=stop_token_ids,
+            track_logprobs=True,
+            confidence_floor=confidence_floor,
+            confidence_window=confidence_window,
+            min_tokens=min_tokens,
+            draft_model=draft_model,
+            num_draft_tokens=num_draft_tokens,
+        )
 
+    def _generate(
+        self,
+        prompt: Union[str, PromptIds],
+        max_tokens: Optional[int],
+        temperature: Optional[float],
+        should_stop: Optional[Callable[[], bool]],
+        track_logprobs: bool,
+        confidence_floor: Optional[float] = None,
+        confidence_window: int = 16,
+        min_tokens: int = 8,
+        stop: Optional[Sequence[str]] = None,
+        stop_token_ids: Optional[Sequence[int]] = None,
+        draft_model: Optional[str] = None,
+        num_draft_tokens: Optional[int] = None,
+    ) -> GenerationResult:
         if max_tokens is None:
             max_tokens = self.config.max_tokens
         if temperature is None:
             temperature = self.config.temperature
 
-        inputs = self.tokenizer(
-            prompt,
-            return_tensors="pt",
-        ).to(self.device)
-
-        input_ids = inputs["input_ids"]
-        attention_mask = inputs.get("attention_mask", None)
-
-        with torch.no_grad():
-            output_ids = self.model.generate(
-                input_ids=input_ids,
-                attention_mask=attention_mask,
-                max_new_tokens=max_tokens,
-                temperature=temperature,
-                do_sample=True,
-                top_p=0.95,
-                pad_token_id=self.tokenizer.eos_token_id,
-            )
+        if isinstance(prompt, PromptIds):
+            input_ids = torch.tensor([prompt.ids], dtype=torch.long, device=self.device)
+            attention_mask = torch.ones_like(input_ids)
+        else:
+            inputs = self.tokenizer(
+                prompt,
+                return_tensors="pt",
+            ).to(self.device)
+            input_ids = inputs["input_ids"]
+            attention_mask = inputs.get("attention_mask", None)
+        prompt_len = input_ids.shape[1]
+
+        criteria = []
+        preempt = None
+        if should_stop is not None:
+            preempt = CallbackStoppingCriteria(should_stop)
+            criteria.append(preempt)
+
+        stop_strings = [s for s in (stop or ()) if s]
+        stop_criteria = None
+        if stop_strings:
+            stop_criteria = StopStringCriteria(self.tokenizer, stop_strings, prompt_len)
+            criteria.append(stop_criteria)
+
+        eos_ids = [self.tokenizer.eos_token_id]
+        if stop_token_ids:
+            eos_ids += [int(t) for t in stop_token_ids if int(t) not in eos_ids]
+
+        tracker = None
+        low_conf = None
+        processors = None
+        if track_logprobs:
+            tracker = TokenLogprobTracker(prompt_len)
+            processors = LogitsProcessorList([tracker])
+            if confidence_floor is not None:
+                low_conf = LowConfidenceStoppingCriteria(
+                    tracker, confidence_floor, confidence_window, min_tokens
+                )
+                criteria.append(low_conf)
+            else:
+                criteria.append(LogprobCollector(tracker))
+
+        extra = {}
+        monitor = None
+        draft_name = draft_model or self.config.draft_model
+        if draft_name:
+            draft = self._draft(draft_name)
+            # HF reads the draft length from the assistant's own config.
+            # A constant schedule with no confidence cut-off keeps the
+            # proposal length (and so the metrics) predictable.
+            draft.generation_config.num_assistant_tokens = num_draft_tokens or self.config.num_draft_tokens
+            draft.generation_config.num_assistant_tokens_schedule = "constant"
+            draft.generation_config.assistant_confidence_threshold = 0.0
+            extra["assistant_model"] = draft
+            monitor = _SpeculativeMonitor(self.model, draft, prompt_len)
+
+        grad_off = torch.inference_mode() if self.config.inference_mode else torch.no_grad()
+        with grad_off:
+            # The draft would need its own prefix cache, so only plain
+            # decoding reuses the template prefix.
+            if isinstance(prompt, PromptIds) and not draft_name:
+                past = self._prefix_cache(prompt)
+                if past is not None:
+                    extra["past_key_values"] = past
+            try:
+                output_ids = self.model.generate(
+                    input_ids=input_ids,
+                    attention_mask=attention_mask,
+                    max_new_tokens=max_tokens,
+                    temperature=temperature,
+                    do_sample=True,
+                    top_p=0.95,
+                    pad_token_id=self.tokenizer.eos_token_id,
+                    eos_token_id=eos_ids if len(eos_ids) > 1 else eos_ids[0],
+                    stopping_criteria=StoppingCriteriaList(criteria) if criteria else None,
+                    logits_processor=processors,
+                    **extra,
+                )
+            finally:
+                if monitor is not None:
+                    monitor.close()
 
         # Take only the newly generated tokens after the prompt
-        generated_ids = output_ids[0, input_ids.shape[1]:]
+        generated_ids = output_ids[0, prompt_len:]
         text = self.tokenizer.decode(
             generated_ids,
             skip_special_tokens=True,
             clean_up_tokenization_spaces=True,
         )
-        return text.strip()
+        if stop_strings:
+            text = cut_at_stop(text, stop_strings)
+        text = text.strip()
+
+        logprobs: List[float] = []
+        if tracker is not None:
+            tracker.collect(output_ids)
+            logprobs = tracker.logprobs()
+
+        last_id = int(generated_ids[-1]) if generated_ids.shape[0] else None
+        if low_conf is not None and low_conf.triggered:
+            stop_reason = "low_confidence"
+        elif preempt is not None and should_stop():
+            stop_reason = "preempted"
+        elif (stop_criteria is not None and stop_criteria.triggered) or (
+            stop_token_ids and last_id in stop_token_ids
+        ):
+            stop_reason = "stop"
+        elif generated_ids.shape[0] < max_tokens:
+            stop_reason = "eos"
+        else:
+            stop_reason = "length"
+
+        speculative = None
+        if monitor is not None:
+            speculative = monitor.stats(int(generated_ids.shape[0]))
+            with self._speculative_lock:
+                self.speculative_totals.setdefault(draft_name, SpeculativeStats()).add(speculative)
+            if self.config.log_speculative:
+                print(
+                    f"[LocalTextModel] speculative draft={draft_name}: "
+                    f"accepted {speculative.accepted}/{speculative.drafted} "
+                    f"({speculative.acceptance_rate:.0%}), "
+                    f"{speculative.tokens_per_forward:.2f} tokens/target pass, "
+                    f"est. speedup {speculative.est_speedup:.2f}x",
+                    flush=True,
+                )
+
+        return GenerationResult(
+            text=text,
+            token_logprobs=logprobs,
+            confidence=confidence_from_logprobs(logprobs),
+            stop_reason=stop_reason,
+            generated_tokens=int(generated_ids.shape[0]),
+            speculative=speculative,
+        )
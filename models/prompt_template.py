@@ -0,0 +1,250 @@
+"""
+models/prompt_template.py
+
+Pre-tokenized prompt templates + an LRU tokenizer cache.
+
+The brains used to build their prompt by string concatenation, and
+LocalTextModel re-tokenized the whole thing on every call, even though
+the header and instructions never change. Here:
+
+- PromptTemplate holds a prompt as static text blocks and Slots
+  (task, context, ...). Static blocks are tokenized once per tokenizer
+  and kept as token ids; each call only tokenizes the slot segments.
+- TokenCache is a thread-safe LRU of text -> token ids, shared per
+  tokenizer (token_cache(tok)). Slot segments go through it, so a
+  repeated task string costs a dict lookup. The MRE and the adaptive
+  length policy count tokens through the same cache.
+- render() returns PromptIds: the ids, the equivalent text, and
+  prefix_len — how many leading tokens are identical on every call.
+  LocalTextModel keeps the KV cache of that prefix, so the header is
+  only ever run through the model once.
+
+Token boundaries: segments are tokenized *in context* (with a few
+characters of their neighbours, using the fast tokenizer's offset
+mapping), so whitespace runs and word-initial markers come out as they
+would in the full string. If a token would straddle a boundary, or the
+tokenizer has no offsets, the segment is tokenized on its own; the ids
+are then valid but may differ slightly from whole-string tokenization.
+"""
+
+from __future__ import annotations
+
+import threading
+import weakref
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+
+# Characters of neighbouring text used as tokenization context.
+_CONTEXT_CHARS = 8
+
+
+@dataclass(frozen=True)
+class Slot:
+    """
+    A variable part of a template.
+
+    - prefix / suffix: static text around the value ("Task: " ... "\\n")
+    - optional: if the value is empty/None, prefix and suffix are dropped too
+    """
+
+    name: str
+    prefix: str = ""
+    suffix: str = ""
+    optional: bool = False
+
+
+@dataclass
+class PromptIds:
+    """
+    A rendered prompt: token ids plus the text they stand for.
+    prefix_len = leading ids that are the same for every render of the
+    template (safe to reuse a KV cache for).
+    """
+
+    ids: List[int]
+    text: str
+    prefix_len: int = 0
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+
+class TokenCache:
+    """
+    LRU cache of tokenizer results for one tokenizer.
+
+    encode(text)                  -> tuple of ids (no special tokens)
+    encode_span(left, text, right) -> ids of `text` as tokenized between
+                                      `left` and `right`
+    count(text)                   -> len(encode(text))
+    """
+
+    def __init__(self, tokenizer: Any, maxsize: int = 4096) -> None:
+        self.tokenizer = tokenizer
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[Tuple[str, str, str], Tuple[int, ...]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._has_offsets = bool(getattr(tokenizer, "is_fast", False))
+
+    def _get(self, key: Tuple[str, str, str]) -> Optional[Tuple[int, ...]]:
+        with self._lock:
+            ids = self._data.get(key)
+            if ids is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return ids
+
+    def _put(self, key: Tuple[str, str, str], ids: Tuple[int, ...]) -> None:
+        with self._lock:
+            self._data[key] = ids
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def encode(self, text: str) -> Tuple[int, ...]:
+        return self.encode_span("", text, "")
+
+    def count(self, text: str) -> int:
+        return len(self.encode(text)) if text else 0
+
+    def encode_span(self, left: str, text: str, right: str) -> Tuple[int, ...]:
+        if not text:
+            return ()
+        key = (left, text, right)
+        ids = self._get(key)
+        if ids is None:
+            ids = self._tokenize_span(left, text, right)
+            self._put(key, ids)
+        return ids
+
+    def _tokenize_span(self, left: str, text: str, right: str) -> Tuple[int, ...]:
+        tok = self.tokenizer
+        if (left or right) and self._has_offsets:
+            enc = tok(left + text + right, add_special_tokens=False, return_offsets_mapping=True)
+            lo, hi = len(left), len(left) + len(text)
+            ids = []
+            clean = True
+            for tid, (start, end) in zip(enc["input_ids"], enc["offset_mapping"]):
+                if end <= lo or start >= hi:
+                    if start == end and lo <= start < hi:
+                        ids.append(tid)
+                    continue
+                if start < lo or end > hi:
+                    clean = False
+                    break
+                ids.append(tid)
+            if clean:
+                return tuple(ids)
+        return tuple(tok.encode(text, add_special_tokens=False))
+
+    def stats(self) -> Dict[str, int]:
+        return {"size": len(self._data), "hits": self.hits, "misses": self.misses}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+_caches: "weakref.WeakKeyDictionary[Any, TokenCache]" = weakref.WeakKeyDictionary()
+_caches_lock = threading.Lock()
+
+
+def token_cache(tokenizer: Any) -> TokenCache:
+    """
+    The shared TokenCache for `tokenizer` (created on first use).
+    """
+    with _caches_lock:
+        cache = _caches.get(tokenizer)
+        if cache is None:
+            cache = _caches[tokenizer] = TokenCache(tokenizer)
+        return cache
+
+
+Part = Union[str, Slot]
+
+
+class PromptTemplate:
+    """
+    Static text + Slots, rendered either as text or as token ids.
+
+        T = PromptTemplate(["You are ...\\n\\n", Slot("task", "Task: ", "\\n"), "Please ..."])
+        T.render_text(task="plan")              -> str
+        T.render(tokenizer, task="plan")        -> PromptIds
+    """
+
+    def __init__(self, parts: Sequence[Part]) -> None:
+        self.parts: Tuple[Part, ...] = tuple(parts)
+        # tokenizer -> {(left, text, right): ids} for static blocks; a
+        # handful of entries (one per optional-slot combination).
+        self._static: "weakref.WeakKeyDictionary[Any, Dict[Tuple[str, str, str], Tuple[int, ...]]]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self._bos: "weakref.WeakKeyDictionary[Any, Tuple[int, ...]]" = weakref.WeakKeyDictionary()
+
+    def _segments(self, fields: Dict[str, Optional[str]]) -> List[Tuple[str, bool, str, str]]:
+        """
+        Rendered segments as (text, is_static, static head, static tail),
+        empty ones dropped. head/tail are the parts of the segment that
+        never change (a slot's prefix/suffix), used as context for
+        neighbouring static blocks so their ids stay fixed.
+        """
+        out: List[Tuple[str, bool, str, str]] = []
+        for part in self.parts:
+            if isinstance(part, str):
+                if part:
+                    out.append((part, True, part, part))
+                continue
+            value = fields.get(part.name)
+            if value is None:
+                value = ""
+            if part.optional and not value:
+                continue
+            out.append((f"{part.prefix}{value}{part.suffix}", False, part.prefix, part.suffix))
+        return out
+
+    def render_text(self, **fields: Optional[str]) -> str:
+        return "".join(seg[0] for seg in self._segments(fields))
+
+    def _bos_ids(self, tokenizer: Any) -> Tuple[int, ...]:
+        ids = self._bos.get(tokenizer)
+        if ids is None:
+            # Whatever special tokens the tokenizer adds around an empty string.
+            ids = self._bos[tokenizer] = tuple(tokenizer("", add_special_tokens=True)["input_ids"])
+        return ids
+
+    def render(self, tokenizer: Any, **fields: Optional[str]) -> PromptIds:
+        segments = self._segments(fields)
+        cache = token_cache(tokenizer)
+        static = self._static.setdefault(tokenizer, {})
+
+        ids: List[int] = list(self._bos_ids(tokenizer))
+        prefix_len: Optional[int] = None
+        for i, (text, is_static, _, _) in enumerate(segments):
+            prev = segments[i - 1] if i > 0 else None
+            nxt = segments[i + 1] if i + 1 < len(segments) else None
+            if is_static:
+                left = prev[3][-_CONTEXT_CHARS:] if prev else ""
+                right = nxt[2][:_CONTEXT_CHARS] if nxt else ""
+                key = (left, text, right)
+                seg_ids = static.get(key)
+                if seg_ids is None:
+                    seg_ids = static[key] = cache._tokenize_span(left, text, right)
+            else:
+                if prefix_len is None:
+                    prefix_len = len(ids)
+                left = prev[0][-_CONTEXT_CHARS:] if prev else ""
+                right = nxt[0][:_CONTEXT_CHARS] if nxt else ""
+                seg_ids = cache.encode_span(left, text, right)
+            ids.extend(seg_ids)
+
+        return PromptIds(
+            ids=ids,
+            text="".join(seg[0] for seg in segments),
+            prefix_len=len(ids) if prefix_len is None else prefix_len,
+        )
@@ -0,0 +1,126 @@
+"""
+models/tiny_model.py
+
+Build a tiny, randomly initialised causal LM + tokenizer on disk.
+
+Benchmarks and smoke tests need something LocalTextModel can load with
+from_pretrained() that does not require a download or a GPU. This
+writes a small Llama-architecture model plus a byte-level BPE tokenizer
+trained on the repo's own source files, so it runs fully offline.
+
+    from models.tiny_model import build_tiny_model
+    path = build_tiny_model("/tmp/c3-tiny")
+    LocalTextModel(LocalTextModelConfig(model_name=path, device="cpu"))
+
+The weights are random: output is gibberish, but the shapes, kernels
+and decode loop are the real ones, which is what speed/memory numbers
+need.
+
+Pass tokenizer_from=<dir> to reuse another tiny model's tokenizer, e.g.
+to build a smaller draft model for speculative decoding.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, Optional
+
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+@dataclass
+class TinyModelConfig:
+    vocab_size: int = 4096
+    hidden_size: int = 256
+    intermediate_size: int = 704
+    num_layers: int = 4
+    num_heads: int = 8
+    max_positions: int = 2048
+    seed: int = 0
+
+
+def _corpus(root: Path) -> Iterator[str]:
+    for path in sorted(root.rglob("*.py")):
+        try:
+            yield path.read_text(encoding="utf-8")
+        except (OSError, UnicodeDecodeError):
+            continue
+
+
+def build_tiny_model(
+    path: str,
+    config: Optional[TinyModelConfig] = None,
+    overwrite: bool = False,
+    tokenizer_from: Optional[str] = None,
+) -> str:
+    """
+    Write tokenizer + model to `path` (skipped if it already holds a
+    model, unless overwrite=True). Returns `path`.
+    """
+    if config is None:
+        config = TinyModelConfig()
+    out = Path(path)
+    if (out / "config.json").exists() and not overwrite:
+        return str(out)
+    out.mkdir(parents=True, exist_ok=True)
+
+    import torch
+    from tokenizers import Tokenizer, decoders, models, pre_tokenizers, trainers
+    from transformers import LlamaConfig, LlamaForCausalLM, PreTrainedTokenizerFast
+
+    if tokenizer_from is not None:
+        tokenizer = PreTrainedTokenizerFast.from_pretrained(tokenizer_from)
+    else:
+        bpe = Tokenizer(models.BPE())
+        bpe.pre_tokenizer = pre_tokenizers.ByteLevel(add_prefix_space=False)
+        bpe.decoder = decoders.ByteLevel()
+        trainer = trainers.BpeTrainer(
+            vocab_size=config.vocab_size,
+            special_tokens=["<s>", "</s>"],
+            initial_alphabet=pre_tokenizers.ByteLevel.alphabet(),
+        )
+        bpe.train_from_iterator(_corpus(REPO_ROOT), trainer)
+        tokenizer = PreTrainedTokenizerFast(tokenizer_object=bpe, bos_token="<s>", eos_token="</s>")
+    tokenizer.save_pretrained(out)
+
+    torch.manual_seed(config.seed)
+    model = LlamaForCausalLM(LlamaConfig(
+        vocab_size=len(tokenizer),
+        hidden_size=config.hidden_size,
+        intermediate_size=config.intermediate_size,
+        num_hidden_layers=config.num_layers,
+        num_attention_heads=config.num_heads,
+        num_key_value_heads=config.num_heads,
+        max_position_embeddings=config.max_positions,
+        bos_token_id=tokenizer.bos_token_id,
+        eos_token_id=tokenizer.eos_token_id,
+    ))
+    model.save_pretrained(out)
+    return str(out)
+
+
+def main() -> None:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build a tiny random causal LM for offline tests")
+    parser.add_argument("path", type=str, help="Output directory")
+    parser.add_argument("--hidden", type=int, default=TinyModelConfig.hidden_size)
+    parser.add_argument("--layers", type=int, default=TinyModelConfig.num_layers)
+    parser.add_argument("--vocab", type=int, default=TinyModelConfig.vocab_size)
+    parser.add_argument("--tokenizer-from", type=str, default=None, help="Reuse this model dir's tokenizer")
+    parser.add_argument("--overwrite", action="store_true")
+    args = parser.parse_args()
+
+    cfg = TinyModelConfig(
+        vocab_size=args.vocab,
+        hidden_size=args.hidden,
+        intermediate_size=int(args.hidden * 2.75),
+        num_layers=args.layers,
+    )
+    print(build_tiny_model(args.path, cfg, overwrite=args.overwrite, tokenizer_from=args.tokenizer_from))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,478 @@
+"""
+models/worker_pool.py
+
+Out-of-process model backend for C.3.
+
+A single LocalTextModel in the main process serializes all generation
+and shares the GIL with orchestration code. ModelWorkerPool starts N
+worker processes instead. Each one loads LocalTextModel once and serves
+requests over a multiprocessing Pipe:
+
+- small results travel back pickled through the pipe
+- results larger than `shm_threshold` bytes are written into a
+  SharedMemory block; only its name goes through the pipe and the
+  parent unlinks it after reading
+- dispatch is "least_loaded" (fewest in-flight + queued requests) or
+  "round_robin"
+- a health thread pings idle workers every `health_interval` seconds
+  and restarts any that died or stopped answering; a request whose
+  worker dies mid-call is retried on a fresh worker (`max_retries`)
+- `should_stop` still works: the parent watches it while waiting and
+  flips a per-worker Event that the worker's decode loop checks
+- pin_numa=True pins worker i to NUMA node i % nodes (Linux), and
+  sizes its torch thread pool to that node's CPUs
+
+It exposes generate() / generate_with_logprobs() and a parent-side
+`tokenizer`, so it is a drop-in `model=` for ArchitectBrain and
+OracleBrain:
+
+    pool = ModelWorkerPool(ModelWorkerPoolConfig(num_workers=2))
+    architect = ArchitectBrain(model=pool)
+    oracle = OracleBrain(model=pool)
+    ...
+    pool.close()
+"""
+
+from __future__ import annotations
+
+import itertools
+import multiprocessing as mp
+import os
+import pickle
+import threading
+import time
+import traceback
+from dataclasses import dataclass, field, replace
+from multiprocessing import shared_memory
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from models.local_text_model import LocalTextModelConfig
+
+
+DISPATCH_MODES = ("least_loaded", "round_robin")
+
+
+class WorkerError(RuntimeError):
+    """
+    A worker raised while generating; the message carries its traceback.
+    """
+
+
+class WorkerCrashed(RuntimeError):
+    """
+    A worker process died mid-request and retries were exhausted.
+    """
+
+
+@dataclass
+class ModelWorkerPoolConfig:
+    """
+    - model: LocalTextModelConfig each worker loads
+    - num_workers: worker processes
+    - dispatch: "least_loaded" | "round_robin"
+    - health_interval: seconds between pings of idle workers (0 = off)
+    - ping_timeout: seconds a ping may take before the worker is restarted
+    - startup_timeout: seconds a worker may take to load the model
+    - max_retries: re-dispatches of a request whose worker crashed
+    - shm_threshold: results larger than this (bytes) go through shared memory
+    - pin_numa: pin workers round-robin to NUMA nodes
+    - start_method: multiprocessing start method ("spawn" is safe with torch)
+    """
+
+    model: LocalTextModelConfig = field(default_factory=LocalTextModelConfig)
+    num_workers: int = 2
+    dispatch: str = "least_loaded"
+    health_interval: float = 5.0
+    ping_timeout: float = 10.0
+    startup_timeout: float = 600.0
+    max_retries: int = 1
+    shm_threshold: int = 64 * 1024
+    pin_numa: bool = False
+    start_method: str = "spawn"
+
+
+def numa_cpu_sets() -> List[List[int]]:
+    """
+    CPU ids per NUMA node from sysfs; one set with every CPU if unknown.
+    """
+    nodes = sorted(Path("/sys/devices/system/node").glob("node[0-9]*"))
+    sets: List[List[int]] = []
+    for node in nodes:
+        try:
+            text = (node / "cpulist").read_text().strip()
+        except OSError:
+            continue
+        cpus: List[int] = []
+        for part in text.split(","):
+            if not part:
+                continue
+            lo, _, hi = part.partition("-")
+            cpus.extend(range(int(lo), int(hi or lo) + 1))
+        if cpus:
+            sets.append(cpus)
+    return sets or [sorted(os.sched_getaffinity(0))]
+
+
+# --- worker side -------------------------------------------------------------
+
+def _send_result(conn, req_id: int, value: Any, shm_threshold: int) -> None:
+    payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+    if len(payload) <= shm_threshold:
+        conn.send(("ok", req_id, payload))
+        return
+
+    block = shared_memory.SharedMemory(create=True, size=len(payload))
+    block.buf[: len(payload)] = payload
+    # The parent owns (and unlinks) the block from here on.
+    try:
+        from multiprocessing import resource_tracker
+
+        resource_tracker.unregister(block._name, "shared_memory")  # type: ignore[attr-defined]
+    except Exception:
+        pass
+    block.close()
+    conn.send(("shm", req_id, (block.name, len(payload))))
+
+
+def _worker_main(conn, config: LocalTextModelConfig, cancel, cpus: Optional[List[int]], shm_threshold: int) -> None:
+    if cpus:
+        os.sched_setaffinity(0, cpus)
+        if config.num_threads is None:
+            config = replace(config, num_threads=len(cpus))
+
+    from models.local_text_model import LocalTextModel
+
+    try:
+        model = LocalTextModel(config)
+    except Exception:
+        conn.send(("error", -1, traceback.format_exc()))
+        return
+    conn.send(("ready", -1, os.getpid()))
+
+    while True:
+        try:
+            msg = conn.recv()
+        except (EOFError, OSError):
+            return
+        kind, req_id = msg[0], msg[1]
+
+        if kind == "stop":
+            return
+        if kind == "ping":
+            conn.send(("pong", req_id, None))
+            continue
+
+        # ("generate" | "generate_with_logprobs", req_id, kwargs).
+        # The parent clears `cancel` before sending, so a stop it sets
+        # while this request is in flight is never lost.
+        try:
+            value = getattr(model, kind)(should_stop=cancel.is_set, **msg[2])
+        except Exception:
+            conn.send(("error", req_id, traceback.format_exc()))
+            continue
+        _send_result(conn, req_id, value, shm_threshold)
+
+
+# --- parent side ---------------------------------------------------------------
+
+class _Worker:
+    def __init__(self, index: int) -> None:
+        self.index = index
+        self.process = None
+        self.conn = None
+        self.cancel = None
+        self.lock = threading.Lock()   # one request at a time per worker
+        self.load = 0                  # in-flight + waiting requests
+        self.served = 0
+        self.restarts = 0
+
+    @property
+    def alive(self) -> bool:
+        return self.process is not None and self.process.is_alive()
+
+
+class ModelWorkerPool:
+    """
+    Pool of model worker processes with the LocalTextModel call API.
+    """
+
+    def __init__(self, config: Optional[ModelWorkerPoolConfig] = None, load_tokenizer: bool = True) -> None:
+        if config is None:
+            config = ModelWorkerPoolConfig()
+        if config.dispatch not in DISPATCH_MODES:
+            raise ValueError(f"dispatch must be one of {DISPATCH_MODES}, got {config.dispatch!r}")
+        if config.num_workers < 1:
+            raise ValueError("num_workers must be >= 1")
+        self.config = config
+
+        self._ctx = mp.get_context(config.start_method)
+        self._ids = itertools.count()
+        self._rr = itertools.count()
+        self._pick_lock = threading.Lock()
+        self._closed = threading.Event()
+        self._cpu_sets = numa_cpu_sets() if config.pin_numa else None
+
+        # Parent-side tokenizer for token counting (MRE, length policy).
+        self.tokenizer = None
+        if load_tokenizer:
+            from transformers import AutoTokenizer
+
+            self.tokenizer = AutoTokenizer.from_pretrained(config.model.model_name)
+
+        self.workers = [_Worker(i) for i in range(config.num_workers)]
+        for w in self.workers:
+            self._spawn(w)
+        for w in self.workers:
+            self._wait_ready(w)
+
+        self._health_thread = None
+        if config.health_interval > 0:
+            self._health_thread = threading.Thread(target=self._health_loop, name="model-pool-health", daemon=True)
+            self._health_thread.start()
+
+    # --- process management -----------------------------------------------
+
+    def _spawn(self, w: _Worker) -> None:
+        parent_conn, child_conn = self._ctx.Pipe()
+        w.cancel = self._ctx.Event()
+        cpus = self._cpu_sets[w.index % len(self._cpu_sets)] if self._cpu_sets else None
+        w.process = self._ctx.Process(
+            target=_worker_main,
+            args=(child_conn, self.config.model, w.cancel, cpus, self.config.shm_threshold),
+            name=f"c3-model-worker-{w.index}",
+            daemon=True,
+        )
+        w.process.start()
+        child_conn.close()
+        w.conn = parent_conn
+
+    def _wait_ready(self, w: _Worker) -> None:
+        if not w.conn.poll(self.config.startup_timeout):
+            self._kill(w)
+            raise WorkerCrashed(f"worker {w.index} did not load the model in {self.config.startup_timeout}s")
+        try:
+            kind, _, info = w.conn.recv()
+        except EOFError:
+            raise WorkerCrashed(f"worker {w.index} exited while loading the model") from None
+        if kind != "ready":
+            self._kill(w)
+            raise WorkerError(f"worker {w.index} failed to load the model:\n{info}")
+
+    def _kill(self, w: _Worker) -> None:
+        if w.process is not None and w.process.is_alive():
+            w.process.kill()
+        if w.process is not None:
+            w.process.join(timeout=5)
+        if w.conn is not None:
+            w.conn.close()
+
+    def _restart(self, w: _Worker) -> None:
+        """
+        Caller must hold w.lock.
+        """
+        self._kill(w)
+        w.restarts += 1
+        print(f"[ModelWorkerPool] restarting worker {w.index} (restart #{w.restarts})", flush=True)
+        self._spawn(w)
+        self._wait_ready(w)
+
+    def _health_loop(self) -> None:
+        while not self._closed.wait(self.config.health_interval):
+            for w in self.workers:
+                if self._closed.is_set():
+                    return
+                # Only idle workers: a busy one is proving it is alive.
+                if not w.lock.acquire(blocking=False):
+                    continue
+                try:
+                    if not self._ping(w):
+                        self._restart(w)
+                except Exception as exc:
+                    print(f"[ModelWorkerPool] health check failed for worker {w.index}: {exc}", flush=True)
+                finally:
+                    w.lock.release()
+
+    def _ping(self, w: _Worker) -> bool:
+        if not w.alive:
+            return False
+        req_id = next(self._ids)
+        try:
+            w.conn.send(("ping", req_id))
+            if not w.conn.poll(self.config.ping_timeout):
+                return False
+            kind, got, _ = w.conn.recv()
+        except (EOFError, OSError):
+            return False
+        return kind == "pong" and got == req_id
+
+    # --- dispatch -------------------------------------------------------------
+
+    def _pick(self) -> _Worker:
+        with self._pick_lock:
+            if self.config.dispatch == "round_robin":
+                w = self.workers[next(self._rr) % len(self.workers)]
+            else:
+                w = min(self.workers, key=lambda x: (x.load, x.served))
+            w.load += 1
+        return w
+
+    def _call(self, method: str, kwargs: Dict[str, Any], should_stop: Optional[Callable[[], bool]]) -> Any:
+        if self._closed.is_set():
+            raise RuntimeError("ModelWorkerPool is closed")
+
+        attempts = self.config.max_retries + 1
+        for attempt in range(attempts):
+            w = self._pick()
+            try:
+                with w.lock:
+                    if not w.alive:
+                        self._restart(w)
+                    try:
+                        return self._roundtrip(w, method, kwargs, should_stop)
+                    except (EOFError, OSError, WorkerCrashed):
+                        self._restart(w)
+                        if attempt + 1 == attempts:
+                            raise WorkerCrashed(f"worker {w.index} crashed during {method}") from None
+            finally:
+                with self._pick_lock:
+                    w.load -= 1
+        raise WorkerCrashed(method)  # unreachable
+
+    def _roundtrip(self, w: _Worker, method: str, kwargs: Dict[str, Any], should_stop) -> Any:
+        """
+        Caller must hold w.lock.
+        """
+        req_id = next(self._ids)
+        # Reset the previous request's cancel here, not in the worker: a
+        # worker-side clear() could race with (and swallow) our set().
+        w.cancel.clear()
+        w.conn.send((method, req_id, kwargs))
+
+        while not w.conn.poll(0.05):
+            if should_stop is not None and not w.cancel.is_set() and should_stop():
+                w.cancel.set()
+            if not w.alive:
+                raise WorkerCrashed(f"worker {w.index} died")
+
+        kind, got, body = w.conn.recv()
+        w.served += 1
+        if got != req_id:
+            raise WorkerError(f"worker {w.index} answered request {got}, expected {req_id}")
+        if kind == "error":
+            raise WorkerError(body)
+        if kind == "shm":
+            name, size = body
+            block = shared_memory.SharedMemory(name=name)
+            try:
+                payload = bytes(block.buf[:size])
+            finally:
+                block.close()
+                block.unlink()
+            return pickle.loads(payload)
+        return pickle.loads(body)
+
+    # --- LocalTextModel API ------------------------------------------------------
+
+    def generate(
+        self,
+        prompt: str,
+        max_tokens: Optional[int] = None,
+        temperature: Optional[float] = None,
+        should_stop: Optional[Callable[[], bool]] = None,
+        **kwargs: Any,
+    ) -> str:
+        kwargs.update(prompt=prompt, max_tokens=max_tokens, temperature=temperature)
+        return self._call("generate", kwargs, should_stop)
+
+    def generate_with_logprobs(
+        self,
+        prompt: str,
+        max_tokens: Optional[int] = None,
+        temperature: Optional[float] = None,
+        should_stop: Optional[Callable[[], bool]] = None,
+        **kwargs: Any,
+    ):
+        kwargs.update(prompt=prompt, max_tokens=max_tokens, temperature=temperature)
+        return self._call("generate_with_logprobs", kwargs, should_stop)
+
+    # --- lifecycle ---------------------------------------------------------------
+
+    def stats(self) -> List[Dict[str, Any]]:
+        return [
+            {
+                "worker": w.index,
+                "pid": w.process.pid if w.process is not None else None,
+                "alive": w.alive,
+                "load": w.load,
+                "served": w.served,
+                "restarts": w.restarts,
+            }
+            for w in self.workers
+        ]
+
+    def close(self, timeout: float = 5.0) -> None:
+        if self._closed.is_set():
+            return
+        self._closed.set()
+        for w in self.workers:
+            with w.lock:
+                try:
+                    w.conn.send(("stop", -1))
+                except (OSError, ValueError):
+                    pass
+                w.process.join(timeout=timeout)
+                self._kill(w)
+        if self._health_thread is not None:
+            self._health_thread.join(timeout=timeout)
+
+    def __enter__(self) -> "ModelWorkerPool":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def main() -> None:
+    import argparse
+    from concurrent.futures import ThreadPoolExecutor
+
+    parser = argparse.ArgumentParser(description="Model worker pool throughput check")
+    parser.add_argument("--model", type=str, default=None, help="Model name/path (default: build a tiny one)")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--requests", type=int, default=8)
+    parser.add_argument("--tokens", type=int, default=32)
+    parser.add_argument("--dispatch", type=str, default="least_loaded", choices=DISPATCH_MODES)
+    parser.add_argument("--pin-numa", action="store_true")
+    args = parser.parse_args()
+
+    model_name = args.model
+    if model_name is None:
+        import tempfile
+
+        from models.tiny_model import build_tiny_model
+
+        model_name = build_tiny_model(str(Path(tempfile.gettempdir()) / "c3-tiny-model"))
+
+    config = ModelWorkerPoolConfig(
+        model=LocalTextModelConfig(model_name=model_name, device="cpu"),
+        num_workers=args.workers,
+        dispatch=args.dispatch,
+        pin_numa=args.pin_numa,
+    )
+    with ModelWorkerPool(config) as pool:
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.workers * 2) as ex:
+            results = list(ex.map(
+                lambda i: pool.generate_with_logprobs(f"Task {i}: plan", max_tokens=args.tokens),
+                range(args.requests),
+            ))
+        elapsed = time.perf_counter() - start
+        tokens = sum(r.num_tokens for r in results)
+        print(f"{args.requests} requests, {tokens} tokens in {elapsed:.2f}s ({tokens / elapsed:.1f} tok/s)")
+        for row in pool.stats():
+            print(row)
+
+
+if __name__ == "__main__":
+    main()
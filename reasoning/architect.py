@@ -13,14 +13,36 @@ can slightly cool/warm the temperature when needed.
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Dict, Optional, Tuple
+from typing import Callable, Dict, Optional, Tuple, Union
 
 from models.local_text_model import LocalTextModel, LocalTextModelConfig
+from models.prompt_template import PromptIds, PromptTemplate, Slot
+from reasoning.length_policy import DEFAULT_STOP, AdaptiveMaxTokens
+from reasoning.temperature_policy import TemperaturePolicy, default_policy
 
 
 EmotionState = Dict[str, float]
 
 
+# Static header / instructions are tokenized once; only the task and
+# context slots are tokenized per call (see models/prompt_template.py).
+ARCHITECT_TEMPLATE = PromptTemplate([
+    (
+        "You are the ARCHITECT brain of C.3.\n"
+        "Your job is to think logically, step-by-step, and create clear plans.\n"
+        "Respond with a structured plan, numbered steps, and explicit decisions.\n\n"
+    ),
+    Slot("task", "Task: ", "\n"),
+    Slot("context", "Context:\n", "\n\n", optional=True),
+    (
+        "Please answer with:\n"
+        "1. A short summary of the goal.\n"
+        "2. A numbered list of steps.\n"
+        "3. Risks or uncertainties to watch for.\n"
+    ),
+])
+
+
 @dataclass
 class ArchitectConfig:
     """
@@ -28,11 +50,22 @@ class ArchitectConfig:
 
     You can tweak:
       - base_temperature: default "cool" thinking temp
-      - max_tokens: how long Architect answers can be
+      - max_tokens: how long Architect answers can be (upper bound when
+        an adaptive length policy is attached)
+      - stop: strings that end the answer early (the model starting a
+        new prompt section means the answer is done)
+      - draft_model / num_draft_tokens: small model (same tokenizer) for
+        speculative decoding; None = the model backend's default
+      - confidence_floor: stop decoding early when the model's recent
+        token confidence drops below this (None = never)
     """
 
     base_temperature: float = 0.4
     max_tokens: int = 256
+    stop: Tuple[str, ...] = DEFAULT_STOP
+    draft_model: Optional[str] = None
+    num_draft_tokens: int = 5
+    confidence_floor: Optional[float] = 0.1
 
 
 class ArchitectBrain:
@@ -50,10 +83,14 @@ class ArchitectBrain:
         self,
         config: Optional[ArchitectConfig] = None,
         model: Optional[LocalTextModel] = None,
+        policy: Optional[TemperaturePolicy] = None,
+        length_policy: Optional[AdaptiveMaxTokens] = None,
     ) -> None:
         if config is None:
             config = ArchitectConfig()
         self.config = config
+        self.policy = policy or default_policy
+        self.length_policy = length_policy
 
         # Shared model backend (TinyLlama or whatever C3_LOCAL_MODEL points to)
         self.model = model or LocalTextModel(LocalTextModelConfig())
@@ -64,55 +101,44 @@ class ArchitectBrain:
         """
         Map emotion signals to a slight temperature adjustment.
 
-        Simple heuristic:
+        Delegates to the shared TemperaturePolicy (reasoning/temperature_policy.py)
+        so the temperature we generate with is the one reconcile logs:
           - start from base_temperature
           - norepinephrine (focus/alert): lowers temp a bit
           - dopamine (explore/reward): raises temp a bit
         """
+        return self.policy.temperature(
+            "architect", emotions, base=self.config.base_temperature
+        )
 
-        t = self.config.base_temperature
-
-        if not emotions:
-            return max(0.1, min(1.0, t))
-
-        dopamine = float(emotions.get("dopamine", 0.5))          # 0..1
-        norepi = float(emotions.get("norepinephrine", 0.5))      # 0..1
-
-        # Center around 0.5 → [-0.5, +0.5]
-        d_centered = dopamine - 0.5
-        n_centered = norepi - 0.5
-
-        # Dopamine nudges temp up a little, norepi nudges it down a little
-        t += 0.2 * d_centered
-        t -= 0.2 * n_centered
+    def _max_tokens(self) -> int:
+        """
+        Learned budget when a length policy is attached, else config.max_tokens.
+        """
+        if self.length_policy is None:
+            return self.config.max_tokens
+        return self.length_policy.budget("architect", default=self.config.max_tokens)
 
-        return max(0.1, min(1.0, t))
+    def _observe(self, text: str, max_tokens: int, tokens: Optional[int] = None) -> None:
+        if self.length_policy is not None:
+            self.length_policy.observe("architect", text=text, tokens=tokens, budget=max_tokens)
 
     def _build_prompt(self, task: str, context: Optional[str]) -> str:
         """
         Build a structured prompt for the Architect model.
         """
+        return ARCHITECT_TEMPLATE.render_text(task=task, context=context)
 
-        base = (
-            "You are the ARCHITECT brain of C.3.\n"
-            "Your job is to think logically, step-by-step, and create clear plans.\n"
-            "Respond with a structured plan, numbered steps, and explicit decisions.\n\n"
-        )
-
-        task_line = f"Task: {task}\n"
-        if context:
-            ctx = f"Context:\n{context}\n\n"
-        else:
-            ctx = ""
-
-        instructions = (
-            "Please answer with:\n"
-            "1. A short summary of the goal.\n"
-            "2. A numbered list of steps.\n"
-            "3. Risks or uncertainties to watch for.\n"
-        )
-
-        return base + task_line + ctx + instructions
+    def _prompt(self, task: str, context: Optional[str]) -> Union[str, PromptIds]:
+        """
+        The prompt as token ids when the model exposes its tokenizer
+        (static parts are not re-tokenized, and the model can reuse the
+        header's KV cache), else as text.
+        """
+        tokenizer = getattr(self.model, "tokenizer", None)
+        if tokenizer is None:
+            return self._build_prompt(task, context)
+        return ARCHITECT_TEMPLATE.render(tokenizer, task=task, context=context)
 
     # --- public API -------------------------------------------------------
 
@@ -121,6 +147,7 @@ class ArchitectBrain:
         task: str,
         context: Optional[str] = None,
         emotions: Optional[EmotionState] = None,
+        should_stop: Optional[Callable[[], bool]] = None,
     ) -> Tuple[str, float]:
         """
         Main call used by the core:
@@ -130,19 +157,76 @@ class ArchitectBrain:
         Returns:
           - text: model's plan
           - used_temp: the final temperature we used (for logging)
+
+        `should_stop` is forwarded to the model and checked every decode
+        step (used by the idle scheduler to yield to user tasks).
         """
 
         temp = self._compute_temperature(emotions)
-        prompt = self._build_prompt(task, context)
+        prompt = self._prompt(task, context)
+        max_tokens = self._max_tokens()
 
         text = self.model.generate(
             prompt=prompt,
             temperature=temp,
-            max_tokens=self.config.max_tokens,
+            max_tokens=max_tokens,
+            should_stop=should_stop,
+            stop=self.config.stop,
+            draft_model=self.config.draft_model,
+            num_draft_tokens=self.config.num_draft_tokens,
         )
+        self._observe(text, max_tokens)
 
         return text, temp
 
+    def think_with_confidence(
+        self,
+        task: str,
+        context: Optional[str] = None,
+        emotions: Optional[EmotionState] = None,
+        should_stop: Optional[Callable[[], bool]] = None,
+    ) -> Tuple[str, float, Optional[float]]:
+        """
+        Like think(), but also returns a confidence estimate built from
+        the per-token log-probabilities recorded while decoding:
+
+          text, used_temp, confidence = architect.think_with_confidence(task)
+
+        confidence is None when the model backend cannot report
+        log-probs (callers should fall back to their old default).
+        """
+
+        temp = self._compute_temperature(emotions)
+        prompt = self._prompt(task, context)
+        max_tokens = self._max_tokens()
+
+        generate_with_logprobs = getattr(self.model, "generate_with_logprobs", None)
+        if generate_with_logprobs is None:
+            text = self.model.generate(
+                prompt=prompt,
+                temperature=temp,
+                max_tokens=max_tokens,
+                should_stop=should_stop,
+                stop=self.config.stop,
+                draft_model=self.config.draft_model,
+                num_draft_tokens=self.config.num_draft_tokens,
+            )
+            self._observe(text, max_tokens)
+            return text, temp, None
+
+        result = generate_with_logprobs(
+            prompt=prompt,
+            temperature=temp,
+            max_tokens=max_tokens,
+            should_stop=should_stop,
+            confidence_floor=self.config.confidence_floor,
+            stop=self.config.stop,
+            draft_model=self.config.draft_model,
+            num_draft_tokens=self.config.num_draft_tokens,
+        )
+        self._observe(result.text, max_tokens, tokens=result.num_tokens or None)
+        return result.text, temp, result.confidence
+
     # For backward-compat with older runner code that might call .run()
     def run(
         self,
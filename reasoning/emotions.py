@@ -19,6 +19,8 @@ from __future__ import annotations
 from dataclasses import dataclass, asdict
 from typing import Dict
 
+from reasoning.temperature_policy import default_policy
+
 
 @dataclass
 class EmotionState:
@@ -55,42 +57,19 @@ class EmotionEngine:
 
     def brain_temperatures(self) -> Dict[str, float]:
         """
-        Map chemicals to two temperatures:
+        Map chemicals to two temperatures via the shared TemperaturePolicy
+        (reasoning/temperature_policy.py), so these match what the brains
+        actually generate with:
 
         - ArchitectBrain:
-            * prefers high serotonin (stability)
-            * prefers low norepinephrine (low stress)
-            * slightly damped by very high dopamine (too chaotic)
+            * cooled by norepinephrine (focus)
+            * warmed a little by dopamine
 
         - OracleBrain:
-            * prefers high dopamine (exploration)
-            * can handle higher norepinephrine (urgency)
-            * boosted a bit by oxytocin (social / creative bonding)
+            * warmed by dopamine (exploration)
+            * calmed a bit by serotonin
         """
-        s = self._state
-
-        architect_temperature = (
-            0.2
-            + 0.3 * (1.0 - s.dopamine)
-            + 0.4 * s.serotonin
-            - 0.3 * s.norepinephrine
-        )
-
-        oracle_temperature = (
-            0.2
-            + 0.5 * s.dopamine
-            + 0.2 * s.norepinephrine
-            + 0.3 * s.oxytocin
-        )
-
-        # Clamp to [0, 1]
-        def clamp(x: float) -> float:
-            return max(0.0, min(1.0, x))
-
-        return {
-            "architect_temperature": clamp(architect_temperature),
-            "oracle_temperature": clamp(oracle_temperature),
-        }
+        return default_policy.temperatures(self.current_state())
 
 
 def main() -> None:
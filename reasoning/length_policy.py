@@ -0,0 +1,303 @@
+"""
+reasoning/length_policy.py
+
+Adaptive max_tokens for the brains, learned from past outputs.
+
+Architect and Oracle both used to ask for a fixed 256 tokens. Most
+answers are much shorter, and the ones that are not usually run on
+well past the useful part. AdaptiveMaxTokens keeps a rolling window of
+output lengths (in model tokens) per brain and sets each budget to
+
+    budget = clamp(quantile(lengths, q) × headroom, min_tokens, max_tokens)
+
+- Below `min_samples` observations the static max_tokens is used.
+- Outputs that ran into their budget are censored (the real length is
+  unknown), so they are recorded as budget × truncated_boost; a brain
+  that keeps hitting its budget gets more room back.
+- It can be primed from the Memory Spine (architect_output /
+  oracle_output events) so a fresh process starts with a learned budget.
+
+Savings are reported two ways:
+- report(): live counters since start (calls, budget reserved vs. the
+  static budget, tokens generated, how often the budget was hit)
+- replay_report(): counterfactual over the spine — how many decode
+  tokens the learned budget would have cut, and how many past answers
+  it would have truncated.
+
+    python3 -m reasoning.length_policy --spine memory/events.jsonl
+"""
+
+from __future__ import annotations
+
+import math
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, Iterable, List, Optional, Tuple
+
+from models.prompt_template import token_cache
+
+
+# Spine event type -> brain name.
+SPINE_EVENTS: Dict[str, str] = {
+    "architect_output": "architect",
+    "oracle_output": "oracle",
+}
+
+# Stop sequences shared by the brains' prompts: their own section headers.
+# Once the model starts writing these it is inventing the next turn, so
+# the output ends there instead of running on to the budget.
+DEFAULT_STOP: Tuple[str, ...] = ("\nTask:", "\nYou are the ")
+
+# Rough chars-per-token for when no tokenizer is available.
+_CHARS_PER_TOKEN = 4
+
+
+@dataclass
+class LengthPolicyConfig:
+    """
+    - quantile: length quantile the budget should cover
+    - headroom: multiplier on that quantile
+    - min_tokens / max_tokens: clamp range (max_tokens = the old static budget)
+    - min_samples: observations needed before adapting
+    - window: most recent outputs kept per brain
+    - truncated_boost: censored outputs count as budget × this
+    """
+
+    quantile: float = 0.95
+    headroom: float = 1.15
+    min_tokens: int = 32
+    max_tokens: int = 256
+    min_samples: int = 20
+    window: int = 500
+    truncated_boost: float = 1.5
+
+
+@dataclass
+class _BrainStats:
+    calls: int = 0
+    budget_tokens: int = 0
+    generated_tokens: int = 0
+    hit_budget: int = 0
+
+
+def _quantile(values: List[int], q: float) -> float:
+    """
+    Linear-interpolated quantile of an already sorted list.
+    """
+    if len(values) == 1:
+        return float(values[0])
+    pos = q * (len(values) - 1)
+    lo = math.floor(pos)
+    hi = min(lo + 1, len(values) - 1)
+    return values[lo] + (values[hi] - values[lo]) * (pos - lo)
+
+
+class AdaptiveMaxTokens:
+    """
+    Per-brain max_tokens learned from output lengths.
+
+    budget(brain)                          -> int
+    observe(brain, text=..., budget=...)   -> tokens counted
+    report() / replay_report(events)       -> savings
+    """
+
+    def __init__(
+        self,
+        config: Optional[LengthPolicyConfig] = None,
+        tokenizer: Any = None,
+    ) -> None:
+        if config is None:
+            config = LengthPolicyConfig()
+        self.config = config
+        self.tokenizer = tokenizer
+        self._lengths: Dict[str, Deque[int]] = {}
+        self._stats: Dict[str, _BrainStats] = {}
+
+    @classmethod
+    def from_spine(
+        cls,
+        spine,
+        tokenizer: Any = None,
+        config: Optional[LengthPolicyConfig] = None,
+    ) -> "AdaptiveMaxTokens":
+        """
+        Build a policy primed with the recent brain outputs in a MemorySpine.
+        """
+        policy = cls(config, tokenizer)
+        policy.prime(policy.spine_outputs(spine))
+        return policy
+
+    # --- tokens -------------------------------------------------------------
+
+    def count_tokens(self, text: str) -> int:
+        if not text:
+            return 0
+        if self.tokenizer is not None:
+            # Shared LRU: spine priming and replay see the same texts repeatedly.
+            return token_cache(self.tokenizer).count(text)
+        return math.ceil(len(text) / _CHARS_PER_TOKEN)
+
+    # --- learning -------------------------------------------------------------
+
+    def spine_outputs(self, spine) -> List[Tuple[str, str]]:
+        """
+        (brain, text) pairs from the last events of a MemorySpine.
+        """
+        # Each run writes ~3 events, so this covers `window` runs per brain.
+        events = spine.read_last(self.config.window * 3)
+        out = []
+        for evt in events:
+            brain = SPINE_EVENTS.get(evt.event_type)
+            text = evt.payload.get("text") if evt.payload else None
+            if brain is not None and isinstance(text, str):
+                out.append((brain, text))
+        return out
+
+    def prime(self, outputs: Iterable[Tuple[str, str]]) -> None:
+        """
+        Record past (brain, text) outputs without touching the live counters.
+        Spine outputs were produced under the static budget.
+        """
+        for brain, text in outputs:
+            tokens = self.count_tokens(text)
+            self._record(brain, tokens, self.config.max_tokens)
+
+    def _record(self, brain: str, tokens: int, budget: int) -> None:
+        lengths = self._lengths.get(brain)
+        if lengths is None:
+            lengths = self._lengths[brain] = deque(maxlen=self.config.window)
+        if tokens >= budget:
+            tokens = int(budget * self.config.truncated_boost)
+        lengths.append(tokens)
+
+    def observe(
+        self,
+        brain: str,
+        text: Optional[str] = None,
+        tokens: Optional[int] = None,
+        budget: Optional[int] = None,
+    ) -> int:
+        """
+        Record one output. Pass `tokens` if known, else `text` is counted.
+        `budget` is the max_tokens the call actually ran with.
+        Returns the token count used.
+        """
+        if tokens is None:
+            tokens = self.count_tokens(text or "")
+        if budget is None:
+            budget = self.config.max_tokens
+
+        self._record(brain, tokens, budget)
+
+        stats = self._stats.setdefault(brain, _BrainStats())
+        stats.calls += 1
+        stats.budget_tokens += budget
+        stats.generated_tokens += tokens
+        if tokens >= budget:
+            stats.hit_budget += 1
+        return tokens
+
+    def budget(self, brain: str, default: Optional[int] = None) -> int:
+        """
+        max_tokens to use for the next `brain` call.
+        """
+        cfg = self.config
+        ceiling = cfg.max_tokens if default is None else default
+        lengths = self._lengths.get(brain)
+        if not lengths or len(lengths) < cfg.min_samples:
+            return ceiling
+
+        q = _quantile(sorted(lengths), cfg.quantile)
+        return max(cfg.min_tokens, min(ceiling, int(math.ceil(q * cfg.headroom))))
+
+    # --- reporting -------------------------------------------------------------
+
+    def report(self) -> Dict[str, Dict[str, float]]:
+        """
+        Live counters per brain since this policy was created.
+
+        - budget_saved: Σ (static max_tokens − budget used), i.e. decode
+          room no longer reserved
+        - generated: tokens actually produced
+        - hit_budget: calls that ran into their budget (possible truncation)
+        """
+        static = self.config.max_tokens
+        out: Dict[str, Dict[str, float]] = {}
+        for brain, stats in self._stats.items():
+            out[brain] = {
+                "calls": stats.calls,
+                "current_budget": self.budget(brain),
+                "mean_budget": stats.budget_tokens / stats.calls if stats.calls else 0.0,
+                "budget_saved": stats.calls * static - stats.budget_tokens,
+                "generated": stats.generated_tokens,
+                "hit_budget": stats.hit_budget,
+            }
+        return out
+
+    def replay_report(self, outputs: Iterable[Tuple[str, str]]) -> Dict[str, Dict[str, float]]:
+        """
+        Counterfactual over past (brain, text) outputs: tokens that would
+        not have been decoded under the current budgets, and how many
+        answers would have been cut.
+        """
+        static = self.config.max_tokens
+        out: Dict[str, Dict[str, float]] = {}
+        for brain, text in outputs:
+            row = out.setdefault(brain, {
+                "outputs": 0,
+                "budget": self.budget(brain),
+                "decoded": 0,
+                "decoded_adaptive": 0,
+                "tokens_saved": 0,
+                "truncated": 0,
+            })
+            tokens = min(static, self.count_tokens(text))
+            kept = min(tokens, int(row["budget"]))
+            row["outputs"] += 1
+            row["decoded"] += tokens
+            row["decoded_adaptive"] += kept
+            row["tokens_saved"] += tokens - kept
+            if tokens > kept:
+                row["truncated"] += 1
+        return out
+
+
+def main() -> None:
+    import argparse
+
+    from memory.spine import MemorySpine
+
+    parser = argparse.ArgumentParser(description="Adaptive max_tokens report from the Memory Spine")
+    parser.add_argument("--spine", type=str, default=None, help="events.jsonl (default: memory/events.jsonl)")
+    parser.add_argument("--tokenizer", type=str, default=None, help="HF tokenizer name/path for exact counts")
+    parser.add_argument("--quantile", type=float, default=LengthPolicyConfig.quantile)
+    parser.add_argument("--max-tokens", type=int, default=LengthPolicyConfig.max_tokens)
+    args = parser.parse_args()
+
+    tokenizer = None
+    if args.tokenizer:
+        from transformers import AutoTokenizer
+
+        tokenizer = AutoTokenizer.from_pretrained(args.tokenizer)
+
+    config = LengthPolicyConfig(quantile=args.quantile, max_tokens=args.max_tokens)
+    spine = MemorySpine(args.spine)
+    policy = AdaptiveMaxTokens(config, tokenizer)
+    outputs = policy.spine_outputs(spine)
+    policy.prime(outputs)
+
+    report = policy.replay_report(outputs)
+    if not report:
+        print("No architect/oracle outputs in the spine.")
+        return
+    for brain, row in sorted(report.items()):
+        decoded = row["decoded"] or 1
+        print(
+            f"{brain:<10} outputs={row['outputs']:<6} budget={row['budget']:<4} "
+            f"tokens_saved={row['tokens_saved']} ({row['tokens_saved'] / decoded:.1%}) "
+            f"truncated={row['truncated']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
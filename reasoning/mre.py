@@ -1,13 +1,52 @@
 # reasoning/mre.py
 # C.3 — Markovian Reasoning Engine (Soft Mode)
-# v1 — lightweight carry-over summaries for long reasoning runs
+# v2 — bounded ring buffer of carry-over summaries, token-budgeted context
+#
+# v1 kept only the last summary, cut at 200 characters. v2 keeps the last
+# `capacity` summaries in a ring buffer, each with its token count cached
+# at insert time (counted with the model tokenizer when one is given,
+# through the shared models.prompt_template.token_cache LRU), and
+# packs the most useful ones into a fixed token budget for the brains'
+# `context=` argument. State can be saved to a small JSON file so a
+# restart picks up where it left off without replaying the spine.
 
 from __future__ import annotations
-from dataclasses import dataclass, field
-from typing import List, Dict, Any
+from collections import deque
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional, Tuple
 import json
+import math
+import os
 import time
 
+from models.prompt_template import token_cache
+
+
+# Default location used by core/runner.C3Core.
+DEFAULT_STATE_PATH = Path(__file__).with_name("mre_state.json")
+
+# Rough chars-per-token for when no tokenizer is available.
+_CHARS_PER_TOKEN = 4
+
+
+@dataclass
+class MREConfig:
+    """
+    capacity:           summaries kept in the ring buffer (oldest drop off)
+    summary_max_tokens: each summary is cut to this many tokens
+    context_budget:     default token budget for build_context()
+    half_life:          recency half-life in steps for usefulness scoring
+    separator:          joins packed summaries (its tokens count too)
+    state_path:         if set, state is loaded from / saved to this file
+    """
+    capacity: int = 32
+    summary_max_tokens: int = 64
+    context_budget: int = 256
+    half_life: float = 8.0
+    separator: str = "\n"
+    state_path: Optional[str] = None
+
 
 @dataclass
 class MREState:
@@ -20,30 +59,102 @@ class MREState:
     timestamp: float = field(default_factory=time.time)
 
 
+@dataclass
+class SummaryEntry:
+    """
+    One carry-over summary in the ring buffer.
+    `tokens` is counted once when the entry is created.
+    """
+    step_id: int
+    text: str
+    tokens: int
+    importance: float = 1.0
+    timestamp: float = field(default_factory=time.time)
+
+
+def _tokenizer_id(tokenizer: Any) -> Optional[str]:
+    if tokenizer is None:
+        return None
+    return getattr(tokenizer, "name_or_path", None) or type(tokenizer).__name__
+
+
 class MarkovianReasoningEngine:
     """
     Soft MRE:
     - No forced linear chain for all turns.
     - Runs ONLY when Reconciler explicitly requests it.
     - Stores 1–3 sentence summaries => ultra-small footprint.
+    - Keeps the last `capacity` of them and packs the most useful into a
+      token budget with build_context().
     """
 
-    def __init__(self):
+    def __init__(self, config: Optional[MREConfig] = None, tokenizer: Any = None):
+        if config is None:
+            config = MREConfig()
+        self.config = config
+        self.tokenizer = tokenizer
         self.state = MREState()
+        self.entries: Deque[SummaryEntry] = deque(maxlen=config.capacity)
+        self._separator_tokens = self.count_tokens(config.separator)
+
+        if config.state_path is not None and Path(config.state_path).exists():
+            self.load(config.state_path)
+
+    # --- tokens -------------------------------------------------------------
 
-    def update_summary(self, text: str) -> MREState:
+    def count_tokens(self, text: str) -> int:
+        """
+        Token count with the model tokenizer, or a chars/4 estimate.
+        """
+        if not text:
+            return 0
+        if self.tokenizer is not None:
+            return token_cache(self.tokenizer).count(text)
+        return math.ceil(len(text) / _CHARS_PER_TOKEN)
+
+    def _truncate(self, text: str, max_tokens: int) -> Tuple[str, int]:
+        """
+        Cut `text` to at most `max_tokens` tokens -> (text, tokens).
+        """
+        if self.tokenizer is not None:
+            ids = token_cache(self.tokenizer).encode(text)
+            if len(ids) <= max_tokens:
+                return text, len(ids)
+            keep = max(0, max_tokens - self.count_tokens("..."))
+            cut = self.tokenizer.decode(list(ids[:keep]), skip_special_tokens=True).rstrip() + "..."
+            return cut, self.count_tokens(cut)
+
+        if len(text) <= max_tokens * _CHARS_PER_TOKEN:
+            return text, self.count_tokens(text)
+        cut = text[: max_tokens * _CHARS_PER_TOKEN - 3].rstrip() + "..."
+        return cut, self.count_tokens(cut)
+
+    # --- updates --------------------------------------------------------------
+
+    def update_summary(self, text: str, importance: float = 1.0) -> MREState:
         """
         Create a new short distilled summary of the last reasoning step.
+
+        importance: caller's weight for this summary (e.g. the Architect's
+        confidence); higher = more likely to be packed into context.
         """
         self.state.step_id += 1
         self.state.timestamp = time.time()
 
-        # Extremely small compressor — keeps only the core intent.
-        distilled = text.strip()
-        if len(distilled) > 200:
-            distilled = distilled[:200] + "..."
+        # Small compressor — keeps only the head of the text, by tokens.
+        distilled, tokens = self._truncate(text.strip(), self.config.summary_max_tokens)
 
         self.state.summary = distilled
+        self.entries.append(SummaryEntry(
+            step_id=self.state.step_id,
+            text=distilled,
+            tokens=tokens,
+            importance=float(importance),
+            timestamp=self.state.timestamp,
+        ))
+
+        if self.config.state_path is not None:
+            self.save(self.config.state_path)
         return self.state
 
     def get_summary(self) -> str:
@@ -52,6 +163,78 @@ class MarkovianReasoningEngine:
         """
         return self.state.summary
 
+    # --- context packing ------------------------------------------------------
+
+    def _usefulness(self, entry: SummaryEntry) -> float:
+        age = self.state.step_id - entry.step_id
+        return entry.importance * 0.5 ** (age / self.config.half_life)
+
+    def select_context(self, budget: Optional[int] = None) -> List[SummaryEntry]:
+        """
+        Greedy pack: most useful summaries first, skipping any that do not
+        fit the remaining budget. Returned in chronological order.
+        """
+        if budget is None:
+            budget = self.config.context_budget
+
+        chosen: List[SummaryEntry] = []
+        used = 0
+        for entry in sorted(self.entries, key=self._usefulness, reverse=True):
+            cost = entry.tokens + (self._separator_tokens if chosen else 0)
+            if used + cost > budget:
+                continue
+            chosen.append(entry)
+            used += cost
+
+        chosen.sort(key=lambda e: e.step_id)
+        return chosen
+
+    def build_context(self, budget: Optional[int] = None) -> Optional[str]:
+        """
+        Text for the brains' `context=` argument, at most `budget` tokens
+        (per the cached counts). None if there is nothing to carry over.
+        """
+        chosen = self.select_context(budget)
+        if not chosen:
+            return None
+        return self.config.separator.join(e.text for e in chosen)
+
+    # --- persistence ----------------------------------------------------------
+
+    def save(self, path: Optional[str] = None) -> None:
+        """
+        Write state + ring buffer as JSON (atomic tmp + rename).
+        """
+        target = Path(path or self.config.state_path or DEFAULT_STATE_PATH)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        data = {
+            "tokenizer": _tokenizer_id(self.tokenizer),
+            "state": asdict(self.state),
+            "entries": [asdict(e) for e in self.entries],
+        }
+        tmp = target.with_name(target.name + ".tmp")
+        with tmp.open("w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp, target)
+
+    def load(self, path: Optional[str] = None) -> None:
+        """
+        Restore from save(). Cached token counts are reused only if they
+        were counted with the same tokenizer; otherwise they are recounted.
+        """
+        source = Path(path or self.config.state_path or DEFAULT_STATE_PATH)
+        data = json.loads(source.read_text(encoding="utf-8"))
+
+        self.state = MREState(**data.get("state", {}))
+        same_tokenizer = data.get("tokenizer") == _tokenizer_id(self.tokenizer)
+
+        self.entries.clear()
+        for raw in data.get("entries", []):
+            entry = SummaryEntry(**raw)
+            if not same_tokenizer:
+                entry.tokens = self.count_tokens(entry.text)
+            self.entries.append(entry)
+
     def export_state(self) -> Dict[str, Any]:
         """
         JSON-ready state for debugging, logging, or Narrative Engine.
@@ -60,6 +243,8 @@ class MarkovianReasoningEngine:
             "step_id": self.state.step_id,
             "summary": self.state.summary,
             "timestamp": self.state.timestamp,
+            "buffered": len(self.entries),
+            "buffered_tokens": sum(e.tokens for e in self.entries),
         }
 
 
@@ -13,14 +13,36 @@ can nudge the creativity level via temperature.
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Dict, Optional, Tuple
+from typing import Callable, Dict, Optional, Tuple, Union
 
 from models.local_text_model import LocalTextModel, LocalTextModelConfig
+from models.prompt_template import PromptIds, PromptTemplate, Slot
+from reasoning.length_policy import DEFAULT_STOP, AdaptiveMaxTokens
+from reasoning.temperature_policy import TemperaturePolicy, default_policy
 
 
 EmotionState = Dict[str, float]
 
 
+# Static header / instructions are tokenized once; only the task and
+# context slots are tokenized per call (see models/prompt_template.py).
+ORACLE_TEMPLATE = PromptTemplate([
+    (
+        "You are the ORACLE brain of C.3.\n"
+        "Your job is to be imaginative, lateral, and creative, while still being useful.\n"
+        "Offer alternative angles, surprising ideas, and new ways to see the problem.\n\n"
+    ),
+    Slot("task", "Task: ", "\n"),
+    Slot("context", "Context:\n", "\n\n", optional=True),
+    (
+        "Please answer with:\n"
+        "1. A surprising or creative reframe of the goal.\n"
+        "2. Several unconventional ideas or options (bullet points).\n"
+        "3. One bold suggestion and why it might work.\n"
+    ),
+])
+
+
 @dataclass
 class OracleConfig:
     """
@@ -28,11 +50,19 @@ class OracleConfig:
 
     You can tweak:
       - base_temperature: default "creative" temp
-      - max_tokens: how long Oracle answers can be
+      - max_tokens: how long Oracle answers can be (upper bound when
+        an adaptive length policy is attached)
+      - stop: strings that end the answer early (the model starting a
+        new prompt section means the answer is done)
+      - draft_model / num_draft_tokens: small model (same tokenizer) for
+        speculative decoding; None = the model backend's default
     """
 
     base_temperature: float = 0.8
     max_tokens: int = 256
+    stop: Tuple[str, ...] = DEFAULT_STOP
+    draft_model: Optional[str] = None
+    num_draft_tokens: int = 5
 
 
 class OracleBrain:
@@ -50,10 +80,14 @@ class OracleBrain:
         self,
         config: Optional[OracleConfig] = None,
         model: Optional[LocalTextModel] = None,
+        policy: Optional[TemperaturePolicy] = None,
+        length_policy: Optional[AdaptiveMaxTokens] = None,
     ) -> None:
         if config is None:
             config = OracleConfig()
         self.config = config
+        self.policy = policy or default_policy
+        self.length_policy = length_policy
 
         # Shared model backend (TinyLlama or whatever C3_LOCAL_MODEL points to)
         self.model = model or LocalTextModel(LocalTextModelConfig())
@@ -64,55 +98,44 @@ class OracleBrain:
         """
         Map emotion signals to a creative temperature.
 
-        Simple heuristic:
+        Delegates to the shared TemperaturePolicy (reasoning/temperature_policy.py)
+        so the temperature we generate with is the one reconcile logs:
           - start from base_temperature
           - dopamine raises temp (more wild / explore)
           - serotonin slightly stabilizes (less chaos)
         """
+        return self.policy.temperature(
+            "oracle", emotions, base=self.config.base_temperature
+        )
 
-        t = self.config.base_temperature
-
-        if not emotions:
-            return max(0.1, min(1.2, t))
-
-        dopamine = float(emotions.get("dopamine", 0.6))      # 0..1
-        serotonin = float(emotions.get("serotonin", 0.5))    # 0..1
-
-        d_centered = dopamine - 0.5
-        s_centered = serotonin - 0.5
-
-        # Dopamine: lean into novelty
-        t += 0.25 * d_centered
-        # Serotonin: calm things down
-        t -= 0.15 * s_centered
+    def _max_tokens(self) -> int:
+        """
+        Learned budget when a length policy is attached, else config.max_tokens.
+        """
+        if self.length_policy is None:
+            return self.config.max_tokens
+        return self.length_policy.budget("oracle", default=self.config.max_tokens)
 
-        return max(0.1, min(1.2, t))
+    def _observe(self, text: str, max_tokens: int, tokens: Optional[int] = None) -> None:
+        if self.length_policy is not None:
+            self.length_policy.observe("oracle", text=text, tokens=tokens, budget=max_tokens)
 
     def _build_prompt(self, task: str, context: Optional[str]) -> str:
         """
         Build a creative prompt for the Oracle model.
         """
+        return ORACLE_TEMPLATE.render_text(task=task, context=context)
 
-        base = (
-            "You are the ORACLE brain of C.3.\n"
-            "Your job is to be imaginative, lateral, and creative, while still being useful.\n"
-            "Offer alternative angles, surprising ideas, and new ways to see the problem.\n\n"
-        )
-
-        task_line = f"Task: {task}\n"
-        if context:
-            ctx = f"Context:\n{context}\n\n"
-        else:
-            ctx = ""
-
-        instructions = (
-            "Please answer with:\n"
-            "1. A surprising or creative reframe of the goal.\n"
-            "2. Several unconventional ideas or options (bullet points).\n"
-            "3. One bold suggestion and why it might work.\n"
-        )
-
-        return base + task_line + ctx + instructions
+    def _prompt(self, task: str, context: Optional[str]) -> Union[str, PromptIds]:
+        """
+        The prompt as token ids when the model exposes its tokenizer
+        (static parts are not re-tokenized, and the model can reuse the
+        header's KV cache), else as text.
+        """
+        tokenizer = getattr(self.model, "tokenizer", None)
+        if tokenizer is None:
+            return self._build_prompt(task, context)
+        return ORACLE_TEMPLATE.render(tokenizer, task=task, context=context)
 
     # --- public API -------------------------------------------------------
 
@@ -121,6 +144,7 @@ class OracleBrain:
         task: str,
         context: Optional[str] = None,
         emotions: Optional[EmotionState] = None,
+        should_stop: Optional[Callable[[], bool]] = None,
     ) -> Tuple[str, float]:
         """
         Main call used by the core:
@@ -130,16 +154,25 @@ class OracleBrain:
         Returns:
           - text: model's creative output
           - used_temp: the final temperature we used (for logging)
+
+        `should_stop` is forwarded to the model and checked every decode
+        step (used by the idle scheduler to yield to user tasks).
         """
 
         temp = self._compute_temperature(emotions)
-        prompt = self._build_prompt(task, context)
+        prompt = self._prompt(task, context)
+        max_tokens = self._max_tokens()
 
         text = self.model.generate(
             prompt=prompt,
             temperature=temp,
-            max_tokens=self.config.max_tokens,
+            max_tokens=max_tokens,
+            should_stop=should_stop,
+            stop=self.config.stop,
+            draft_model=self.config.draft_model,
+            num_draft_tokens=self.config.num_draft_tokens,
         )
+        self._observe(text, max_tokens)
 
         return text, temp
 
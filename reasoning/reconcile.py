@@ -33,6 +33,8 @@ from __future__ import annotations
 from dataclasses import dataclass
 from typing import Dict, Optional, Any
 
+from reasoning.temperature_policy import default_policy
+
 
 @dataclass
 class ReconcileResult:
@@ -60,33 +62,18 @@ def _modulate_temperatures(emotions: Dict[str, float]) -> Dict[str, float]:
     """
     Emotion → Temperature Model
 
-    - dopamine       → increases Oracle temp (creativity)
-    - norepinephrine → increases Architect temp (focus/sharpness)
-    - serotonin      → stabilizer (reduces extremes)
-    - oxytocin       → collaboration modifier (slight blend)
+    Uses the shared TemperaturePolicy (reasoning/temperature_policy.py),
+    the same one ArchitectBrain / OracleBrain generate with:
+
+    - dopamine       → raises both temps (Oracle more)
+    - norepinephrine → lowers Architect temp (focus)
+    - serotonin      → calms Oracle temp (stabilizer)
 
     Outputs:
       architect_temperature: float
       oracle_temperature: float
     """
-
-    dopamine = emotions.get("dopamine", 0.5)
-    norepi = emotions.get("norepinephrine", 0.5)
-    serotonin = emotions.get("serotonin", 0.5)
-    oxytocin = emotions.get("oxytocin", 0.5)
-
-    # Base temps
-    oracle_temp = 0.4 + (dopamine * 0.4) + (oxytocin * 0.1)
-    arch_temp = 0.4 + (norepi * 0.4) - (serotonin * 0.1)
-
-    # Clamp to a safe range
-    oracle_temp = max(0.1, min(1.2, oracle_temp))
-    arch_temp = max(0.1, min(1.2, arch_temp))
-
-    return {
-        "architect_temperature": arch_temp,
-        "oracle_temperature": oracle_temp,
-    }
+    return default_policy.temperatures(emotions)
 
 
 def reconcile(
@@ -0,0 +1,170 @@
+"""
+reasoning/reconcile_batch.py
+
+Vectorized (NumPy) reconcile over many (confidence, emotions) rows.
+
+reasoning.reconcile.reconcile() decides one Architect-vs-Oracle choice
+at a time and returns a ReconcileResult dataclass. Meta-C3 sweeps and
+replay analysis need millions of decisions, so this module evaluates
+the same scoring and _modulate_temperatures() rules over whole arrays
+and returns one NumPy structured array instead of per-row objects.
+
+    out = reconcile_batch(confidence, emotions_matrix)
+    out["choice"]                  # int8, index into CHOICE_NAMES
+    out["architect_score"], out["oracle_score"]
+    out["architect_temperature"], out["oracle_temperature"]
+
+emotions_matrix columns follow EMOTION_KEYS:
+    dopamine, serotonin, norepinephrine, oxytocin
+
+The arithmetic keeps the scalar operation order in float64, so results
+agree exactly with reconcile() (see check_against_scalar()).
+
+    python3 -m reasoning.reconcile_batch --n 1000000
+"""
+
+from __future__ import annotations
+
+from typing import Optional, Tuple, Union
+
+import numpy as np
+
+from reasoning.reconcile import _default_emotions, _modulate_temperatures, reconcile
+from reasoning.temperature_policy import default_policy
+
+
+EMOTION_KEYS: Tuple[str, ...] = ("dopamine", "serotonin", "norepinephrine", "oxytocin")
+CHOICE_NAMES: Tuple[str, ...] = ("architect", "oracle")
+CHOICE_ARCHITECT, CHOICE_ORACLE = 0, 1
+
+RECONCILE_DTYPE = np.dtype([
+    ("choice", np.int8),
+    ("architect_score", np.float64),
+    ("oracle_score", np.float64),
+    ("architect_temperature", np.float64),
+    ("oracle_temperature", np.float64),
+])
+
+
+def default_emotions_matrix(n: int) -> np.ndarray:
+    base = _default_emotions()
+    return np.tile(np.array([base[k] for k in EMOTION_KEYS], dtype=np.float64), (n, 1))
+
+
+def modulate_temperatures_batch(emotions: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Vectorized _modulate_temperatures(): (N, 4) -> (architect, oracle),
+    each (N,). Both go through the shared TemperaturePolicy.
+    """
+    return default_policy.temperatures_batch(emotions)
+
+
+def reconcile_batch(
+    confidence: Union[float, np.ndarray],
+    emotions_matrix: Optional[np.ndarray] = None,
+    temperatures: bool = True,
+) -> np.ndarray:
+    """
+    Decide Architect vs Oracle for every row.
+
+    confidence:      scalar or (N,)
+    emotions_matrix: (N, 4) in EMOTION_KEYS order; None = neutral
+                     baseline (then N comes from `confidence`)
+
+    Returns a structured array of RECONCILE_DTYPE with shape (N,).
+    temperatures=False skips the temperature columns (left as NaN) for
+    callers that only need the choice / scores.
+    """
+    conf = np.asarray(confidence, dtype=np.float64)
+
+    if emotions_matrix is None:
+        n = 1 if conf.ndim == 0 else conf.shape[0]
+        emotions = default_emotions_matrix(n)
+    else:
+        emotions = np.asarray(emotions_matrix, dtype=np.float64)
+        if emotions.ndim != 2 or emotions.shape[1] != len(EMOTION_KEYS):
+            raise ValueError(
+                f"emotions_matrix must have shape (N, {len(EMOTION_KEYS)}), got {emotions.shape}"
+            )
+        n = emotions.shape[0]
+
+    conf = np.broadcast_to(conf, (n,))
+
+    dopamine = emotions[:, 0]
+    norepi = emotions[:, 2]
+
+    out = np.empty(n, dtype=RECONCILE_DTYPE)
+    out["oracle_score"] = dopamine * 0.7 + (1.0 - conf) * 0.3
+    out["architect_score"] = norepi * 0.7 + conf * 0.3
+    out["choice"] = np.where(
+        out["oracle_score"] > out["architect_score"], CHOICE_ORACLE, CHOICE_ARCHITECT
+    )
+    if temperatures:
+        out["architect_temperature"], out["oracle_temperature"] = modulate_temperatures_batch(emotions)
+    else:
+        out["architect_temperature"] = np.nan
+        out["oracle_temperature"] = np.nan
+    return out
+
+
+def random_inputs(n: int, seed: int = 0) -> Tuple[np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    confidence = rng.uniform(0.0, 1.0, size=n)
+    emotions = rng.uniform(0.0, 1.0, size=(n, len(EMOTION_KEYS)))
+    # Exact ties between the two scores exercise the ">" tie rule.
+    ties = rng.random(n) < 0.05
+    emotions[ties] = 0.5
+    confidence[ties] = 0.5
+    return confidence, emotions
+
+
+def check_against_scalar(n: int = 10_000, seed: int = 0) -> int:
+    """
+    Run `n` random rows through reconcile() and reconcile_batch().
+    Returns the number of rows that differ (0 means exact agreement).
+    """
+    confidence, emotions = random_inputs(n, seed)
+    batch = reconcile_batch(confidence, emotions)
+
+    mismatches = 0
+    for i in range(n):
+        emo = dict(zip(EMOTION_KEYS, emotions[i].tolist()))
+        ref = reconcile(float(confidence[i]), emotions=emo)
+        temps = _modulate_temperatures(emo)
+        row = batch[i]
+        if (
+            CHOICE_NAMES[int(row["choice"])] != ref.choice
+            or float(row["architect_temperature"]) != temps["architect_temperature"]
+            or float(row["oracle_temperature"]) != temps["oracle_temperature"]
+        ):
+            mismatches += 1
+    return mismatches
+
+
+def main() -> None:
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Batched reconcile check + throughput")
+    parser.add_argument("--n", type=int, default=1_000_000, help="Rows for the throughput run")
+    parser.add_argument("--check", type=int, default=10_000, help="Rows for the scalar equivalence check")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    bad = check_against_scalar(args.check, args.seed)
+    print(f"Scalar equivalence: {args.check - bad}/{args.check} rows identical")
+
+    confidence, emotions = random_inputs(args.n, args.seed + 1)
+    start = time.perf_counter()
+    out = reconcile_batch(confidence, emotions)
+    elapsed = time.perf_counter() - start
+    oracle_share = float((out["choice"] == CHOICE_ORACLE).mean())
+    print(f"Batch reconcile: {args.n} rows in {elapsed:.3f}s ({args.n / elapsed:,.0f} rows/s)")
+    print(f"Oracle chosen in {oracle_share:.1%} of rows")
+
+    if bad:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+"""
+reasoning/temperature_policy.py
+
+One emotion → temperature policy for every brain.
+
+Before this module, four places mapped chemicals to temperatures, each
+with its own coefficients:
+  - ArchitectBrain._compute_temperature
+  - OracleBrain._compute_temperature
+  - reconcile._modulate_temperatures
+  - EmotionEngine.brain_temperatures
+so the temperature logged in `final_choice` was not the one the brains
+actually generated with.
+
+TemperaturePolicy is now the single source. All four call into it.
+It compiles its coefficient table once into flat tuples, and it can
+evaluate one emotion dict or a whole (N, 4) matrix.
+
+Rule per brain (linear, centred, clamped):
+
+    t = base + Σ weight_k × (chemical_k − center)
+    t = clamp(t, lo, hi)
+
+Missing chemicals fall back to the rule's `defaults` (else 0.5).
+With no emotions at all, t = clamp(base).
+
+The default coefficients are the ones the brains were already using
+for generation, so generation behaviour is unchanged.
+
+Benchmark (old per-call paths vs. the compiled policy):
+
+    python3 -m reasoning.temperature_policy --n 200000
+"""
+
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Mapping, Optional, Tuple
+
+
+EmotionState = Mapping[str, float]
+
+EMOTION_KEYS: Tuple[str, ...] = ("dopamine", "serotonin", "norepinephrine", "oxytocin")
+BRAINS: Tuple[str, ...] = ("architect", "oracle")
+
+
+@dataclass(frozen=True)
+class BrainTemperatureRule:
+    """
+    Coefficients for one brain.
+
+    - base: temperature at neutral emotions (brains may override per call)
+    - weights: chemical -> slope, applied to (value - center)
+    - center: neutral chemical level
+    - lo / hi: clamp range
+    - defaults: value to assume when a chemical is missing
+    """
+
+    base: float
+    weights: Dict[str, float]
+    lo: float = 0.1
+    hi: float = 1.0
+    center: float = 0.5
+    defaults: Dict[str, float] = field(default_factory=dict)
+
+
+DEFAULT_RULES: Dict[str, BrainTemperatureRule] = {
+    # Cool, structured: dopamine warms a little, norepinephrine focuses.
+    "architect": BrainTemperatureRule(
+        base=0.4,
+        weights={"dopamine": 0.2, "norepinephrine": -0.2},
+        lo=0.1,
+        hi=1.0,
+    ),
+    # Hot, creative: dopamine warms, serotonin calms.
+    "oracle": BrainTemperatureRule(
+        base=0.8,
+        weights={"dopamine": 0.25, "serotonin": -0.15},
+        lo=0.1,
+        hi=1.2,
+        defaults={"dopamine": 0.6},
+    ),
+}
+
+
+class TemperaturePolicy:
+    """
+    Compiled emotion → temperature policy.
+
+    temperature(brain, emotions, base=None) -> float
+    temperatures(emotions)                  -> {"architect_temperature", "oracle_temperature"}
+    temperatures_batch(emotions (N, 4))     -> (architect (N,), oracle (N,))
+    """
+
+    def __init__(self, rules: Optional[Dict[str, BrainTemperatureRule]] = None) -> None:
+        if rules is None:
+            rules = DEFAULT_RULES
+        self.rules = dict(rules)
+
+        # brain -> (base, offset, ((key, weight, default), ...), lo, hi)
+        # offset folds the centring in, so evaluation is base + offset + Σ w·x.
+        self._compiled: Dict[str, Tuple[float, float, Tuple[Tuple[str, float, float], ...], float, float]] = {}
+        for brain, rule in self.rules.items():
+            terms = tuple(
+                (key, float(w), float(rule.defaults.get(key, rule.center)))
+                for key, w in rule.weights.items()
+            )
+            offset = -sum(w * rule.center for _, w, _ in terms)
+            self._compiled[brain] = (float(rule.base), offset, terms, float(rule.lo), float(rule.hi))
+
+    @classmethod
+    def from_file(cls, path: str) -> "TemperaturePolicy":
+        """
+        Load coefficients from JSON shaped like
+        {"architect": {"base": 0.4, "weights": {...}, "lo": 0.1, "hi": 1.0}, ...}.
+        """
+        data = json.loads(Path(path).read_text(encoding="utf-8"))
+        return cls({brain: BrainTemperatureRule(**rule) for brain, rule in data.items()})
+
+    # --- scalar -----------------------------------------------------------
+
+    def temperature(
+        self,
+        brain: str,
+        emotions: Optional[EmotionState] = None,
+        base: Optional[float] = None,
+    ) -> float:
+        rule_base, offset, terms, lo, hi = self._compiled[brain]
+        t = rule_base if base is None else float(base)
+        if not emotions:
+            return max(lo, min(hi, t))
+
+        t += offset
+        for key, weight, default in terms:
+            t += weight * float(emotions.get(key, default))
+        return max(lo, min(hi, t))
+
+    def temperatures(self, emotions: Optional[EmotionState] = None) -> Dict[str, float]:
+        temperature = self.temperature
+        return {
+            "architect_temperature": temperature("architect", emotions),
+            "oracle_temperature": temperature("oracle", emotions),
+        }
+
+    # --- batched ----------------------------------------------------------
+
+    def temperature_batch(self, brain: str, emotions, base: Optional[float] = None):
+        """
+        Same rule over an (N, 4) matrix in EMOTION_KEYS order -> (N,).
+        Arithmetic order matches temperature(), so results are identical.
+        """
+        import numpy as np
+
+        rule_base, offset, terms, lo, hi = self._compiled[brain]
+        emotions = np.asarray(emotions, dtype=np.float64)
+        t = np.full(emotions.shape[0], rule_base if base is None else float(base))
+        t += offset
+        for key, weight, _ in terms:
+            t += weight * emotions[:, EMOTION_KEYS.index(key)]
+        return np.maximum(lo, np.minimum(hi, t))
+
+    def temperatures_batch(self, emotions):
+        """
+        (N, 4) -> (architect_temperatures, oracle_temperatures).
+        """
+        return (
+            self.temperature_batch("architect", emotions),
+            self.temperature_batch("oracle", emotions),
+        )
+
+
+default_policy = TemperaturePolicy()
+
+
+# --- benchmark --------------------------------------------------------------
+
+def _old_architect(emotions: Dict[str, float], base: float = 0.4) -> float:
+    t = base
+    dopamine = float(emotions.get("dopamine", 0.5))
+    norepi = float(emotions.get("norepinephrine", 0.5))
+    t += 0.2 * (dopamine - 0.5)
+    t -= 0.2 * (norepi - 0.5)
+    return max(0.1, min(1.0, t))
+
+
+def _old_oracle(emotions: Dict[str, float], base: float = 0.8) -> float:
+    t = base
+    dopamine = float(emotions.get("dopamine", 0.6))
+    serotonin = float(emotions.get("serotonin", 0.5))
+    t += 0.25 * (dopamine - 0.5)
+    t -= 0.15 * (serotonin - 0.5)
+    return max(0.1, min(1.2, t))
+
+
+def _old_modulate(emotions: Dict[str, float]) -> Dict[str, float]:
+    dopamine = emotions.get("dopamine", 0.5)
+    norepi = emotions.get("norepinephrine", 0.5)
+    serotonin = emotions.get("serotonin", 0.5)
+    oxytocin = emotions.get("oxytocin", 0.5)
+    oracle_temp = max(0.1, min(1.2, 0.4 + (dopamine * 0.4) + (oxytocin * 0.1)))
+    arch_temp = max(0.1, min(1.2, 0.4 + (norepi * 0.4) - (serotonin * 0.1)))
+    return {"architect_temperature": arch_temp, "oracle_temperature": oracle_temp}
+
+
+def main() -> None:
+    import argparse
+    import random
+    import time
+
+    parser = argparse.ArgumentParser(description="Temperature policy per-call benchmark")
+    parser.add_argument("--n", type=int, default=200_000, help="Calls per variant")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    states = [{k: rng.random() for k in EMOTION_KEYS} for _ in range(1000)]
+    calls = [states[i % len(states)] for i in range(args.n)]
+
+    def bench(label: str, fn) -> float:
+        start = time.perf_counter()
+        for e in calls:
+            fn(e)
+        per_call = (time.perf_counter() - start) / args.n * 1e9
+        print(f"{label:<48} {per_call:>8.0f} ns/call")
+        return per_call
+
+    print("Old path (separate formulas, one run per place):")
+    old = bench("  architect + oracle + reconcile temps", lambda e: (_old_architect(e), _old_oracle(e), _old_modulate(e)))
+    print("New path (one policy, evaluated once per decision):")
+    new = bench("  policy.temperatures()", default_policy.temperatures)
+    print(f"Speedup per decision: {old / new:.2f}x")
+
+    try:
+        import numpy as np
+    except ImportError:
+        return
+    matrix = np.array([[e[k] for k in EMOTION_KEYS] for e in calls])
+    start = time.perf_counter()
+    default_policy.temperatures_batch(matrix)
+    per_row = (time.perf_counter() - start) / args.n * 1e9
+    print(f"{'  policy.temperatures_batch() (N rows)':<48} {per_row:>8.1f} ns/row")
+
+
+if __name__ == "__main__":
+    main()
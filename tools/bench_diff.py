@@ -0,0 +1,141 @@
+"""
+tools/bench_diff.py
+
+Benchmark forge.diff (line-hash patience + bit-parallel LCS) against
+difflib.unified_diff on synthetic multi-thousand-line Python files:
+
+    python3 -m tools.bench_diff
+    python3 -m tools.bench_diff --lines 2000,8000,20000 --runs 3
+
+Scenarios (old -> new):
+    small-edit   ~1% of lines edited / inserted / deleted
+    refactor     ~15% of lines changed, some blocks moved
+    rewrite      ~70% of lines replaced
+    shuffle      same lines, random order (worst case for forge.diff:
+                 few anchors, so large gaps go to the exact LCS)
+
+Columns:
+    difflib   median seconds for difflib.unified_diff
+    forge     median seconds for forge.diff, cache off
+    cached    seconds for a repeated call through the content-hash cache
+    speedup   difflib / forge
+    edits     changed (+/-) lines in difflib's / forge's output
+    same      whether both outputs are byte-identical (they differ
+              where difflib's diff is not minimal, or several are)
+    ok        forge's diff applied to old reproduces new
+
+Exits non-zero if forge's diff does not apply or has more changed
+lines than difflib's in any row: forge.diff must never trade diff size
+for speed.
+"""
+
+from __future__ import annotations
+
+import argparse
+import difflib
+import random
+import statistics
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from forge.diff import DiffCache, apply_unified, unified_diff_lines
+
+
+SCENARIOS: Dict[str, Optional[float]] = {"small-edit": 0.01, "refactor": 0.15, "rewrite": 0.70, "shuffle": None}
+
+
+def _line(rng: random.Random, i: int) -> str:
+    kind = rng.random()
+    indent = "    " * rng.randint(0, 3)
+    if kind < 0.15:
+        return "\n"
+    if kind < 0.25:
+        return f"{indent}return result_{rng.randint(0, 50)}\n"
+    if kind < 0.35:
+        return f"def func_{i}(x, y={rng.randint(0, 9)}):\n"
+    return f"{indent}value_{rng.randint(0, 400)} = compute(value_{rng.randint(0, 400)}, {rng.randint(0, 99)})\n"
+
+
+def make_pair(lines: int, change_rate: Optional[float], seed: int) -> Tuple[str, str]:
+    rng = random.Random(seed)
+    old = [_line(rng, i) for i in range(lines)]
+    new = list(old)
+    if change_rate is None:
+        rng.shuffle(new)
+        return "".join(old), "".join(new)
+    for _ in range(int(lines * change_rate)):
+        op = rng.random()
+        pos = rng.randrange(len(new) + 1)
+        if op < 0.4 and pos < len(new):
+            new[pos] = _line(rng, lines + pos)
+        elif op < 0.7:
+            new.insert(pos, _line(rng, lines + pos))
+        elif pos < len(new):
+            del new[pos]
+    if change_rate >= 0.1:
+        # Move a few blocks around.
+        for _ in range(3):
+            start = rng.randrange(max(1, len(new) - 40))
+            block = new[start:start + 40]
+            del new[start:start + 40]
+            dest = rng.randrange(len(new) + 1)
+            new[dest:dest] = block
+    return "".join(old), "".join(new)
+
+
+def _edits(diff: List[str]) -> int:
+    return sum(1 for line in diff[2:] if line[:1] in "+-")
+
+
+def _timed(fn: Callable[[], List[str]], runs: int) -> Tuple[float, List[str]]:
+    times = []
+    result: List[str] = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times), result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="forge.diff vs difflib benchmark")
+    parser.add_argument("--lines", type=str, default="2000,5000,10000", help="Comma-separated file sizes")
+    parser.add_argument("--scenarios", type=str, default=",".join(SCENARIOS))
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    sizes = [int(x) for x in args.lines.split(",") if x.strip()]
+    scenarios = [s.strip() for s in args.scenarios.split(",") if s.strip()]
+
+    failed: List[str] = []
+    print(f"{'scenario':<11} {'lines':>6} {'difflib':>9} {'forge':>9} {'cached':>9} {'speedup':>8} {'edits':>13} {'same':>5} {'ok':>4}")
+    for scenario in scenarios:
+        for lines in sizes:
+            old_text, new_text = make_pair(lines, SCENARIOS[scenario], args.seed)
+            a = old_text.splitlines(keepends=True)
+            b = new_text.splitlines(keepends=True)
+
+            t_ref, ref = _timed(lambda: list(difflib.unified_diff(a, b, fromfile="old", tofile="new")), args.runs)
+            t_new, mine = _timed(lambda: unified_diff_lines(a, b, fromfile="old", tofile="new"), args.runs)
+
+            cache = DiffCache()
+            cache.diff(old_text, new_text)
+            start = time.perf_counter()
+            cache.diff(old_text, new_text)
+            t_cached = time.perf_counter() - start
+
+            ok = apply_unified(old_text, mine) == new_text
+            if not ok or _edits(mine) > _edits(ref):
+                failed.append(f"{scenario}/{lines}")
+            edits = f"{_edits(ref)}/{_edits(mine)}"
+            print(
+                f"{scenario:<11} {lines:>6} {t_ref:>9.4f} {t_new:>9.4f} {t_cached:>9.5f} "
+                f"{t_ref / t_new if t_new else float('inf'):>7.1f}x {edits:>13} {'yes' if mine == ref else 'no':>5} {'yes' if ok else 'NO':>4}"
+            )
+    if failed:
+        raise SystemExit(f"forge.diff larger than difflib's diff or not applicable: {', '.join(failed)}")
+
+
+if __name__ == "__main__":
+    main()
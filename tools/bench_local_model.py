@@ -0,0 +1,167 @@
+"""
+tools/bench_local_model.py
+
+CPU benchmark for LocalTextModel's precision / threading modes.
+
+Builds (once) a tiny random Llama model with models.tiny_model, then
+runs each mode in its own subprocess, so thread pools and peak RSS
+don't leak between modes, and prints tokens/sec + memory:
+
+    python3 -m tools.bench_local_model
+    python3 -m tools.bench_local_model --tokens 128 --threads 4 --modes fp32,int8
+
+Modes:
+    fp32-no-grad   fp32 under torch.no_grad() (the old path)
+    fp32           fp32 under torch.inference_mode()
+    bf16           bf16 weights (falls back to fp32 without native bf16)
+    int8           dynamic int8 quantization of nn.Linear
+    speculative    fp32 + a 1-layer draft model (same tokenizer); the
+                   draft is random too, so acceptance is near zero here —
+                   point --draft-model-dir at a real pair for useful numbers
+
+Columns:
+    tok/s     decoded tokens per second (median of --runs)
+    rss_load  resident memory right after loading, MiB
+    rss_peak  peak resident memory of the worker process, MiB
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+
+MODES: Dict[str, Dict[str, object]] = {
+    "fp32-no-grad": {"precision": "fp32", "inference_mode": False},
+    "fp32": {"precision": "fp32", "inference_mode": True},
+    "bf16": {"precision": "bf16", "inference_mode": True},
+    "int8": {"precision": "int8", "inference_mode": True},
+    "speculative": {"precision": "fp32", "inference_mode": True, "draft": True},
+}
+
+PROMPT = "You are the ARCHITECT brain of C.3.\nTask: plan the next release\n"
+
+
+def _rss_mib() -> float:
+    with open("/proc/self/statm", encoding="utf-8") as f:
+        pages = int(f.read().split()[1])
+    return pages * os.sysconf("SC_PAGE_SIZE") / 2**20
+
+
+def _peak_rss_mib() -> float:
+    # ru_maxrss is KiB on Linux.
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_worker(args: argparse.Namespace) -> None:
+    import torch
+
+    from models.local_text_model import LocalTextModel, LocalTextModelConfig
+
+    mode = MODES[args.worker]
+    model = LocalTextModel(LocalTextModelConfig(
+        model_name=args.model_dir,
+        device="cpu",
+        precision=str(mode["precision"]),
+        inference_mode=bool(mode["inference_mode"]),
+        num_threads=args.threads,
+        num_interop_threads=args.interop_threads,
+    ))
+    rss_load = _rss_mib()
+
+    # Rate uses the tokens actually decoded, so an early EOS is fair.
+    rates: List[float] = []
+    for i in range(args.runs + 1):
+        torch.manual_seed(i)
+        start = time.perf_counter()
+        result = model._generate(
+            PROMPT,
+            max_tokens=args.tokens,
+            temperature=0.7,
+            should_stop=None,
+            track_logprobs=False,
+            draft_model=args.draft_model_dir if mode.get("draft") else None,
+        )
+        elapsed = time.perf_counter() - start
+        if i > 0:  # first run is warm-up
+            rates.append(result.num_tokens / elapsed)
+
+    print(json.dumps({
+        "mode": args.worker,
+        "precision": model.precision,
+        "threads": torch.get_num_threads(),
+        "tok_s": statistics.median(rates),
+        "rss_load": rss_load,
+        "rss_peak": _peak_rss_mib(),
+    }))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="LocalTextModel CPU mode benchmark")
+    parser.add_argument("--model-dir", type=str, default=None, help="Model dir (default: build a tiny one in /tmp)")
+    parser.add_argument("--draft-model-dir", type=str, default=None, help="Draft for the speculative mode (default: build a tiny one)")
+    parser.add_argument("--modes", type=str, default=",".join(MODES), help="Comma-separated modes")
+    parser.add_argument("--tokens", type=int, default=64, help="Tokens decoded per run")
+    parser.add_argument("--runs", type=int, default=3, help="Timed runs per mode (after one warm-up)")
+    parser.add_argument("--threads", type=int, default=None, help="torch.set_num_threads")
+    parser.add_argument("--interop-threads", type=int, default=None, help="torch.set_num_interop_threads")
+    parser.add_argument("--worker", type=str, default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args)
+        return
+
+    from models.tiny_model import TinyModelConfig, build_tiny_model
+
+    tmp = Path(tempfile.gettempdir())
+    model_dir = args.model_dir or build_tiny_model(str(tmp / "c3-tiny-model"))
+    draft_dir = args.draft_model_dir
+    if draft_dir is None and "speculative" in args.modes:
+        draft_cfg = TinyModelConfig(hidden_size=128, intermediate_size=352, num_layers=1, num_heads=4)
+        draft_dir = build_tiny_model(str(tmp / "c3-tiny-draft"), draft_cfg, tokenizer_from=model_dir)
+    repo_root = Path(__file__).resolve().parent.parent
+
+    print(f"Model: {model_dir}  tokens/run: {args.tokens}  runs: {args.runs}")
+    print(f"{'mode':<14} {'precision':<10} {'threads':>7} {'tok/s':>9} {'rss_load':>9} {'rss_peak':>9}")
+    for mode in args.modes.split(","):
+        mode = mode.strip()
+        if mode not in MODES:
+            raise SystemExit(f"Unknown mode {mode!r}; choose from {', '.join(MODES)}")
+        cmd = [
+            sys.executable, "-m", "tools.bench_local_model",
+            "--worker", mode,
+            "--model-dir", model_dir,
+            "--tokens", str(args.tokens),
+            "--runs", str(args.runs),
+        ]
+        if draft_dir is not None:
+            cmd += ["--draft-model-dir", draft_dir]
+        if args.threads is not None:
+            cmd += ["--threads", str(args.threads)]
+        if args.interop_threads is not None:
+            cmd += ["--interop-threads", str(args.interop_threads)]
+
+        proc = subprocess.run(cmd, cwd=repo_root, capture_output=True, text=True)
+        lines = [l for l in proc.stdout.splitlines() if l.startswith("{")]
+        if proc.returncode != 0 or not lines:
+            print(f"{mode:<14} failed: {proc.stderr.strip().splitlines()[-1:]}")
+            continue
+        row = json.loads(lines[-1])
+        print(
+            f"{mode:<14} {row['precision']:<10} {row['threads']:>7} {row['tok_s']:>9.1f} "
+            f"{row['rss_load']:>8.0f}M {row['rss_peak']:>8.0f}M"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -5,18 +5,38 @@ Tiny, safe Forge v1 demo tool.
 
 Usage:
   python3 -m tools.forge_suggest reasoning/reconcile.py
+  python3 -m tools.forge_suggest --tree            # every package under the repo
+  python3 -m tools.forge_suggest --tree --workers 4 --force --json
 
 It will:
   - read the target .py file
   - prepend a small Forge header comment
   - write <name>.suggested.py next to it
+
+A suggestion whose source is unchanged is not rewritten (only the
+timestamp would differ).
+
+Tree mode is incremental: a manifest (tools/forge_manifest.json) records
+each source's size, mtime and sha256 from the last run. Files whose
+stat matches are skipped without being read; files whose stat changed
+are hashed and skipped if the content did not. Only the remaining ones
+are handed to a process pool, so a pass costs time proportional to what
+changed. The run ends with a summary (counts, timings, errors).
 """
 
 from __future__ import annotations
 
+import argparse
+import hashlib
+import json
+import os
 import sys
-from pathlib import Path
+import time
+from dataclasses import dataclass, field
 from datetime import datetime
+from multiprocessing import Pool
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 
 FORGE_HEADER = """# ==========================================
@@ -29,37 +49,254 @@ FORGE_HEADER = """# ==========================================
 
 """
 
+SUGGESTED_SUFFIX = ".suggested.py"
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_MANIFEST = Path(__file__).with_name("forge_manifest.json")
+
+# Directories never walked in tree mode.
+SKIP_DIRS = {"__pycache__", "venv", ".venv", "build", "dist", "node_modules"}
+
+# Bumped whenever the generated output changes shape, so the manifest of
+# an older generator is ignored.
+GENERATOR = hashlib.sha256(FORGE_HEADER.encode("utf-8")).hexdigest()[:16]
+
+
+def _suggestion_path(source_path: Path) -> Path:
+    return source_path.with_suffix(source_path.suffix + SUGGESTED_SUFFIX)
+
 
-def make_suggestion(source_path: Path) -> Path:
+def _header_lines() -> int:
+    return FORGE_HEADER.count("\n")
+
+
+def suggestion_up_to_date(code: str, target_path: Path) -> bool:
+    """
+    True if target_path already holds `code` under a Forge header.
+    """
+    try:
+        existing = target_path.read_text()
+    except FileNotFoundError:
+        return False
+    if not existing.startswith(FORGE_HEADER.split("{timestamp}")[0]):
+        return False
+    body = existing.split("\n", _header_lines())[-1]
+    return body == code
+
+
+def make_suggestion(source_path: Path, force: bool = False) -> Path:
     if not source_path.exists():
         raise FileNotFoundError(f"Source file not found: {source_path}")
 
     code = source_path.read_text()
+    target_path = _suggestion_path(source_path)
+    if not force and suggestion_up_to_date(code, target_path):
+        return target_path
 
     timestamp = datetime.utcnow().isoformat() + "Z"
     header = FORGE_HEADER.format(timestamp=timestamp)
 
     suggested_code = header + code
 
-    target_path = source_path.with_suffix(source_path.suffix + ".suggested.py")
     target_path.write_text(suggested_code)
 
     return target_path
 
 
+# ------------------------------------------------------------
+# Tree mode
+# ------------------------------------------------------------
+
+
+@dataclass
+class TreeReport:
+    root: str
+    scanned: int = 0
+    unchanged: int = 0            # stat or hash matched the manifest
+    processed: List[str] = field(default_factory=list)
+    errors: Dict[str, str] = field(default_factory=dict)
+    removed: List[str] = field(default_factory=list)
+    scan_s: float = 0.0
+    process_s: float = 0.0
+    workers: int = 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "root": self.root,
+            "scanned": self.scanned,
+            "unchanged": self.unchanged,
+            "processed": self.processed,
+            "errors": self.errors,
+            "removed": self.removed,
+            "scan_s": self.scan_s,
+            "process_s": self.process_s,
+            "workers": self.workers,
+        }
+
+
+def iter_sources(root: Path) -> Iterator[Path]:
+    """
+    .py files inside the packages (sub-directories) of root, sorted.
+    """
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if not d.startswith(".") and d not in SKIP_DIRS)
+        if Path(dirpath) == root:
+            continue
+        for name in sorted(filenames):
+            if name.endswith(".py") and not name.endswith(SUGGESTED_SUFFIX):
+                yield Path(dirpath) / name
+
+
+def _sha256(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def load_manifest(path: Path) -> Dict[str, Dict[str, Any]]:
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+    if data.get("generator") != GENERATOR:
+        return {}
+    return data.get("files", {})
+
+
+def save_manifest(path: Path, files: Dict[str, Dict[str, Any]]) -> None:
+    payload = {"generator": GENERATOR, "files": dict(sorted(files.items()))}
+    tmp = path.with_name(path.name + ".tmp")
+    with tmp.open("w", encoding="utf-8") as f:
+        json.dump(payload, f, indent=1)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def _process(job: Tuple[str, str, bool]) -> Tuple[str, Optional[str], Optional[str]]:
+    """
+    Worker: write one suggestion. Returns (rel, sha256, error).
+    """
+    root, rel, force = job
+    path = Path(root) / rel
+    try:
+        digest = _sha256(path)
+        make_suggestion(path, force=force)
+        return rel, digest, None
+    except Exception as e:  # reported per file, the run goes on
+        return rel, None, f"{type(e).__name__}: {e}"
+
+
+def suggest_tree(
+    root: Path = REPO_ROOT,
+    manifest_path: Path = DEFAULT_MANIFEST,
+    workers: int = os.cpu_count() or 1,
+    force: bool = False,
+) -> TreeReport:
+    """
+    Write suggestions for every changed source under root.
+    """
+    root = root.resolve()
+    report = TreeReport(root=str(root), workers=workers)
+    manifest = {} if force else load_manifest(manifest_path)
+    new_manifest: Dict[str, Dict[str, Any]] = {}
+
+    start = time.perf_counter()
+    jobs: List[Tuple[str, str, bool]] = []
+    for path in iter_sources(root):
+        rel = path.relative_to(root).as_posix()
+        report.scanned += 1
+        st = path.stat()
+        entry = {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+        prev = manifest.get(rel)
+        target_ok = _suggestion_path(path).exists()
+        if prev and target_ok:
+            if prev["size"] == st.st_size and prev["mtime_ns"] == st.st_mtime_ns:
+                new_manifest[rel] = prev
+                report.unchanged += 1
+                continue
+            digest = _sha256(path)
+            if digest == prev["sha256"]:
+                # Touched, not edited.
+                new_manifest[rel] = {**entry, "sha256": digest}
+                report.unchanged += 1
+                continue
+        new_manifest[rel] = entry
+        jobs.append((str(root), rel, force))
+    report.removed = sorted(set(manifest) - set(new_manifest))
+    report.scan_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    if workers > 1 and len(jobs) > 1:
+        with Pool(min(workers, len(jobs))) as pool:
+            results = list(pool.imap_unordered(_process, jobs, chunksize=max(1, len(jobs) // (workers * 4))))
+    else:
+        results = [_process(job) for job in jobs]
+    for rel, digest, error in results:
+        if error is not None:
+            report.errors[rel] = error
+            new_manifest.pop(rel, None)  # retried next run
+        else:
+            new_manifest[rel]["sha256"] = digest
+            report.processed.append(rel)
+    report.processed.sort()
+    report.process_s = time.perf_counter() - start
+
+    save_manifest(manifest_path, new_manifest)
+    return report
+
+
+def _print_report(report: TreeReport, verbose: bool) -> None:
+    print(f"[forge_suggest] Tree: {report.root}")
+    print(
+        f"[forge_suggest] Scanned {report.scanned} file(s) in {report.scan_s:.3f}s: "
+        f"{report.unchanged} unchanged, {len(report.processed)} written, "
+        f"{len(report.errors)} error(s), {len(report.removed)} removed since last run"
+    )
+    print(f"[forge_suggest] Processed with {report.workers} worker(s) in {report.process_s:.3f}s")
+    if verbose:
+        for rel in report.processed:
+            print(f"[forge_suggest]   wrote {rel}{SUGGESTED_SUFFIX}")
+        for rel in report.removed:
+            print(f"[forge_suggest]   removed {rel}")
+    for rel, error in report.errors.items():
+        print(f"[forge_suggest] ERROR {rel}: {error}")
+
+
 def main(argv: list[str] | None = None) -> None:
-    if argv is None:
-        argv = sys.argv[1:]
+    parser = argparse.ArgumentParser(description="Forge v1 suggestion files")
+    parser.add_argument("path", nargs="?", help="Single source file")
+    parser.add_argument("--tree", action="store_true", help="Process every package under --root")
+    parser.add_argument("--root", type=str, default=str(REPO_ROOT))
+    parser.add_argument("--manifest", type=str, default=str(DEFAULT_MANIFEST))
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--force", action="store_true", help="Ignore the manifest and rewrite everything")
+    parser.add_argument("--verbose", action="store_true", help="List written / removed files")
+    parser.add_argument("--json", action="store_true", help="Print the tree report as JSON")
+    args = parser.parse_args(argv)
+
+    if args.tree:
+        report = suggest_tree(
+            Path(args.root).expanduser(),
+            manifest_path=Path(args.manifest).expanduser(),
+            workers=max(1, args.workers),
+            force=args.force,
+        )
+        if args.json:
+            print(json.dumps(report.to_dict(), indent=2))
+        else:
+            _print_report(report, args.verbose)
+        if report.errors:
+            sys.exit(1)
+        return
 
-    if not argv:
-        print("Usage: python3 -m tools.forge_suggest <path/to/file.py>")
+    if not args.path:
+        print("Usage: python3 -m tools.forge_suggest <path/to/file.py> | --tree")
         sys.exit(1)
 
-    source = Path(argv[0]).expanduser().resolve()
+    source = Path(args.path).expanduser().resolve()
     print(f"[forge_suggest] Reading: {source}")
 
     try:
-        target = make_suggestion(source)
+        target = make_suggestion(source, force=args.force)
     except Exception as e:
         print(f"[forge_suggest] ERROR: {e}")
         sys.exit(1)